@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+import threading
+import uuid
+import psycopg2
+from typing import Awaitable, Callable, Optional, Set
+from sqlalchemy.engine import make_url
+from app.core.config import settings
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD = 7900
+
+Handler = Callable[[dict], Awaitable[None]]
+
+logger = logging.getLogger(__name__)
+
+
+class BrokerError(Exception):
+    """An envelope could not be published to the other workers."""
+
+
+class InMemoryBroker:
+    """Single-process broker: every published envelope is delivered straight
+    back to the local handler. Default when running one Uvicorn worker."""
+
+    def __init__(self):
+        self._handler: Optional[Handler] = None
+
+    async def start(self, handler: Handler):
+        self._handler = handler
+
+    async def stop(self):
+        self._handler = None
+
+    async def publish(self, envelope: dict):
+        if self._handler:
+            await self._handler(envelope)
+
+
+class PostgresBroker:
+    """Cross-process broker built on PostgreSQL LISTEN/NOTIFY.
+
+    Envelopes are NOTIFYed first and then delivered to local sockets, so an
+    envelope that cannot reach the other workers (too large for NOTIFY, or
+    NOTIFY still failing after retries) is delivered nowhere and ``publish``
+    raises ``BrokerError``. Each process tags its envelopes with an origin id
+    and ignores its own notifications.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        channel: str = "chat_events",
+        notify_retries: int = 3,
+        retry_backoff: float = 0.1
+    ):
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._handler: Optional[Handler] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listen_conn = None
+        self._listen_fd = None
+        self._publish_conn = None
+        self._publish_lock = threading.Lock()
+        self.notify_retries = notify_retries
+        self.retry_backoff = retry_backoff
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn)
+        conn.autocommit = True
+        return conn
+
+    def _open_listen_conn(self):
+        conn = self._connect()
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return conn
+
+    async def _listen(self):
+        self._listen_conn = await self._loop.run_in_executor(None, self._open_listen_conn)
+        self._listen_fd = self._listen_conn.fileno()
+        self._loop.add_reader(self._listen_fd, self._on_notify)
+
+    async def start(self, handler: Handler):
+        self._handler = handler
+        self._loop = asyncio.get_running_loop()
+        await self._listen()
+        logger.info("Chat broker listening on channel '%s' (origin %s)", self.channel, self.origin[:8])
+
+    async def stop(self):
+        if self._listen_conn is not None:
+            self._loop.remove_reader(self._listen_fd)
+            self._listen_conn.close()
+            self._listen_conn = None
+        if self._publish_conn is not None:
+            self._publish_conn.close()
+            self._publish_conn = None
+        self._handler = None
+
+    def _spawn(self, coro):
+        # The loop only keeps weak references to tasks, so hold them until
+        # they finish and log what they raise
+        task = self._loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Chat broker delivery failed", exc_info=task.exception())
+
+    def _on_notify(self):
+        try:
+            self._listen_conn.poll()
+        except Exception as e:
+            logger.warning("Chat broker lost its LISTEN connection: %s", e)
+            self._loop.remove_reader(self._listen_fd)
+            self._listen_conn.close()
+            self._spawn(self._reconnect())
+            return
+
+        while self._listen_conn.notifies:
+            notify = self._listen_conn.notifies.pop(0)
+            try:
+                envelope = json.loads(notify.payload)
+            except ValueError:
+                continue
+            if envelope.get("origin") == self.origin or not self._handler:
+                continue
+            self._spawn(self._handler(envelope))
+
+    async def _reconnect(self):
+        delay = 1
+        while self._handler:
+            try:
+                await self._listen()
+                logger.info("Chat broker reconnected")
+                return
+            except Exception as e:
+                logger.warning("Chat broker reconnect failed: %s", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    def _notify(self, payload: str):
+        with self._publish_lock:
+            if self._publish_conn is None or self._publish_conn.closed:
+                self._publish_conn = self._connect()
+            try:
+                with self._publish_conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+            except Exception:
+                self._publish_conn.close()
+                self._publish_conn = None
+                raise
+
+    async def publish(self, envelope: dict):
+        envelope = {**envelope, "origin": self.origin}
+        payload = json.dumps(envelope, default=str, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        if size > MAX_NOTIFY_PAYLOAD:
+            raise BrokerError(f"Chat envelope too large for NOTIFY ({size} bytes)")
+
+        for attempt in range(self.notify_retries + 1):
+            try:
+                await self._loop.run_in_executor(None, self._notify, payload)
+                break
+            except Exception as e:
+                if attempt == self.notify_retries:
+                    logger.error("Failed to publish chat envelope after %d attempts: %s", attempt + 1, e)
+                    raise BrokerError("Chat envelope could not be published") from e
+                logger.warning("Chat envelope NOTIFY failed, retrying: %s", e)
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+        if self._handler:
+            await self._handler(envelope)
+
+
+def create_broker():
+    if settings.CHAT_BROKER == "postgres":
+        return PostgresBroker(settings.DATABASE_URL, settings.CHAT_BROKER_CHANNEL)
+    return InMemoryBroker()
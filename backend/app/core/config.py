@@ -3,16 +3,60 @@ from typing import List
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_DISCONNECT_STRATEGY: str = "optimistic"  # "optimistic" | "pessimistic" (pre-ping every checkout)
+    ASYNC_DATABASE_URL: str = ""  # defaults to DATABASE_URL with the asyncpg driver
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_KEYS: str = ""  # "kid=secret,kid2=secret2"; defaults to SECRET_KEY under JWT_ACTIVE_KID
+    JWT_ACTIVE_KID: str = "primary"
+    TOKEN_CACHE_SIZE: int = 4096
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
     ALLOWED_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     SMTP_HOST: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
     SMTP_USERNAME: str = ""
     SMTP_PASSWORD: str = ""
     SMTP_FROM_EMAIL: str = ""
+    SMTP_STARTTLS: bool = True
+    SMTP_TIMEOUT_SECONDS: int = 30
+    EMAIL_WORKER_ENABLED: bool = True
+    EMAIL_WORKERS: int = 2
+    EMAIL_BATCH_SIZE: int = 20
+    EMAIL_POLL_SECONDS: float = 2.0
+    EMAIL_MAX_ATTEMPTS: int = 6
+    EMAIL_RETRY_BASE_SECONDS: int = 30
+    EMAIL_SMTP_IDLE_SECONDS: int = 60
+    DISPATCHER_ENABLED: bool = True
+    DISPATCHER_BATCH_SIZE: int = 50
+    DISPATCHER_POLL_SECONDS: float = 5.0
     FRONTEND_URL: str = "http://localhost:5173"
+    TIMEZONE: str = "Africa/Nairobi"
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    DEFAULT_WORKING_DAYS: str = "0,1,2,3,4"  # Monday = 0
+    DEFAULT_WORKING_HOURS: str = "08:00-18:00"
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_TTL_SECONDS: int = 60
+    CHAT_BROKER: str = "memory"  # "memory" | "postgres"
+    CHAT_BROKER_CHANNEL: str = "chat_events"
+    CHAT_WRITE_BATCH_SIZE: int = 50
+    CHAT_WRITE_FLUSH_MS: int = 20
+    CHAT_WRITE_QUEUE_SIZE: int = 1000
+    CHAT_MAX_MESSAGE_LENGTH: int = 1500  # characters; a message must fit in one NOTIFY payload
+    WS_SEND_TIMEOUT_SECONDS: float = 5.0
+    WS_REPLAY_BUFFER_SIZE: int = 200
+    WS_REPLAY_TTL_SECONDS: int = 300
+    WS_PING_INTERVAL_SECONDS: float = 25.0
+    WS_IDLE_TIMEOUT_SECONDS: float = 75.0
+    WS_MAX_CONNECTIONS: int = 5000
+    WS_MAX_CONNECTIONS_PER_USER: int = 10  # per kind: chat and notification sockets are capped separately
 
     @property
     def origins_list(self) -> List[str]:
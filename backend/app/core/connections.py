@@ -0,0 +1,175 @@
+import asyncio
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from fastapi import WebSocket, status
+from app.core.config import settings
+
+
+async def send_json(websocket: WebSocket, message: dict, timeout: float = settings.WS_SEND_TIMEOUT_SECONDS) -> bool:
+    """Send one frame; False if the socket is closed or too slow."""
+    try:
+        await asyncio.wait_for(websocket.send_json(message), timeout)
+        return True
+    except Exception:
+        return False
+
+
+async def close_socket(websocket: WebSocket, code: int = status.WS_1008_POLICY_VIOLATION, timeout: float = settings.WS_SEND_TIMEOUT_SECONDS):
+    try:
+        await asyncio.wait_for(websocket.close(code=code), timeout)
+    except Exception:
+        pass
+
+
+async def send_all(
+    sockets: Iterable[WebSocket],
+    message: dict,
+    drop: Callable[[WebSocket], None],
+    timeout: float = settings.WS_SEND_TIMEOUT_SECONDS
+):
+    """Send to every socket at once. Sockets that fail are passed to `drop`
+    (the owning manager's remove) and closed with 1013 so clients reconnect."""
+    sockets = list(sockets)
+    if not sockets:
+        return
+    results = await asyncio.gather(*(send_json(ws, message, timeout) for ws in sockets))
+    for websocket, ok in zip(sockets, results):
+        if not ok:
+            drop(websocket)
+            asyncio.ensure_future(close_socket(websocket, status.WS_1013_TRY_AGAIN_LATER, timeout))
+
+
+class Connection:
+    __slots__ = ("user_id", "kind", "on_reap", "last_seen")
+
+    def __init__(self, user_id: int, kind: str, on_reap: Callable[[WebSocket], None]):
+        self.user_id = user_id
+        self.kind = kind
+        self.on_reap = on_reap
+        self.last_seen = time.monotonic()
+
+
+class ConnectionSupervisor:
+    """Tracks every chat and notification socket in this process.
+
+    A heartbeat task pings each socket every ``ping_interval`` seconds and
+    reaps any socket that fails the ping or has sent nothing (pongs
+    included) for ``idle_timeout`` seconds, so half-open connections don't
+    pile up. New sockets are refused once ``max_total`` are open, and a
+    user's oldest socket of a kind is closed when they open more than
+    ``max_per_user`` of that kind, so chat tabs never evict the user's
+    notification socket.
+    """
+
+    def __init__(
+        self,
+        max_total: int = settings.WS_MAX_CONNECTIONS,
+        max_per_user: int = settings.WS_MAX_CONNECTIONS_PER_USER,
+        ping_interval: float = settings.WS_PING_INTERVAL_SECONDS,
+        idle_timeout: float = settings.WS_IDLE_TIMEOUT_SECONDS,
+        send_timeout: float = settings.WS_SEND_TIMEOUT_SECONDS
+    ):
+        self.max_total = max_total
+        self.max_per_user = max_per_user
+        self.ping_interval = ping_interval
+        self.idle_timeout = idle_timeout
+        self.send_timeout = send_timeout
+        self.connections: Dict[WebSocket, Connection] = {}
+        # Keyed by (user_id, kind); insertion-ordered, so the first socket
+        # is the user's oldest of that kind
+        self.by_user: Dict[Tuple[int, str], Dict[WebSocket, None]] = {}
+        self.reaped_total = 0
+        self.evicted_total = 0
+        self.rejected_total = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_started(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+
+    async def admit(self, websocket: WebSocket, user_id: int, kind: str, on_reap: Callable[[WebSocket], None]) -> bool:
+        """Register a socket before it is accepted. Returns False (having
+        closed it) if the process is at capacity. `on_reap` removes the
+        socket from its manager when the supervisor closes it."""
+        self._ensure_started()
+        if len(self.connections) >= self.max_total:
+            self.rejected_total += 1
+            await close_socket(websocket, status.WS_1013_TRY_AGAIN_LATER, self.send_timeout)
+            return False
+
+        sockets = self.by_user.setdefault((user_id, kind), {})
+        while len(sockets) >= self.max_per_user:
+            self.evicted_total += 1
+            await self.reap(next(iter(sockets)), status.WS_1008_POLICY_VIOLATION)
+
+        self.connections[websocket] = Connection(user_id, kind, on_reap)
+        self.by_user.setdefault((user_id, kind), {})[websocket] = None
+        return True
+
+    def touch(self, websocket: WebSocket):
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            connection.last_seen = time.monotonic()
+
+    def release(self, websocket: WebSocket):
+        connection = self.connections.pop(websocket, None)
+        if connection is None:
+            return
+        key = (connection.user_id, connection.kind)
+        sockets = self.by_user.get(key)
+        if sockets is not None:
+            sockets.pop(websocket, None)
+            if not sockets:
+                del self.by_user[key]
+
+    async def reap(self, websocket: WebSocket, code: int = status.WS_1001_GOING_AWAY):
+        connection = self.connections.get(websocket)
+        if connection is None:
+            return
+        self.release(websocket)
+        connection.on_reap(websocket)
+        await close_socket(websocket, code, self.send_timeout)
+
+    async def _sweep(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        idle, live = [], []
+        for websocket, connection in self.connections.items():
+            (idle if connection.last_seen < cutoff else live).append(websocket)
+        results = await asyncio.gather(*(send_json(ws, {"type": "ping"}, self.send_timeout) for ws in live))
+        dead = idle + [ws for ws, ok in zip(live, results) if not ok]
+        for websocket in dead:
+            self.reaped_total += 1
+            await self.reap(websocket)
+        if dead:
+            print(f"Reaped {len(dead)} idle or dead sockets. Open connections: {len(self.connections)}")
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            try:
+                await self._sweep()
+            except Exception as e:
+                print(f"Connection heartbeat error: {e}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        by_kind: Dict[str, int] = {}
+        for connection in self.connections.values():
+            by_kind[connection.kind] = by_kind.get(connection.kind, 0) + 1
+        return {
+            "open": len(self.connections),
+            "users": len({user_id for user_id, _ in self.by_user}),
+            "by_kind": by_kind,
+            "max_total": self.max_total,
+            "max_per_user": self.max_per_user,
+            "reaped_total": self.reaped_total,
+            "evicted_total": self.evicted_total,
+            "rejected_total": self.rejected_total
+        }
+
+
+connection_supervisor = ConnectionSupervisor()
@@ -0,0 +1,208 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.database import AsyncBackingSession, SessionLocal
+from app.models.models import User, Ticket, Schedule, StatCounter, TicketStatus
+
+# Counters are keyed by (scope, scope_id, name). Every counter is the sum of
+# per-row contributions from tickets, schedules and users, so the write-path
+# hook and the from-scratch rebuild share the same definitions below.
+CounterKey = Tuple[str, int, str]
+
+SERVED_SESSION_STATUSES = ('completed', 'confirmed')
+OPEN_SESSION_STATUSES = ('confirmed', 'pending')
+RESOLVED_TICKET_STATUSES = (TicketStatus.RESOLVED.value, TicketStatus.CLOSED.value)
+
+TICKET_FIELDS = ("status", "created_at", "counselor_id")
+SCHEDULE_FIELDS = ("status", "student_id", "counselor_id", "scheduled_at", "rating")
+USER_FIELDS = ("role",)
+
+
+def _value(v):
+    return getattr(v, "value", v)
+
+
+def day_bucket(ts: Optional[datetime]) -> int:
+    if ts is None:
+        ts = datetime.now(timezone.utc)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    return ts.date().toordinal()
+
+
+def ticket_counters(ticket: dict) -> Dict[CounterKey, int]:
+    status = _value(ticket["status"]) or TicketStatus.NEW.value
+    counters = {
+        ("platform", 0, "tickets_total"): 1,
+        ("ticket_status", 0, status): 1,
+        ("tickets_created", day_bucket(ticket["created_at"]), "count"): 1,
+    }
+    counselor_id = ticket["counselor_id"]
+    if counselor_id:
+        counters[("counselor", counselor_id, "tickets_total")] = 1
+        if status in RESOLVED_TICKET_STATUSES:
+            counters[("counselor", counselor_id, "tickets_resolved")] = 1
+    return counters
+
+
+def schedule_counters(schedule: dict) -> Dict[CounterKey, int]:
+    status = schedule["status"] or "scheduled"
+    counselor_id = schedule["counselor_id"]
+    counters = {}
+    if status in SERVED_SESSION_STATUSES:
+        counters[("platform", 0, "sessions_served")] = 1
+        counters[("student", schedule["student_id"], "sessions_served")] = 1
+    if status == 'completed':
+        counters[("counselor", counselor_id, "sessions_completed")] = 1
+    if status in OPEN_SESSION_STATUSES:
+        counters[("open_sessions", day_bucket(schedule["scheduled_at"]), "count")] = 1
+    rating = schedule["rating"]
+    if rating is not None:
+        counters[("platform", 0, "ratings_total")] = 1
+        if rating >= 4:
+            counters[("platform", 0, "ratings_high")] = 1
+        counters[("counselor", counselor_id, "rating_count")] = 1
+        counters[("counselor", counselor_id, "rating_sum")] = rating
+    return counters
+
+
+def user_counters(user: dict) -> Dict[CounterKey, int]:
+    return {("users_role", 0, _value(user["role"])): 1}
+
+
+TRACKED = {
+    Ticket: (TICKET_FIELDS, ticket_counters),
+    Schedule: (SCHEDULE_FIELDS, schedule_counters),
+    User: (USER_FIELDS, user_counters),
+}
+
+
+def _snapshot(obj, fields, before: bool) -> dict:
+    state = inspect(obj)
+    values = {}
+    for field in fields:
+        history = state.attrs[field].history
+        if before and history.deleted:
+            values[field] = history.deleted[0]
+        else:
+            values[field] = state.dict.get(field)
+    return values
+
+
+def _add(deltas: Dict[CounterKey, int], counters: Dict[CounterKey, int], sign: int):
+    for key, value in counters.items():
+        deltas[key] += sign * value
+
+
+def _bump(connection, key: CounterKey, delta: int) -> int:
+    scope, scope_id, name = key
+    stmt = insert(StatCounter).values(scope=scope, scope_id=scope_id, name=name, value=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StatCounter.scope, StatCounter.scope_id, StatCounter.name],
+        set_={"value": StatCounter.value + stmt.excluded.value, "updated_at": datetime.now(timezone.utc)}
+    ).returning(StatCounter.value)
+    return connection.execute(stmt).scalar()
+
+
+def apply_deltas(connection, deltas: Dict[CounterKey, int]):
+    # Sorted so concurrent transactions lock counter rows in the same order
+    for key in sorted(deltas):
+        delta = deltas[key]
+        if delta == 0:
+            continue
+        value = _bump(connection, key, delta)
+        if key[0] == "student":
+            before = value - delta
+            if before <= 0 < value:
+                _bump(connection, ("platform", 0, "students_served"), 1)
+            elif value <= 0 < before:
+                _bump(connection, ("platform", 0, "students_served"), -1)
+
+
+def maintain_counters(session: Session, flush_context):
+    deltas: Dict[CounterKey, int] = defaultdict(int)
+    for obj in session.new:
+        tracked = TRACKED.get(type(obj))
+        if tracked:
+            fields, contribute = tracked
+            _add(deltas, contribute(_snapshot(obj, fields, before=False)), 1)
+    for obj in session.dirty:
+        tracked = TRACKED.get(type(obj))
+        if tracked and session.is_modified(obj):
+            fields, contribute = tracked
+            _add(deltas, contribute(_snapshot(obj, fields, before=True)), -1)
+            _add(deltas, contribute(_snapshot(obj, fields, before=False)), 1)
+    for obj in session.deleted:
+        tracked = TRACKED.get(type(obj))
+        if tracked:
+            fields, contribute = tracked
+            _add(deltas, contribute(_snapshot(obj, fields, before=True)), -1)
+    if any(deltas.values()):
+        apply_deltas(session.connection(), deltas)
+
+
+event.listen(SessionLocal, "after_flush", maintain_counters)
+event.listen(AsyncBackingSession, "after_flush", maintain_counters)
+
+
+def compute_counters(db: Session) -> Dict[CounterKey, int]:
+    """Recompute every counter from the source tables."""
+    totals: Dict[CounterKey, int] = defaultdict(int)
+    for model, (fields, contribute) in TRACKED.items():
+        columns = [getattr(model, field) for field in fields]
+        for row in db.query(*columns).yield_per(1000):
+            _add(totals, contribute(row._asdict()), 1)
+    totals[("platform", 0, "students_served")] = sum(
+        1 for (scope, _, _), value in totals.items() if scope == "student" and value > 0
+    )
+    return {key: value for key, value in totals.items() if value}
+
+
+def read_counters(db: Session) -> Dict[CounterKey, int]:
+    return {
+        (row.scope, row.scope_id, row.name): row.value
+        for row in db.query(StatCounter.scope, StatCounter.scope_id, StatCounter.name, StatCounter.value)
+    }
+
+
+def find_drift(db: Session) -> List[Tuple[CounterKey, int, int]]:
+    """Return (key, stored, expected) for every counter that disagrees with
+    a from-scratch recount."""
+    expected = compute_counters(db)
+    stored = read_counters(db)
+    return [
+        (key, stored.get(key, 0), expected.get(key, 0))
+        for key in sorted(set(expected) | set(stored))
+        if stored.get(key, 0) != expected.get(key, 0)
+    ]
+
+
+def rebuild_counters(db: Session):
+    expected = compute_counters(db)
+    db.query(StatCounter).delete()
+    db.bulk_insert_mappings(StatCounter, [
+        {"scope": scope, "scope_id": scope_id, "name": name, "value": value}
+        for (scope, scope_id, name), value in expected.items()
+    ])
+    db.commit()
+
+
+def get_scope(db: Session, scope: str, scope_id: int = 0) -> Dict[str, int]:
+    rows = db.query(StatCounter.name, StatCounter.value).filter(
+        StatCounter.scope == scope,
+        StatCounter.scope_id == scope_id
+    ).all()
+    return {name: value for name, value in rows}
+
+
+def sum_buckets(db: Session, scope: str, start: date, end: Optional[date] = None) -> int:
+    query = db.query(StatCounter.value).filter(
+        StatCounter.scope == scope,
+        StatCounter.scope_id >= start.toordinal()
+    )
+    if end is not None:
+        query = query.filter(StatCounter.scope_id <= end.toordinal())
+    return sum(value for (value,) in query)
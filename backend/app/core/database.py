@@ -1,12 +1,98 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from collections import deque
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
 
+
+class PoolMetrics:
+    """Checkout wait times for one pool. A checkout waits when every pooled
+    connection is in use, and also while a new connection is opened."""
+
+    def __init__(self, name: str, samples: int = 1000):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent = deque(maxlen=samples)
+        self._lock = threading.Lock()
+
+    def record(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.recent.append(wait)
+
+    def timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self, pool) -> dict:
+        with self._lock:
+            recent = sorted(self.recent)
+            checkouts, timeouts = self.checkouts, self.timeouts
+            avg = self.total_wait / checkouts if checkouts else 0.0
+            max_wait = self.max_wait
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checked_in": pool.checkedin(),
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "avg_wait_ms": round(avg * 1000, 2),
+            "p95_wait_ms": round(recent[int(len(recent) * 0.95)] * 1000, 2) if recent else 0.0,
+            "max_wait_ms": round(max_wait * 1000, 2)
+        }
+
+
+class CheckoutTimer:
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeout()
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+
+def timed_pool(base, metrics: PoolMetrics):
+    # A class rather than an instance attribute, so pools recreated by
+    # dispose() keep reporting to the same metrics
+    return type(f"Timed{base.__name__}", (CheckoutTimer, base), {"metrics": metrics})
+
+
+def pool_options() -> dict:
+    # "optimistic" skips the per-checkout ping: stale connections are
+    # recycled on age, and a disconnect error invalidates the whole pool.
+    # "pessimistic" pings on every checkout, at the cost of a round trip.
+    return dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_DISCONNECT_STRATEGY == "pessimistic"
+    )
+
+
+# Size the pool for the HTTP threadpool and background workers; WebSocket
+# handlers only borrow a connection while they authenticate
+sync_pool_metrics = PoolMetrics("sync")
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=False
+    poolclass=timed_pool(QueuePool, sync_pool_metrics),
+    echo=False,
+    **pool_options()
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -17,4 +103,57 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+class AsyncBackingSession(Session):
+    """Sync session class behind every AsyncSession, so session event
+    listeners registered on it also see async work."""
+
+
+# The async engine is created on first use, so processes that never serve
+# an async route don't open a second pool or import the async driver.
+async_pool_metrics = PoolMetrics("async")
+_async_engine = None
+_async_sessionmaker = None
+_async_lock = threading.Lock()
+
+
+def async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+def get_async_sessionmaker():
+    global _async_engine, _async_sessionmaker
+    with _async_lock:
+        if _async_sessionmaker is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+            _async_engine = create_async_engine(
+                async_database_url(),
+                poolclass=timed_pool(AsyncAdaptedQueuePool, async_pool_metrics),
+                echo=False,
+                **pool_options()
+            )
+            _async_sessionmaker = async_sessionmaker(
+                _async_engine, autoflush=False, expire_on_commit=False, sync_session_class=AsyncBackingSession
+            )
+    return _async_sessionmaker
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+def database_stats() -> dict:
+    stats = {"sync": sync_pool_metrics.stats(engine.pool)}
+    if _async_engine is not None:
+        stats["async"] = async_pool_metrics.stats(_async_engine.sync_engine.pool)
+    return stats
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from app.core.config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool so a burst of logins cannot
+    tie up the request threadpool. At most `max_pending` calls may be queued
+    or running at once; further callers get a 503 rather than waiting in an
+    unbounded queue."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            print(f"✓ Password hasher started ({self.workers} processes, bcrypt rounds {settings.BCRYPT_ROUNDS})")
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many sign-in requests, please try again shortly",
+                    headers={"Retry-After": "1"}
+                )
+            self.pending += 1
+
+        started = time.perf_counter()
+        try:
+            self.start()
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died; drop the pool so the next call starts a fresh one
+            self._executor = None
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self.total_seconds += elapsed
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, password, hashed_password)
+
+    def needs_update(self, hashed_password: str) -> bool:
+        return pwd_context.needs_update(hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "rounds": settings.BCRYPT_ROUNDS,
+                "pending": self.pending,
+                "queued": max(self.pending - self.workers, 0),
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_ms": round(self.total_seconds / self.completed * 1000, 2) if self.completed else 0.0
+            }
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
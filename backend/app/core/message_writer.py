@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import FailedChatMessage, Message
+
+logger = logging.getLogger(__name__)
+
+
+class MessageWriter:
+    """Persists chat messages off the event loop.
+
+    Message ids are reserved from the ``messages`` sequence in blocks, so a
+    message can be broadcast with its final id before it is written. Queued
+    rows are group-committed on a dedicated thread: the writer waits up to
+    ``flush_interval`` after the first row for more to arrive and inserts up to
+    ``batch_size`` rows per transaction. ``enqueue`` blocks once ``queue_size``
+    rows are pending, which pushes back on the sending socket.
+
+    Messages are broadcast before they are written, so a failed batch is
+    retried ``write_retries`` times with exponential backoff and then
+    written row by row; rows that still fail go to ``failed_chat_messages``.
+    Inserts ignore ids that already exist, so a retry after a commit whose
+    acknowledgement was lost doesn't fail.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 50,
+        flush_interval: float = 0.02,
+        queue_size: int = 1000,
+        id_block_size: int = 100,
+        write_retries: int = 3,
+        retry_backoff: float = 0.5
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.id_block_size = id_block_size
+        self.write_retries = write_retries
+        self.retry_backoff = retry_backoff
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="message-writer")
+        self._ids: List[int] = []
+        self._id_lock: Optional[asyncio.Lock] = None
+
+    def _ensure_started(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._id_lock = asyncio.Lock()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def _reserve_ids(self, count: int) -> List[int]:
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                text("SELECT nextval(pg_get_serial_sequence('messages', 'id')) FROM generate_series(1, :count)"),
+                {"count": count}
+            ).all()
+            return [row[0] for row in rows]
+        finally:
+            db.close()
+
+    async def next_id(self) -> int:
+        self._ensure_started()
+        async with self._id_lock:
+            if not self._ids:
+                loop = asyncio.get_running_loop()
+                self._ids = await loop.run_in_executor(None, self._reserve_ids, self.id_block_size)
+            return self._ids.pop(0)
+
+    async def enqueue(self, row: dict):
+        self._ensure_started()
+        await self._queue.put(row)
+
+    def _insert(self, rows: List[dict]):
+        db = SessionLocal()
+        try:
+            db.execute(insert(Message).on_conflict_do_nothing(index_elements=["id"]), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _dead_letter(self, row: dict, error: Exception):
+        db = SessionLocal()
+        try:
+            db.add(FailedChatMessage(
+                message_id=row["id"],
+                ticket_id=row["ticket_id"],
+                sender_id=row["sender_id"],
+                message=row["message"],
+                sent_at=row.get("created_at"),
+                error=str(error)[:1000]
+            ))
+            db.commit()
+            logger.error("Chat message %s dead-lettered: %s", row["id"], error)
+        except Exception:
+            db.rollback()
+            logger.exception("Could not dead-letter chat message %r", row)
+        finally:
+            db.close()
+
+    def _write_batch(self, rows: List[dict]):
+        for attempt in range(self.write_retries):
+            try:
+                self._insert(rows)
+                return
+            except Exception as e:
+                logger.warning("Writing %d chat messages failed (attempt %d): %s", len(rows), attempt + 1, e)
+                if attempt + 1 < self.write_retries:
+                    time.sleep(self.retry_backoff * 2 ** attempt)
+
+        # Isolate the row(s) that keep failing so the rest of the batch lands
+        for row in rows:
+            try:
+                self._insert([row])
+            except Exception as e:
+                self._dead_letter(row, e)
+
+    async def _collect_batch(self) -> List[dict]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            await loop.run_in_executor(self._executor, self._write_batch, batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def flush(self):
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        pending = self.pending()
+        await self.flush()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        print(f"Message writer flushed {pending} pending chat messages on shutdown")
+
+
+message_writer = MessageWriter(
+    batch_size=settings.CHAT_WRITE_BATCH_SIZE,
+    flush_interval=settings.CHAT_WRITE_FLUSH_MS / 1000,
+    queue_size=settings.CHAT_WRITE_QUEUE_SIZE
+)
@@ -1,15 +1,18 @@
-from datetime import datetime, timedelta
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.hashing import pwd_context
+from app.core.tokens import ACCESS, token_service
 from app.models.models import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -19,21 +22,69 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
-
-def decode_token(token: str):
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError:
-        return None
+    return token_service.create_access_token(data, expires_delta)
+
+def create_refresh_token(data: dict):
+    return token_service.create_refresh_token(data)
+
+def decode_token(token: str, token_type: str = ACCESS):
+    return token_service.decode(token, token_type)
+
+class PrincipalCache:
+    """TTL + LRU cache of authenticated users' column values, keyed by token
+    subject. Entries are invalidated by the admin endpoints that change a
+    user's role, activation or existence."""
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at < time.monotonic():
+                del self._entries[subject]
+                return None
+            self._entries.move_to_end(subject)
+            return values
+
+    def set(self, subject: str, values: dict):
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str):
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+USER_COLUMNS = [attr.key for attr in inspect(User).column_attrs]
+
+
+def load_principal(db: Session, email: str) -> Optional[User]:
+    values = principal_cache.get(email)
+    if values is not None:
+        user = User(**values)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    user = db.query(User).filter(User.email == email).first()
+    if user is not None:
+        principal_cache.set(email, {key: getattr(user, key) for key in USER_COLUMNS})
+    return user
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -55,7 +106,7 @@ async def get_current_user(
             detail="Invalid authentication credentials"
         )
     
-    user = db.query(User).filter(User.email == email).first()
+    user = load_principal(db, email)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from jose import JWTError, jwt
+from app.core.config import settings
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+
+def load_signing_keys() -> Dict[str, str]:
+    """JWT_KEYS is a comma-separated list of kid=secret pairs. Old keys stay
+    listed until every token they signed has expired; JWT_ACTIVE_KID picks
+    the one new tokens are signed with."""
+    keys = {}
+    for pair in settings.JWT_KEYS.split(","):
+        if pair.strip():
+            kid, _, secret = pair.partition("=")
+            keys[kid.strip()] = secret.strip()
+    if not keys:
+        keys[settings.JWT_ACTIVE_KID] = settings.SECRET_KEY
+    if settings.JWT_ACTIVE_KID not in keys:
+        raise ValueError(f"JWT_ACTIVE_KID {settings.JWT_ACTIVE_KID!r} is not listed in JWT_KEYS")
+    return keys
+
+
+class TokenService:
+    """Issues kid-tagged access and refresh tokens and verifies them. Verified
+    claims are kept in a bounded LRU until the token's exp, so repeat
+    requests with the same bearer token skip signature verification."""
+
+    def __init__(self, keys: Dict[str, str], active_kid: str, cache_size: int):
+        self.keys = keys
+        self.active_kid = active_kid
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _encode(self, data: dict, token_type: str, expires_delta: timedelta) -> str:
+        claims = data.copy()
+        claims.update({"exp": datetime.utcnow() + expires_delta, "type": token_type})
+        return jwt.encode(
+            claims, self.keys[self.active_kid],
+            algorithm=settings.ALGORITHM, headers={"kid": self.active_kid}
+        )
+
+    def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
+        return self._encode(data, ACCESS, expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+
+    def create_refresh_token(self, data: dict) -> str:
+        return self._encode(data, REFRESH, timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
+
+    def _cached(self, token: str) -> Optional[dict]:
+        with self._lock:
+            payload = self._cache.get(token)
+            if payload is None:
+                return None
+            if payload["exp"] <= time.time():
+                del self._cache[token]
+                return None
+            self._cache.move_to_end(token)
+            return payload
+
+    def _remember(self, token: str, payload: dict):
+        with self._lock:
+            self._cache[token] = payload
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _verify(self, token: str) -> Optional[dict]:
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+            # Tokens issued before kid rotation carry no kid and were signed with SECRET_KEY
+            key = self.keys.get(kid) if kid else settings.SECRET_KEY
+            if key is None:
+                return None
+            payload = jwt.decode(token, key, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            return None
+        if "exp" not in payload:
+            return None
+        return payload
+
+    def decode(self, token: str, token_type: str = ACCESS) -> Optional[dict]:
+        payload = self._cached(token)
+        if payload is None:
+            self.misses += 1
+            payload = self._verify(token)
+            if payload is None:
+                return None
+            self._remember(token, payload)
+        else:
+            self.hits += 1
+        if payload.get("type", ACCESS) != token_type:
+            return None
+        return payload
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._cache)
+        return {"active_kid": self.active_kid, "cached": size, "hits": self.hits, "misses": self.misses}
+
+
+token_service = TokenService(load_signing_keys(), settings.JWT_ACTIVE_KID, settings.TOKEN_CACHE_SIZE)
@@ -7,7 +7,12 @@ from app.models.models import (
     EmergencyContact,
     Assessment,
     Schedule,
+    CounselorWorkingHours,
     AuditLog,
+    StatCounter,
+    OutboundEmail,
+    IdempotencyKey,
+    FailedChatMessage,
     UserRole,
     TicketStatus,
     CrisisLevel
@@ -22,7 +27,12 @@ __all__ = [
     "EmergencyContact",
     "Assessment",
     "Schedule",
+    "CounselorWorkingHours",
     "AuditLog",
+    "StatCounter",
+    "OutboundEmail",
+    "IdempotencyKey",
+    "FailedChatMessage",
     "UserRole",
     "TicketStatus",
     "CrisisLevel"
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, ARRAY, CheckConstraint
+from datetime import timedelta
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Time, ForeignKey, Text, Enum, ARRAY, CheckConstraint, PrimaryKeyConstraint, Index, DDL, event, literal_column, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -89,6 +91,12 @@ class Ticket(Base):
     resolved_at = Column(DateTime(timezone=True), nullable=True)
     closed_at = Column(DateTime(timezone=True))
 
+    __table_args__ = (
+        Index("ix_tickets_status_priority_created", "status", "priority", "created_at"),
+        Index("ix_tickets_counselor_created", "counselor_id", "created_at"),
+        Index("ix_tickets_student_created", "student_id", "created_at"),
+    )
+
     student = relationship("User", back_populates="student_tickets", foreign_keys=[student_id])
     counselor = relationship("User", back_populates="counselor_tickets", foreign_keys=[counselor_id])
     messages = relationship("Message", back_populates="ticket", cascade="all, delete-orphan")
@@ -108,6 +116,37 @@ class Message(Base):
     ticket = relationship("Ticket", back_populates="messages")
     sender = relationship("User", back_populates="messages")
 
+    __table_args__ = (
+        Index("ix_messages_ticket_created", "ticket_id", "created_at", "id"),
+    )
+
+
+# Full-text documents for search. The GIN expression indexes below are built
+# from these same expressions so the planner can match them in queries.
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+
+def ticket_search_document():
+    return func.to_tsvector(SEARCH_CONFIG, func.coalesce(Ticket.initial_message, literal_column("''")))
+
+
+def message_search_document():
+    return func.to_tsvector(SEARCH_CONFIG, Message.message)
+
+
+Index("ix_tickets_initial_message_fts", ticket_search_document(), postgresql_using="gin")
+Index("ix_messages_message_fts", message_search_document(), postgresql_using="gin")
+Index(
+    "ix_tickets_ticket_number_trgm", Ticket.ticket_number,
+    postgresql_using="gin", postgresql_ops={"ticket_number": "gin_trgm_ops"}
+)
+Index(
+    "ix_tickets_category_trgm", Ticket.category,
+    postgresql_using="gin", postgresql_ops={"category": "gin_trgm_ops"}
+)
+
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
 
 class Note(Base):
     __tablename__ = "notes"
@@ -145,11 +184,25 @@ class Assessment(Base):
     assessment_type = Column(String, nullable=False)
     score = Column(Integer, nullable=False)
     severity_level = Column(String)
-    responses = Column(Text)
+    mental_health_score = Column(Integer, nullable=False, default=0)
+    emotional_health_score = Column(Integer, nullable=False, default=0)
+    social_health_score = Column(Integer, nullable=False, default=0)
+    needs_awareness_score = Column(Integer, nullable=False, default=0)
+    needs_followup = Column(Boolean, nullable=False, default=False)
+    responses = Column(Text)  # raw answers and notes, JSON
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     student = relationship("User", back_populates="assessments")
 
+    __table_args__ = (
+        Index("ix_assessments_student_created", "student_id", "created_at"),
+        Index("ix_assessments_created_desc", created_at.desc(), id.desc()),
+        Index(
+            "ix_assessments_followup_created", created_at.desc(), id.desc(),
+            postgresql_where=needs_followup.is_(True)
+        ),
+    )
+
 
 class Schedule(Base):
     __tablename__ = "schedules"
@@ -160,6 +213,7 @@ class Schedule(Base):
     ticket_id = Column(Integer, ForeignKey("tickets.id"))
     scheduled_at = Column(DateTime(timezone=True), nullable=False)
     duration_minutes = Column(Integer, default=60)
+    ends_at = Column(DateTime(timezone=True), nullable=False)  # scheduled_at + duration, kept by set_schedule_end
     meeting_type = Column(String, default="in-person")
     meeting_link = Column(String)
     status = Column(String, default="scheduled")
@@ -171,12 +225,48 @@ class Schedule(Base):
 
     __table_args__ = (
         CheckConstraint('rating >= 1 AND rating <= 5', name='check_rating_range'),
+        # A counselor can't hold two live bookings whose time ranges overlap
+        ExcludeConstraint(
+            (counselor_id, "="),
+            (func.tstzrange(scheduled_at, ends_at), "&&"),
+            name="schedules_no_overlap",
+            using="gist",
+            where=text("status IN ('pending', 'scheduled', 'confirmed')")
+        ),
+        Index("ix_schedules_counselor_scheduled", "counselor_id", "scheduled_at"),
     )
 
     student = relationship("User", back_populates="student_schedules", foreign_keys=[student_id])
     counselor = relationship("User", back_populates="counselor_schedules", foreign_keys=[counselor_id])
 
 
+@event.listens_for(Schedule, "before_insert")
+@event.listens_for(Schedule, "before_update")
+def set_schedule_end(mapper, connection, target):
+    target.ends_at = target.scheduled_at + timedelta(minutes=target.duration_minutes or 60)
+
+
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+
+
+class CounselorWorkingHours(Base):
+    __tablename__ = "counselor_working_hours"
+
+    id = Column(Integer, primary_key=True, index=True)
+    counselor_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    weekday = Column(Integer, nullable=False)  # 0 = Monday
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+
+    __table_args__ = (
+        CheckConstraint('weekday >= 0 AND weekday <= 6', name='check_weekday_range'),
+        CheckConstraint('start_time < end_time', name='check_working_hours_order'),
+        Index("ix_counselor_working_hours_counselor_weekday", "counselor_id", "weekday"),
+    )
+
+    counselor = relationship("User")
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
@@ -185,4 +275,70 @@ class AuditLog(Base):
     action = Column(String, nullable=False)
     details = Column(Text)
     ip_address = Column(String)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class StatCounter(Base):
+    __tablename__ = "stat_counters"
+
+    scope = Column(String, primary_key=True)
+    scope_id = Column(Integer, primary_key=True, default=0)
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class OutboundEmail(Base):
+    __tablename__ = "outbound_emails"
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html_body = Column(Text, nullable=False)
+    text_body = Column(Text, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # "pending" | "sent" | "dead"
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_outbound_emails_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+
+class IdempotencyKey(Base):
+    """Client-supplied Idempotency-Key for a write endpoint. The row is
+    inserted before the write, in the same transaction, so concurrent
+    retries serialize on the primary key; the stored response is replayed
+    to later retries."""
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    scope = Column(String, nullable=False)
+    key = Column(String(200), nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer)
+    response_body = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("user_id", "scope", "key"),
+    )
+
+
+class FailedChatMessage(Base):
+    """Chat messages the message writer could not insert even one row at a
+    time. No foreign keys, since a deleted ticket or sender is a common
+    reason for the failure."""
+    __tablename__ = "failed_chat_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    message_id = Column(Integer, nullable=False)
+    ticket_id = Column(Integer, nullable=False)
+    sender_id = Column(Integer, nullable=False)
+    message = Column(Text, nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+    failed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,11 +1,14 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List
+from app.core.counters import get_scope
 from app.core.database import get_db
-from app.core.security import require_role
-from app.models.models import User, Ticket, CounselorProfile, UserRole, TicketStatus, CrisisLevel
+from app.core.security import require_role, principal_cache
+from app.models.models import User, Ticket, Schedule, UserRole, TicketStatus, CrisisLevel
 from app.schemas.schemas import UserResponse
+from app.utils.ticket_dispatcher import ticket_dispatcher
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
@@ -43,6 +46,7 @@ def approve_user(
     user.is_verified = True
     db.commit()
     db.refresh(user)
+    principal_cache.invalidate(user.email)
     return user
 
 
@@ -58,14 +62,17 @@ def approve_counselor(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    email = user.email
     if approve:
         user.is_active = True
         user.is_verified = True
         db.commit()
+        principal_cache.invalidate(email)
         return {"message": "Counselor approved successfully", "success": True}
     else:
         db.delete(user)
         db.commit()
+        principal_cache.invalidate(email)
         return {"message": "Counselor rejected", "success": True}
 
 
@@ -81,8 +88,10 @@ def delete_user(
     if user.role == UserRole.ADMIN:
         raise HTTPException(status_code=400, detail="Cannot delete admin user")
 
+    email = user.email
     db.delete(user)
     db.commit()
+    principal_cache.invalidate(email)
     return None
 
 
@@ -91,34 +100,93 @@ def get_system_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
+    users_by_role = get_scope(db, "users_role")
     return {
-        "total_students": db.query(User).filter(User.role == UserRole.STUDENT).count(),
-        "total_counselors": db.query(User).filter(User.role == UserRole.COUNSELOR).count(),
-        "total_tickets": db.query(Ticket).count(),
-        "active_tickets": db.query(Ticket).filter(Ticket.status == TicketStatus.ACTIVE).count(),
+        "total_students": users_by_role.get(UserRole.STUDENT.value, 0),
+        "total_counselors": users_by_role.get(UserRole.COUNSELOR.value, 0),
+        "total_tickets": get_scope(db, "platform").get("tickets_total", 0),
+        "active_tickets": get_scope(db, "ticket_status").get(TicketStatus.ACTIVE.value, 0),
     }
 
 
+OPEN_TICKET_STATUSES = [TicketStatus.NEW, TicketStatus.ASSIGNED, TicketStatus.ACTIVE, TicketStatus.FOLLOW_UP]
+CRISIS_LEVELS = [CrisisLevel.HIGH, CrisisLevel.CRITICAL]
+
+
+def get_dashboard_counters(db: Session) -> dict:
+    now = datetime.now(timezone.utc)
+    week_ago = now - timedelta(days=7)
+
+    user_stats = select(
+        func.count().label("total_users"),
+        func.count().filter(and_(User.role == UserRole.COUNSELOR, User.is_active == True)).label("active_counselors"),
+        func.count().filter(User.created_at >= week_ago).label("new_users_this_week"),
+    ).subquery()
+
+    ticket_stats = select(
+        func.count().filter(Ticket.status == TicketStatus.ACTIVE).label("active_tickets"),
+        func.count().filter(Ticket.crisis_level.in_(CRISIS_LEVELS)).label("crisis_events_count"),
+        func.count().filter(Ticket.created_at >= week_ago).label("tickets_this_week"),
+        func.count().filter(Ticket.resolved_at >= week_ago).label("resolved_this_week"),
+        func.avg(func.extract("epoch", Ticket.assigned_at - Ticket.created_at)).label("avg_response_seconds"),
+        func.avg(func.extract("epoch", Ticket.resolved_at - Ticket.created_at)).label("avg_resolution_seconds"),
+        func.count(func.distinct(Ticket.student_id)).filter(Ticket.status.in_(OPEN_TICKET_STATUSES)).label("active_students"),
+    ).subquery()
+
+    schedule_stats = select(
+        func.count().filter(and_(
+            Schedule.scheduled_at >= week_ago,
+            Schedule.scheduled_at <= now,
+            Schedule.status.in_(['confirmed', 'completed'])
+        )).label("sessions_this_week"),
+    ).subquery()
+
+    row = db.execute(select(user_stats, ticket_stats, schedule_stats)).one()
+
+    return {
+        "total_users": row.total_users,
+        "active_counselors": row.active_counselors,
+        "active_tickets": row.active_tickets,
+        "crisis_events_count": row.crisis_events_count,
+        "new_users_this_week": row.new_users_this_week,
+        "tickets_this_week": row.tickets_this_week,
+        "resolved_this_week": row.resolved_this_week,
+        # Minutes from ticket creation to assignment
+        "avg_response_time": round(float(row.avg_response_seconds) / 60, 1) if row.avg_response_seconds else 0,
+        # Hours from ticket creation to resolution
+        "avg_resolution_time": round(float(row.avg_resolution_seconds) / 3600, 1) if row.avg_resolution_seconds else 0,
+        "sessions_this_week": row.sessions_this_week,
+        "active_students": row.active_students,
+    }
+
+
+@router.get("/dispatcher")
+def get_dispatcher_metrics(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """Queue depth of unassigned NEW tickets and time from creation to
+    automatic assignment over the last few hundred tickets, per priority."""
+    return ticket_dispatcher.metrics(db)
+
+
 @router.get("/dashboard")
 def get_dashboard_data(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
-    total_users = db.query(User).count()
-    active_counselors = db.query(User).filter(
-        User.role == UserRole.COUNSELOR,
-        User.is_active == True
-    ).count()
-    active_tickets = db.query(Ticket).filter(Ticket.status == TicketStatus.ACTIVE).count()
+    analytics = get_dashboard_counters(db)
 
-    pending_counselor_users = db.query(User).filter(
+    pending_counselor_users = db.query(User).options(
+        selectinload(User.counselor_profile)
+    ).filter(
         User.role == UserRole.COUNSELOR,
         User.is_active == False
     ).all()
 
     pending_counselors = []
     for c in pending_counselor_users:
-        profile = db.query(CounselorProfile).filter(CounselorProfile.user_id == c.id).first()
+        profile = c.counselor_profile[0] if c.counselor_profile else None
         pending_counselors.append({
             "id": c.id,
             "full_name": c.full_name,
@@ -130,14 +198,17 @@ def get_dashboard_data(
             "certifications": []
         })
 
-    crisis_tickets = db.query(Ticket).filter(
-        Ticket.crisis_level.in_([CrisisLevel.HIGH, CrisisLevel.CRITICAL])
+    crisis_tickets = db.query(Ticket).options(
+        joinedload(Ticket.student),
+        joinedload(Ticket.counselor)
+    ).filter(
+        Ticket.crisis_level.in_(CRISIS_LEVELS)
     ).order_by(Ticket.created_at.desc()).limit(50).all()
 
     crisis_events = []
     for t in crisis_tickets:
-        student = db.query(User).filter(User.id == t.student_id).first()
-        counselor = db.query(User).filter(User.id == t.counselor_id).first() if t.counselor_id else None
+        student = t.student
+        counselor = t.counselor
         crisis_events.append({
             "id": t.id,
             "ticket_number": t.ticket_number,
@@ -150,24 +221,8 @@ def get_dashboard_data(
             "counselor": {"id": counselor.id, "full_name": counselor.full_name} if counselor else None,
         })
 
-    crisis_events_count = db.query(Ticket).filter(
-        Ticket.crisis_level.in_([CrisisLevel.HIGH, CrisisLevel.CRITICAL])
-    ).count()
-
     return {
-        "analytics": {
-            "total_users": total_users,
-            "active_counselors": active_counselors,
-            "active_tickets": active_tickets,
-            "crisis_events_count": crisis_events_count,
-            "new_users_this_week": 0,
-            "tickets_this_week": 0,
-            "resolved_this_week": 0,
-            "avg_response_time": 0,
-            "avg_resolution_time": 0,
-            "sessions_this_week": 0,
-            "active_students": 0,
-        },
+        "analytics": analytics,
         "pending_counselors": pending_counselors,
         "crisis_events": crisis_events
     }
@@ -0,0 +1,166 @@
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.core.security import require_role
+from app.models.models import User, Assessment, UserRole
+from app.routers.assessments import CRITICAL_SEVERITY
+
+router = APIRouter(prefix="/api/assessments/analytics", tags=["Assessment Analytics"])
+
+SUBSCORES = (
+    ("mental_health", Assessment.mental_health_score),
+    ("emotional_health", Assessment.emotional_health_score),
+    ("social_health", Assessment.social_health_score),
+    ("needs_awareness", Assessment.needs_awareness_score),
+)
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+class CompletedWeekCache:
+    """Cohort buckets for weeks that have already ended. Assessments are
+    append-only, so a finished week's distribution never changes and is
+    computed once per process. The current week is always recomputed."""
+
+    def __init__(self):
+        self._weeks: Dict[date, list] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, weeks: List[date]) -> Dict[date, list]:
+        with self._lock:
+            return {week: self._weeks[week] for week in weeks if week in self._weeks}
+
+    def store(self, week: date, buckets: list):
+        with self._lock:
+            self._weeks[week] = buckets
+
+    def clear(self):
+        with self._lock:
+            self._weeks.clear()
+
+
+week_cache = CompletedWeekCache()
+
+
+def load_weekly_distribution(db: Session, start: date, end: date) -> Dict[date, list]:
+    """Severity distribution per ISO week (UTC) for assessments in [start, end)."""
+    week = func.date_trunc("week", func.timezone("UTC", Assessment.created_at))
+    count = func.count(Assessment.id)
+    rows = db.query(
+        week.label("week"),
+        Assessment.severity_level,
+        count.label("count"),
+        (count * 1.0 / func.sum(count).over(partition_by=week)).label("share"),
+        func.avg(Assessment.score).label("avg_score"),
+        *(func.avg(column).label(name) for name, column in SUBSCORES)
+    ).filter(
+        Assessment.created_at >= datetime.combine(start, time.min, tzinfo=timezone.utc),
+        Assessment.created_at < datetime.combine(end, time.min, tzinfo=timezone.utc)
+    ).group_by(week, Assessment.severity_level).order_by(week, Assessment.severity_level).all()
+
+    weeks: Dict[date, list] = {}
+    for row in rows:
+        weeks.setdefault(row.week.date(), []).append({
+            "severity_level": row.severity_level,
+            "count": row.count,
+            "share": round(float(row.share), 4),
+            "avg_score": round(float(row.avg_score), 2),
+            "avg_breakdown": {name: round(float(getattr(row, name)), 2) for name, _ in SUBSCORES}
+        })
+    return weeks
+
+
+def load_trajectory(db: Session, student_id: int, window: int) -> list:
+    order = (Assessment.created_at, Assessment.id)
+    last_critical = func.max(Assessment.created_at).filter(
+        Assessment.severity_level == CRITICAL_SEVERITY
+    ).over(order_by=order, rows=(None, 0))
+
+    rows = db.query(
+        Assessment.id,
+        Assessment.created_at,
+        Assessment.score,
+        Assessment.severity_level,
+        *(column for _, column in SUBSCORES),
+        (Assessment.score - func.lag(Assessment.score).over(order_by=order)).label("delta"),
+        func.avg(Assessment.score).over(order_by=order, rows=(-(window - 1), 0)).label("rolling_avg"),
+        last_critical.label("last_critical_at"),
+        func.extract("epoch", Assessment.created_at - last_critical).label("seconds_since_critical")
+    ).filter(Assessment.student_id == student_id).order_by(*order).all()
+
+    return [
+        {
+            "id": row.id,
+            "created_at": row.created_at.isoformat(),
+            "total_score": row.score,
+            "severity_level": row.severity_level,
+            "breakdown": {name: getattr(row, column.key) for name, column in SUBSCORES},
+            "delta": row.delta,
+            "rolling_avg": round(float(row.rolling_avg), 2),
+            "last_critical_at": row.last_critical_at.isoformat() if row.last_critical_at else None,
+            "days_since_critical": round(float(row.seconds_since_critical) / 86400, 1)
+            if row.seconds_since_critical is not None else None
+        }
+        for row in rows
+    ]
+
+
+@router.get("/students/{student_id}/trajectory")
+def get_student_trajectory(
+    student_id: int,
+    window: int = Query(3, ge=1, le=20, description="Assessments in the rolling average"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role([UserRole.COUNSELOR, UserRole.ADMIN]))
+):
+    points = load_trajectory(db, student_id, window)
+
+    summary = None
+    if points:
+        latest = points[-1]
+        last_critical_at = latest["last_critical_at"]
+        summary = {
+            "assessments": len(points),
+            "latest_score": latest["total_score"],
+            "change_since_first": latest["total_score"] - points[0]["total_score"],
+            "rolling_avg": latest["rolling_avg"],
+            "last_critical_at": last_critical_at,
+            "days_since_last_critical": round(
+                (datetime.now(timezone.utc) - datetime.fromisoformat(last_critical_at)).total_seconds() / 86400, 1
+            ) if last_critical_at else None
+        }
+
+    return {"student_id": student_id, "window": window, "summary": summary, "trajectory": points}
+
+
+@router.get("/cohort")
+def get_cohort_distribution(
+    weeks: int = Query(12, ge=1, le=104),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role([UserRole.COUNSELOR, UserRole.ADMIN]))
+):
+    current_week = week_start(datetime.now(timezone.utc).date())
+    week_starts = [current_week - timedelta(weeks=i) for i in range(weeks - 1, -1, -1)]
+
+    buckets = week_cache.get_many(week_starts[:-1])
+    missing = [week for week in week_starts if week not in buckets]
+    computed = load_weekly_distribution(db, missing[0], current_week + timedelta(weeks=1))
+    for week in missing:
+        buckets[week] = computed.get(week, [])
+        if week != current_week:
+            week_cache.store(week, buckets[week])
+
+    return [
+        {
+            "week_start": week.isoformat(),
+            "complete": week != current_week,
+            "total": sum(bucket["count"] for bucket in buckets[week]),
+            "severity": buckets[week]
+        }
+        for week in week_starts
+    ]
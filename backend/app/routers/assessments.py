@@ -1,14 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import and_, or_
+from typing import List, Optional
 from datetime import datetime
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.security import get_current_user, require_role
 from app.models.models import User, Assessment, UserRole
+from app.utils.pagination import decode_cursor, encode_cursor, parse_cursor_datetime, parse_cursor_int, set_next_cursor
 import json
 
 router = APIRouter(prefix="/api/assessments", tags=["Assessments"])
 
+CRITICAL_SEVERITY = "Critical - Immediate support recommended"
+FOLLOWUP_SEVERITIES = [CRITICAL_SEVERITY, "Concerning - Multiple challenges"]
+
+# Columns read by the list endpoints; the responses blob is only loaded for
+# the per-student detail view.
+SUMMARY_COLUMNS = (
+    Assessment.id,
+    Assessment.assessment_type,
+    Assessment.score,
+    Assessment.severity_level,
+    Assessment.mental_health_score,
+    Assessment.emotional_health_score,
+    Assessment.social_health_score,
+    Assessment.needs_awareness_score,
+    Assessment.created_at
+)
+
+
+def breakdown(row) -> dict:
+    return {
+        "mental_health": row.mental_health_score,
+        "emotional_health": row.emotional_health_score,
+        "social_health": row.social_health_score,
+        "needs_awareness": row.needs_awareness_score
+    }
+
+
+def assessment_summary(row) -> dict:
+    return {
+        "id": row.id,
+        "assessment_type": row.assessment_type,
+        "total_score": row.score,
+        "severity_level": row.severity_level,
+        "breakdown": breakdown(row),
+        "created_at": row.created_at.isoformat()
+    }
+
 def calculate_severity(total_score: int, max_score: int) -> str:
     percentage = (total_score / max_score) * 100
     
@@ -26,7 +66,7 @@ def calculate_severity(total_score: int, max_score: int) -> str:
 @router.post("/submit")
 async def submit_assessment(
     responses: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.STUDENT]))
 ):
     try:
@@ -49,19 +89,19 @@ async def submit_assessment(
             assessment_type="Mental Health Self-Assessment",
             score=total_score,
             severity_level=severity,
+            mental_health_score=mental_health,
+            emotional_health_score=emotional_health,
+            social_health_score=social_health,
+            needs_awareness_score=needs_awareness,
+            needs_followup=severity in FOLLOWUP_SEVERITIES,
             responses=json.dumps({
                 'questions': questions,
-                'mental_health_score': mental_health,
-                'emotional_health_score': emotional_health,
-                'social_health_score': social_health,
-                'needs_awareness_score': needs_awareness,
                 'notes': responses.get('notes', '')
             })
         )
         
         db.add(new_assessment)
-        db.commit()
-        db.refresh(new_assessment)
+        await db.commit()
         
         # Notify counselors in real-time
         try:
@@ -76,10 +116,10 @@ async def submit_assessment(
                 "total_score": total_score,
                 "max_score": max_score,
                 "percentage": round((total_score / max_score) * 100, 1),
-                "needs_followup": severity in ["Critical - Immediate support recommended", "Concerning - Multiple challenges"],
+                "needs_followup": new_assessment.needs_followup,
                 "timestamp": datetime.utcnow().isoformat()
             }
-            await notification_manager.broadcast_to_role("counselor", notification_data, db)
+            await notification_manager.broadcast_to_role("counselor", notification_data)
             print(f"✓ Notified counselors about new assessment from {current_user.full_name}")
         except Exception as e:
             print(f"Failed to send notification: {e}")
@@ -102,7 +142,7 @@ async def submit_assessment(
         
     except Exception as e:
         print(f"Error submitting assessment: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/my-assessments")
@@ -110,116 +150,97 @@ def get_my_assessments(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    assessments = db.query(Assessment).filter(
+    rows = db.query(*SUMMARY_COLUMNS).filter(
         Assessment.student_id == current_user.id
     ).order_by(Assessment.created_at.desc()).all()
-    
-    results = []
-    for assessment in assessments:
-        response_data = json.loads(assessment.responses) if assessment.responses else {}
-        results.append({
-            "id": assessment.id,
-            "assessment_type": assessment.assessment_type,
-            "total_score": assessment.score,
-            "severity_level": assessment.severity_level,
-            "breakdown": {
-                "mental_health": response_data.get('mental_health_score', 0),
-                "emotional_health": response_data.get('emotional_health_score', 0),
-                "social_health": response_data.get('social_health_score', 0),
-                "needs_awareness": response_data.get('needs_awareness_score', 0)
-            },
-            "created_at": assessment.created_at.isoformat()
-        })
-    
-    return results
+
+    return [assessment_summary(row) for row in rows]
 
 @router.get("/recent")
 def get_recent_assessment(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.STUDENT]))
 ):
-    assessment = db.query(Assessment).filter(
+    row = db.query(*SUMMARY_COLUMNS).filter(
         Assessment.student_id == current_user.id
     ).order_by(Assessment.created_at.desc()).first()
-    
-    if not assessment:
+
+    if not row:
         return None
-    
-    response_data = json.loads(assessment.responses) if assessment.responses else {}
-    
-    return {
-        "id": assessment.id,
-        "assessment_type": assessment.assessment_type,
-        "total_score": assessment.score,
-        "severity_level": assessment.severity_level,
-        "breakdown": {
-            "mental_health": response_data.get('mental_health_score', 0),
-            "emotional_health": response_data.get('emotional_health_score', 0),
-            "social_health": response_data.get('social_health_score', 0),
-            "needs_awareness": response_data.get('needs_awareness_score', 0)
-        },
-        "created_at": assessment.created_at.isoformat()
-    }
 
-@router.get("/all", dependencies=[Depends(require_role([UserRole.COUNSELOR, UserRole.ADMIN]))])
+    return assessment_summary(row)
+
+@router.get("/all")
 def get_all_assessments(
+    response: Response,
+    needs_followup: Optional[bool] = Query(None),
+    severity: Optional[List[str]] = Query(None, description="Severity levels to include"),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_role([UserRole.COUNSELOR, UserRole.ADMIN]))
 ):
-    assessments = db.query(Assessment).order_by(Assessment.created_at.desc()).limit(50).all()
-    
-    results = []
-    for assessment in assessments:
-        student = db.query(User).filter(User.id == assessment.student_id).first()
-        response_data = json.loads(assessment.responses) if assessment.responses else {}
-        
-        results.append({
-            "id": assessment.id,
-            "student_id": assessment.student_id,
-            "student_name": student.full_name if student else "Unknown",
-            "student_email": student.email if student else "Unknown",
-            "assessment_type": assessment.assessment_type,
-            "total_score": assessment.score,
-            "severity_level": assessment.severity_level,
-            "breakdown": {
-                "mental_health": response_data.get('mental_health_score', 0),
-                "emotional_health": response_data.get('emotional_health_score', 0),
-                "social_health": response_data.get('social_health_score', 0),
-                "needs_awareness": response_data.get('needs_awareness_score', 0)
-            },
-            "created_at": assessment.created_at.isoformat(),
-            "needs_followup": assessment.severity_level in ["Critical - Immediate support recommended", "Concerning - Multiple challenges"]
-        })
-    
-    return results
+    query = db.query(
+        *SUMMARY_COLUMNS, Assessment.student_id, Assessment.needs_followup,
+        User.full_name.label("student_name"), User.email.label("student_email")
+    ).join(User, User.id == Assessment.student_id)
+
+    if needs_followup is not None:
+        query = query.filter(Assessment.needs_followup == needs_followup)
+    if severity:
+        query = query.filter(Assessment.severity_level.in_(severity))
+    if date_from:
+        query = query.filter(Assessment.created_at >= date_from)
+    if date_to:
+        query = query.filter(Assessment.created_at < date_to)
 
-@router.get("/student/{student_id}", dependencies=[Depends(require_role([UserRole.COUNSELOR, UserRole.ADMIN]))])
+    # Newest first, keyset on (created_at, id)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, 2)
+        created_at, last_id = parse_cursor_datetime(created_at), parse_cursor_int(last_id)
+        query = query.filter(
+            or_(
+                Assessment.created_at < created_at,
+                and_(Assessment.created_at == created_at, Assessment.id < last_id)
+            )
+        )
+
+    rows = query.order_by(Assessment.created_at.desc(), Assessment.id.desc()).limit(limit + 1).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        set_next_cursor(response, encode_cursor(rows[-1].created_at, rows[-1].id))
+
+    return [
+        {
+            **assessment_summary(row),
+            "student_id": row.student_id,
+            "student_name": row.student_name,
+            "student_email": row.student_email,
+            "needs_followup": row.needs_followup
+        }
+        for row in rows
+    ]
+
+@router.get("/student/{student_id}")
 def get_student_assessments(
     student_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_role([UserRole.COUNSELOR, UserRole.ADMIN]))
 ):
-    assessments = db.query(Assessment).filter(
+    rows = db.query(*SUMMARY_COLUMNS, Assessment.responses).filter(
         Assessment.student_id == student_id
     ).order_by(Assessment.created_at.desc()).all()
-    
+
     results = []
-    for assessment in assessments:
-        response_data = json.loads(assessment.responses) if assessment.responses else {}
+    for row in rows:
+        response_data = json.loads(row.responses) if row.responses else {}
         results.append({
-            "id": assessment.id,
-            "assessment_type": assessment.assessment_type,
-            "total_score": assessment.score,
-            "severity_level": assessment.severity_level,
-            "breakdown": {
-                "mental_health": response_data.get('mental_health_score', 0),
-                "emotional_health": response_data.get('emotional_health_score', 0),
-                "social_health": response_data.get('social_health_score', 0),
-                "needs_awareness": response_data.get('needs_awareness_score', 0)
-            },
+            **assessment_summary(row),
             "questions": response_data.get('questions', []),
-            "notes": response_data.get('notes', ''),
-            "created_at": assessment.created_at.isoformat()
+            "notes": response_data.get('notes', '')
         })
-    
+
     return results
@@ -1,28 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.database import get_async_db, get_db
+from app.core.hashing import password_hasher
+from app.core.config import settings
+from app.core.security import create_access_token, create_refresh_token, decode_token, principal_cache
+from app.core.tokens import REFRESH
 from app.models.models import User, CounselorProfile, UserRole
-from app.schemas.schemas import StudentRegister, CounselorRegister, UserLogin, Token, UserResponse
+from app.schemas.schemas import StudentRegister, CounselorRegister, UserLogin, Token, UserResponse, RefreshRequest
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
+def issue_tokens(user: User) -> dict:
+    return {
+        "access_token": create_access_token(data={"sub": user.email}),
+        "refresh_token": create_refresh_token(data={"sub": user.email}),
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "token_type": "bearer",
+        "user": user
+    }
+
+
 @router.post("/register/student", response_model=Token, status_code=status.HTTP_201_CREATED)
-def register_student(user_data: StudentRegister, db: Session = Depends(get_db)):
+async def register_student(user_data: StudentRegister, db: AsyncSession = Depends(get_async_db)):
     try:
         username = user_data.email.split('@')[0]
 
-        if db.query(User).filter(User.email == user_data.email).first():
+        if await db.scalar(select(User.id).where(User.email == user_data.email)):
             raise HTTPException(status_code=400, detail="Email already registered")
 
-        if db.query(User).filter(User.username == username).first():
+        if await db.scalar(select(User.id).where(User.username == username)):
             raise HTTPException(status_code=400, detail="Student ID already registered")
 
         new_user = User(
             username=username,
             email=user_data.email,
-            hashed_password=get_password_hash(user_data.password),
+            hashed_password=await password_hasher.hash(user_data.password),
             full_name=user_data.full_name,
             phone_number=user_data.phone_number,
             residence_status=user_data.residence_status,
@@ -32,35 +47,29 @@ def register_student(user_data: StudentRegister, db: Session = Depends(get_db)):
         )
 
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
 
-        access_token = create_access_token(data={"sub": new_user.email})
-
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "user": new_user
-        }
+        return issue_tokens(new_user)
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Registration failed: {str(e)}")
 
 
 @router.post("/register/counselor", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_counselor(counselor_data: CounselorRegister, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.username == counselor_data.username).first():
+async def register_counselor(counselor_data: CounselorRegister, db: AsyncSession = Depends(get_async_db)):
+    if await db.scalar(select(User.id).where(User.username == counselor_data.username)):
         raise HTTPException(status_code=400, detail="Username already exists")
 
-    if db.query(User).filter(User.email == counselor_data.email).first():
+    if await db.scalar(select(User.id).where(User.email == counselor_data.email)):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     new_user = User(
         username=counselor_data.username,
         email=counselor_data.email,
-        hashed_password=get_password_hash(counselor_data.password),
+        hashed_password=await password_hasher.hash(counselor_data.password),
         full_name=counselor_data.full_name,
         phone_number=counselor_data.phone_number,
         role=UserRole.COUNSELOR,
@@ -69,7 +78,7 @@ def register_counselor(counselor_data: CounselorRegister, db: Session = Depends(
     )
 
     db.add(new_user)
-    db.flush()
+    await db.flush()
 
     counselor_profile = CounselorProfile(
         user_id=new_user.id,
@@ -82,32 +91,51 @@ def register_counselor(counselor_data: CounselorRegister, db: Session = Depends(
     )
 
     db.add(counselor_profile)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return new_user
 
 
 @router.post("/login", response_model=Token)
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == credentials.email).first()
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == credentials.email))
 
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not user or not await password_hasher.verify(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
 
+    # Upgrade hashes made with an older work factor while we have the password
+    if password_hasher.needs_update(user.hashed_password):
+        user.hashed_password = await password_hasher.hash(credentials.password)
+        await db.commit()
+        principal_cache.invalidate(user.email)
+
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Account is pending approval"
         )
 
-    access_token = create_access_token(data={"sub": user.email})
+    return issue_tokens(user)
 
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": user
-    }
\ No newline at end of file
+
+@router.post("/refresh", response_model=Token)
+def refresh(request: RefreshRequest, db: Session = Depends(get_db)):
+    payload = decode_token(request.refresh_token, REFRESH)
+    if payload is None or payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+
+    user = db.query(User).filter(User.email == payload["sub"]).first()
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+
+    return issue_tokens(user)
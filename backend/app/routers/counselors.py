@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
+from sqlalchemy import func, case
+from typing import Dict, List, Optional
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.models import User, UserRole, CounselorProfile, Ticket, TicketStatus, Schedule
@@ -27,12 +27,59 @@ class SuggestedCounselor(BaseModel):
         from_attributes = True
 
 
+ACTIVE_TICKET_STATUSES = [TicketStatus.ASSIGNED, TicketStatus.ACTIVE, TicketStatus.FOLLOW_UP]
+
+
+def load_counselor_stats(db: Session, counselor_ids: List[int], student_id: int) -> Dict[int, dict]:
+    """Collect workload, continuity, modality and rating aggregates for many
+    counselors in two grouped queries instead of several per counselor."""
+    stats = {
+        counselor_id: {
+            "active_tickets": 0,
+            "past_tickets": 0,
+            "in_person_sessions": 0,
+            "online_sessions": 0,
+            "avg_rating": None,
+        }
+        for counselor_id in counselor_ids
+    }
+    if not counselor_ids:
+        return stats
+
+    ticket_rows = db.query(
+        Ticket.counselor_id,
+        func.count(case((Ticket.status.in_(ACTIVE_TICKET_STATUSES), 1))),
+        func.count(case((Ticket.student_id == student_id, 1)))
+    ).filter(
+        Ticket.counselor_id.in_(counselor_ids)
+    ).group_by(Ticket.counselor_id).all()
+
+    for counselor_id, active_tickets, past_tickets in ticket_rows:
+        stats[counselor_id]["active_tickets"] = active_tickets
+        stats[counselor_id]["past_tickets"] = past_tickets
+
+    schedule_rows = db.query(
+        Schedule.counselor_id,
+        func.count(case((Schedule.meeting_type == "in-person", 1))),
+        func.count(case((Schedule.meeting_type == "online", 1))),
+        func.avg(Schedule.rating)
+    ).filter(
+        Schedule.counselor_id.in_(counselor_ids)
+    ).group_by(Schedule.counselor_id).all()
+
+    for counselor_id, in_person_sessions, online_sessions, avg_rating in schedule_rows:
+        stats[counselor_id]["in_person_sessions"] = in_person_sessions
+        stats[counselor_id]["online_sessions"] = online_sessions
+        stats[counselor_id]["avg_rating"] = avg_rating
+
+    return stats
+
+
 def score_counselor(
-    counselor: User,
     profile: CounselorProfile,
     student: User,
     category: Optional[str],
-    db: Session
+    stats: dict
 ) -> tuple[float, list[str]]:
     score = 0.0
     reasons = []
@@ -56,10 +103,7 @@ def score_counselor(
                 reasons.append(f"Experience related to {category}")
 
     # Workload check
-    active_ticket_count = db.query(Ticket).filter(
-        Ticket.counselor_id == counselor.id,
-        Ticket.status.in_([TicketStatus.ASSIGNED, TicketStatus.ACTIVE, TicketStatus.FOLLOW_UP])
-    ).count()
+    active_ticket_count = stats["active_tickets"]
 
     max_tickets = profile.max_active_tickets or 10
     load_ratio = active_ticket_count / max_tickets
@@ -78,10 +122,7 @@ def score_counselor(
         reasons.append("Limited availability")
 
     # Continuity of care
-    past_tickets = db.query(Ticket).filter(
-        Ticket.student_id == student.id,
-        Ticket.counselor_id == counselor.id
-    ).count()
+    past_tickets = stats["past_tickets"]
 
     if past_tickets > 0:
         score += 20
@@ -90,19 +131,11 @@ def score_counselor(
     # Residence preference
     if student.residence_status:
         if student.residence_status == "on_campus":
-            in_person_sessions = db.query(Schedule).filter(
-                Schedule.counselor_id == counselor.id,
-                Schedule.meeting_type == "in-person"
-            ).count()
-            if in_person_sessions > 0:
+            if stats["in_person_sessions"] > 0:
                 score += 10
                 reasons.append("Offers in-person sessions")
         elif student.residence_status == "off_campus":
-            online_sessions = db.query(Schedule).filter(
-                Schedule.counselor_id == counselor.id,
-                Schedule.meeting_type == "online"
-            ).count()
-            if online_sessions > 0:
+            if stats["online_sessions"] > 0:
                 score += 10
                 reasons.append("Offers online sessions")
 
@@ -119,10 +152,7 @@ def score_counselor(
         reasons.append(f"{yoe} years of experience")
 
     # Session ratings
-    avg_rating = db.query(func.avg(Schedule.rating)).filter(
-        Schedule.counselor_id == counselor.id,
-        Schedule.rating.isnot(None)
-    ).scalar()
+    avg_rating = stats["avg_rating"]
 
     if avg_rating:
         if avg_rating >= 4.5:
@@ -173,25 +203,23 @@ def suggest_counselors(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    counselors = db.query(User).filter(
+    rows = db.query(User, CounselorProfile).join(
+        CounselorProfile, CounselorProfile.user_id == User.id
+    ).filter(
         User.role == UserRole.COUNSELOR,
-        User.is_active == True
-    ).all()
+        User.is_active == True,
+        CounselorProfile.is_available == True
+    ).order_by(User.id).all()
 
-    scored = []
-    for counselor in counselors:
-        profile = db.query(CounselorProfile).filter(
-            CounselorProfile.user_id == counselor.id
-        ).first()
-        if not profile or not profile.is_available:
-            continue
+    stats = load_counselor_stats(db, [counselor.id for counselor, _ in rows], current_user.id)
 
+    scored = []
+    for counselor, profile in rows:
         score, reasons = score_counselor(
-            counselor=counselor,
             profile=profile,
             student=current_user,
             category=category,
-            db=db
+            stats=stats[counselor.id]
         )
 
         if score > 0:
@@ -1,82 +1,90 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from sqlalchemy.orm import Session
-from typing import Dict, List
-from app.core.database import get_db
-from app.core.security import decode_token
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from typing import Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.connections import connection_supervisor, send_all
+from app.core.database import SessionLocal
+from app.core.security import decode_token, load_principal
 from app.models.models import User
-import json
+import asyncio
 
 router = APIRouter()
 
 class NotificationManager:
-    def __init__(self):
-        self.active_connections: Dict[int, List[WebSocket]] = {}
+    def __init__(self, send_timeout: float = settings.WS_SEND_TIMEOUT_SECONDS):
+        self.active_connections: Dict[int, Set[WebSocket]] = {}
+        self.role_connections: Dict[str, Set[WebSocket]] = {}
+        self.socket_index: Dict[WebSocket, Tuple[int, str]] = {}
+        self.send_timeout = send_timeout
     
-    async def connect(self, websocket: WebSocket, user_id: int):
+    async def connect(self, websocket: WebSocket, user_id: int, role: str):
         await websocket.accept()
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = []
-        self.active_connections[user_id].append(websocket)
+        self.active_connections.setdefault(user_id, set()).add(websocket)
+        self.role_connections.setdefault(role, set()).add(websocket)
+        self.socket_index[websocket] = (user_id, role)
         print(f"User {user_id} connected to notifications. Total connections: {len(self.active_connections)}")
     
+    def _remove(self, websocket: WebSocket):
+        connection_supervisor.release(websocket)
+        entry = self.socket_index.pop(websocket, None)
+        if entry is None:
+            return
+        user_id, role = entry
+        for index, key in ((self.active_connections, user_id), (self.role_connections, role)):
+            sockets = index.get(key)
+            if sockets is not None:
+                sockets.discard(websocket)
+                if not sockets:
+                    del index[key]
+
     def disconnect(self, websocket: WebSocket, user_id: int):
-        if user_id in self.active_connections:
-            if websocket in self.active_connections[user_id]:
-                self.active_connections[user_id].remove(websocket)
-            if not self.active_connections[user_id]:
-                del self.active_connections[user_id]
+        self._remove(websocket)
         print(f"User {user_id} disconnected from notifications")
-    
+
     async def send_to_user(self, user_id: int, message: dict):
-        if user_id in self.active_connections:
-            disconnected = []
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except:
-                    disconnected.append(connection)
-            
-            for conn in disconnected:
-                if conn in self.active_connections[user_id]:
-                    self.active_connections[user_id].remove(conn)
+        await send_all(self.active_connections.get(user_id, ()), message, self._remove, self.send_timeout)
     
-    async def broadcast_to_role(self, role: str, message: dict, db: Session):
-        users = db.query(User).filter(User.role == role, User.is_active == True).all()
-        for user in users:
-            await self.send_to_user(user.id, message)
+    async def broadcast_to_role(self, role: str, message: dict):
+        await send_all(self.role_connections.get(role, ()), message, self._remove, self.send_timeout)
 
 notification_manager = NotificationManager()
 
+def authorize_notifications(token: str) -> Optional[User]:
+    """Resolve the socket's user in a short-lived session; the socket never
+    needs the database again."""
+    payload = decode_token(token)
+    if not payload:
+        return None
+
+    with SessionLocal() as db:
+        user = load_principal(db, payload.get("sub"))
+        if not user or not user.is_active:
+            return None
+        return user
+
+
 @router.websocket("/ws/notifications")
 async def websocket_notifications(
     websocket: WebSocket,
-    token: str,
-    db: Session = Depends(get_db)
+    token: str
 ):
     user = None
     user_id = None
     
     try:
-        payload = decode_token(token)
-        if not payload:
-            await websocket.close(code=1008)
-            return
-        
-        email = payload.get("sub")
-        user = db.query(User).filter(User.email == email).first()
-        
+        user = await asyncio.get_running_loop().run_in_executor(None, authorize_notifications, token)
         if not user:
             await websocket.close(code=1008)
             return
         
         user_id = user.id
-        await notification_manager.connect(websocket, user.id)
+        if not await connection_supervisor.admit(websocket, user.id, "notifications", notification_manager._remove):
+            return
+        await notification_manager.connect(websocket, user.id, user.role.value)
         
-        # Keep connection alive
+        # The supervisor pings; any frame from the client counts as a pong
         while True:
-            data = await websocket.receive_text()
-            # Echo back to confirm connection is alive
-            await websocket.send_json({"type": "ping", "status": "alive"})
+            await websocket.receive_text()
+            connection_supervisor.touch(websocket)
             
     except WebSocketDisconnect:
         if user_id:
@@ -1,34 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import date as date_type, datetime, timedelta
 from app.core.database import get_db
 from app.core.security import get_current_user, require_role
-from app.models.models import User, Schedule, UserRole
-from app.schemas.schemas import ScheduleCreate, ScheduleResponse
+from app.models.models import User, Schedule, CounselorWorkingHours, UserRole
+from app.schemas.schemas import ScheduleCreate, ScheduleResponse, WorkingHoursEntry
+from app.utils.availability import (
+    LOCAL_TZ, find_overlap, free_slots, load_busy, load_working_hours, within_working_hours
+)
+from app.utils.email_utils import send_schedule_decision_notification
+from app.utils.idempotency import claim_key, complete_key, fingerprint
 
 router = APIRouter(prefix="/api/schedules", tags=["Schedules"])
 
 @router.post("/", response_model=ScheduleResponse, status_code=status.HTTP_201_CREATED)
 def create_schedule(
     schedule_data: ScheduleCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=200),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.STUDENT]))
 ):
+    if idempotency_key:
+        replay = claim_key(db, current_user.id, "schedules.create", idempotency_key, fingerprint(schedule_data))
+        if replay:
+            return replay
+
     scheduled_time = schedule_data.scheduled_at
-    
-    existing_schedule = db.query(Schedule).filter(
-        Schedule.counselor_id == schedule_data.counselor_id,
-        Schedule.scheduled_at == scheduled_time,
-        Schedule.status.in_(['pending', 'scheduled', 'confirmed'])
-    ).first()
-    
-    if existing_schedule:
+    if scheduled_time.tzinfo is None:
+        scheduled_time = scheduled_time.replace(tzinfo=LOCAL_TZ)
+    end_time = scheduled_time + timedelta(minutes=schedule_data.duration_minutes or 60)
+
+    weekly = load_working_hours(db, [schedule_data.counselor_id])[schedule_data.counselor_id]
+    if not within_working_hours(weekly, scheduled_time, end_time):
+        raise HTTPException(
+            status_code=400,
+            detail="This time is outside the counselor's working hours. Please choose another time."
+        )
+
+    if find_overlap(db, schedule_data.counselor_id, scheduled_time, end_time):
         raise HTTPException(
             status_code=400,
             detail="This time slot is already booked. Please choose another time."
         )
-    
+
     new_schedule = Schedule(
         student_id=current_user.id,
         counselor_id=schedule_data.counselor_id,
@@ -40,11 +56,29 @@ def create_schedule(
         notes=schedule_data.notes,
         status='pending'  # Changed from 'scheduled' to 'pending'
     )
-    
+
     db.add(new_schedule)
+    try:
+        db.flush()
+    except IntegrityError as e:
+        db.rollback()
+        # schedules_no_overlap caught a booking that landed after our check
+        if getattr(e.orig, "pgcode", None) != "23P01":
+            raise
+        raise HTTPException(
+            status_code=400,
+            detail="This time slot is already booked. Please choose another time."
+        )
+    db.refresh(new_schedule)
+
+    if idempotency_key:
+        complete_key(
+            db, current_user.id, "schedules.create", idempotency_key, status.HTTP_201_CREATED,
+            ScheduleResponse.model_validate(new_schedule).model_dump(mode="json")
+        )
     db.commit()
     db.refresh(new_schedule)
-    
+
     print(f"✓ Schedule created: ID={new_schedule.id}, Status=pending (awaiting counselor approval)")
     
     return new_schedule
@@ -108,6 +142,9 @@ def approve_schedule(
         raise HTTPException(status_code=400, detail="Only pending schedules can be approved")
     
     schedule.status = 'confirmed'
+    student = db.query(User).filter(User.id == schedule.student_id).first()
+    if student:
+        send_schedule_decision_notification(db, student, current_user, schedule, approved=True)
     db.commit()
     
     print(f"✓ Schedule {schedule_id} approved by counselor {current_user.full_name}")
@@ -136,6 +173,9 @@ def decline_schedule(
     schedule.status = 'declined'
     if reason:
         schedule.notes = f"Declined: {reason}" if not schedule.notes else f"{schedule.notes}\n\nDeclined: {reason}"
+    student = db.query(User).filter(User.id == schedule.student_id).first()
+    if student:
+        send_schedule_decision_notification(db, student, current_user, schedule, approved=False, reason=reason)
     db.commit()
     
     print(f"✓ Schedule {schedule_id} declined by counselor {current_user.full_name}")
@@ -201,6 +241,91 @@ def get_booked_slots(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format")
 
+@router.get("/free-slots")
+def get_free_slots(
+    counselor_ids: Optional[List[int]] = Query(None, description="Defaults to every active counselor"),
+    start_date: Optional[date_type] = Query(None, description="Defaults to tomorrow"),
+    days: int = Query(7, ge=1, le=31),
+    duration_minutes: int = Query(60, ge=15, le=240),
+    step_minutes: Optional[int] = Query(None, ge=5, le=240, description="Defaults to duration_minutes"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Open slots for many counselors over many days, from two queries."""
+    if not counselor_ids:
+        counselor_ids = [
+            counselor_id for (counselor_id,) in db.query(User.id).filter(
+                User.role.in_([UserRole.COUNSELOR, UserRole.PEER_COUNSELOR]),
+                User.is_active == True
+            ).order_by(User.id)
+        ]
+    if len(counselor_ids) > 100:
+        raise HTTPException(status_code=400, detail="At most 100 counselors per request")
+
+    now = datetime.now(LOCAL_TZ)
+    start_date = start_date or now.date() + timedelta(days=1)
+    day_list = [start_date + timedelta(days=i) for i in range(days)]
+    range_start = datetime.combine(start_date, datetime.min.time(), LOCAL_TZ)
+    range_end = datetime.combine(day_list[-1] + timedelta(days=1), datetime.min.time(), LOCAL_TZ)
+
+    duration = timedelta(minutes=duration_minutes)
+    step = timedelta(minutes=step_minutes or duration_minutes)
+    hours = load_working_hours(db, counselor_ids)
+    busy = load_busy(db, counselor_ids, range_start, range_end)
+
+    return [
+        {
+            "counselor_id": counselor_id,
+            "slots": {
+                day.isoformat(): [slot.isoformat() for slot in day_slots]
+                for day, day_slots in free_slots(
+                    hours[counselor_id], busy[counselor_id], day_list, duration, step, not_before=now
+                ).items()
+            }
+        }
+        for counselor_id in counselor_ids
+    ]
+
+@router.get("/working-hours/{counselor_id}", response_model=List[WorkingHoursEntry])
+def get_working_hours(
+    counselor_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    weekly = load_working_hours(db, [counselor_id])[counselor_id]
+    return [
+        WorkingHoursEntry(weekday=weekday, start_time=start, end_time=end)
+        for weekday in sorted(weekly)
+        for start, end in weekly[weekday]
+    ]
+
+@router.put("/working-hours", response_model=List[WorkingHoursEntry])
+def set_working_hours(
+    entries: List[WorkingHoursEntry],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role([UserRole.COUNSELOR, UserRole.PEER_COUNSELOR]))
+):
+    """Replace the current counselor's weekly hours. Existing bookings are
+    left alone; the hours only govern new ones."""
+    for entry in entries:
+        if entry.start_time >= entry.end_time:
+            raise HTTPException(status_code=400, detail="start_time must be before end_time")
+
+    db.query(CounselorWorkingHours).filter(CounselorWorkingHours.counselor_id == current_user.id).delete()
+    db.add_all([
+        CounselorWorkingHours(
+            counselor_id=current_user.id,
+            weekday=entry.weekday,
+            start_time=entry.start_time,
+            end_time=entry.end_time
+        )
+        for entry in entries
+    ])
+    db.commit()
+
+    print(f"✓ Working hours updated for counselor {current_user.full_name}")
+    return get_working_hours(current_user.id, db, current_user)
+
 @router.get("/", response_model=List[ScheduleResponse])
 def get_all_schedules(
     db: Session = Depends(get_db),
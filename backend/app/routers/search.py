@@ -0,0 +1,130 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, literal_column, select
+from typing import Optional
+import html
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models.models import (
+    User, Ticket, Message, UserRole, SEARCH_CONFIG,
+    ticket_search_document, message_search_document
+)
+
+router = APIRouter(prefix="/api/search", tags=["Search"])
+
+# ts_headline wraps matches in these control characters; they are turned into
+# <mark> tags after the rest of the snippet has been HTML-escaped.
+MARK_START = "\x02"
+MARK_STOP = "\x03"
+HEADLINE_OPTIONS = f"StartSel={MARK_START}, StopSel={MARK_STOP}, MaxWords=25, MinWords=8, MaxFragments=2"
+
+
+def render_snippet(snippet: Optional[str]) -> Optional[str]:
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(MARK_START, "<mark>").replace(MARK_STOP, "</mark>")
+
+
+def like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def scope_tickets(query, current_user: User):
+    """Same visibility as /api/tickets/my-tickets."""
+    if current_user.role == UserRole.STUDENT:
+        return query.filter(Ticket.student_id == current_user.id)
+    if current_user.role in [UserRole.COUNSELOR, UserRole.PEER_COUNSELOR]:
+        return query.filter(Ticket.counselor_id == current_user.id)
+    return query
+
+
+def search_tickets(db: Session, current_user: User, q: str, limit: int) -> list:
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    document = ticket_search_document()
+    pattern = like_pattern(q)
+
+    rank = func.greatest(
+        func.ts_rank_cd(document, ts_query),
+        func.similarity(Ticket.ticket_number, q),
+        func.similarity(Ticket.category, q)
+    ).label("rank")
+
+    query = db.query(Ticket.id, rank).filter(
+        or_(
+            document.op("@@")(ts_query),
+            Ticket.ticket_number.ilike(pattern, escape="\\"),
+            Ticket.category.ilike(pattern, escape="\\")
+        )
+    )
+    top = scope_tickets(query, current_user).order_by(rank.desc(), Ticket.id.desc()).limit(limit).subquery()
+
+    # Headlines are only computed for the rows that made the page
+    rows = db.execute(
+        select(
+            Ticket.id, Ticket.ticket_number, Ticket.category, Ticket.status, Ticket.created_at, top.c.rank,
+            func.ts_headline(
+                SEARCH_CONFIG, func.coalesce(Ticket.initial_message, literal_column("''")),
+                ts_query, HEADLINE_OPTIONS
+            ).label("snippet")
+        ).join(top, top.c.id == Ticket.id).order_by(top.c.rank.desc(), Ticket.id.desc())
+    ).all()
+
+    return [
+        {
+            "id": row.id,
+            "ticket_number": row.ticket_number,
+            "category": row.category,
+            "status": row.status.value,
+            "created_at": row.created_at.isoformat(),
+            "rank": round(float(row.rank), 4),
+            "snippet": render_snippet(row.snippet)
+        }
+        for row in rows
+    ]
+
+
+def search_messages(db: Session, current_user: User, q: str, limit: int) -> list:
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    document = message_search_document()
+    rank = func.ts_rank_cd(document, ts_query).label("rank")
+
+    query = db.query(Message.id, rank).join(Ticket, Ticket.id == Message.ticket_id).filter(
+        document.op("@@")(ts_query)
+    )
+    top = scope_tickets(query, current_user).order_by(rank.desc(), Message.id.desc()).limit(limit).subquery()
+
+    rows = db.execute(
+        select(
+            Message.id, Message.ticket_id, Message.sender_id, Message.created_at, top.c.rank,
+            func.ts_headline(SEARCH_CONFIG, Message.message, ts_query, HEADLINE_OPTIONS).label("snippet")
+        ).join(top, top.c.id == Message.id).order_by(top.c.rank.desc(), Message.id.desc())
+    ).all()
+
+    return [
+        {
+            "id": row.id,
+            "ticket_id": row.ticket_id,
+            "sender_id": row.sender_id,
+            "created_at": row.created_at.isoformat(),
+            "rank": round(float(row.rank), 4),
+            "snippet": render_snippet(row.snippet)
+        }
+        for row in rows
+    ]
+
+
+@router.get("")
+def search(
+    q: str = Query(..., min_length=2, max_length=200),
+    scope: str = Query("all", pattern="^(all|tickets|messages)$"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    q = q.strip()
+    return {
+        "query": q,
+        "tickets": search_tickets(db, current_user, q, limit) if scope in ("all", "tickets") else [],
+        "messages": search_messages(db, current_user, q, limit) if scope in ("all", "messages") else []
+    }
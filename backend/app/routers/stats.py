@@ -1,35 +1,39 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, timedelta
-from app.core.database import get_db
+from datetime import datetime, timedelta, timezone
+from app.core.counters import get_scope, rebuild_counters, sum_buckets
+from app.core.database import get_db, SessionLocal
 from app.core.security import get_current_user
-from app.models.models import User, Schedule, Ticket, TicketStatus
+from app.models.models import User, Schedule, Ticket, TicketStatus, StatCounter
 
 router = APIRouter(prefix="/api/stats", tags=["Statistics"])
 
 
-@router.get("")
-def get_platform_stats(db: Session = Depends(get_db)):
-    total_sessions = db.query(Schedule).filter(
-        Schedule.status.in_(['completed', 'confirmed'])
-    ).count()
+@router.on_event("startup")
+def bootstrap_counters():
+    db = SessionLocal()
+    try:
+        if db.query(StatCounter).first() is None:
+            rebuild_counters(db)
+            print("✓ Statistics counters rebuilt from source tables")
+    except Exception as e:
+        db.rollback()
+        print(f"Failed to bootstrap statistics counters: {e}")
+    finally:
+        db.close()
 
-    unique_students = db.query(func.count(func.distinct(Schedule.student_id))).filter(
-        Schedule.status.in_(['completed', 'confirmed'])
-    ).scalar() or 0
 
-    rated_schedules = db.query(Schedule).filter(
-        Schedule.rating.isnot(None),
-        Schedule.rating >= 4
-    ).count()
+@router.get("")
+def get_platform_stats(db: Session = Depends(get_db)):
+    platform = get_scope(db, "platform")
 
-    total_rated = db.query(Schedule).filter(Schedule.rating.isnot(None)).count()
+    rated_schedules = platform.get("ratings_high", 0)
+    total_rated = platform.get("ratings_total", 0)
     satisfaction_rate = round((rated_schedules / total_rated * 100), 1) if total_rated > 0 else 0
 
     return {
-        "total_sessions": total_sessions,
-        "students_served": unique_students,
+        "total_sessions": platform.get("sessions_served", 0),
+        "students_served": platform.get("students_served", 0),
         "satisfaction_rate": satisfaction_rate
     }
 
@@ -40,27 +44,15 @@ def get_counselor_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    total_sessions = db.query(Schedule).filter(
-        Schedule.counselor_id == counselor_id,
-        Schedule.status == 'completed'
-    ).count()
-
-    total_tickets = db.query(Ticket).filter(Ticket.counselor_id == counselor_id).count()
+    counselor = get_scope(db, "counselor", counselor_id)
 
-    resolved_tickets = db.query(Ticket).filter(
-        Ticket.counselor_id == counselor_id,
-        Ticket.status.in_([TicketStatus.RESOLVED, TicketStatus.CLOSED])
-    ).count()
-
-    avg_rating = db.query(func.avg(Schedule.rating)).filter(
-        Schedule.counselor_id == counselor_id,
-        Schedule.rating.isnot(None)
-    ).scalar() or 0
+    rating_count = counselor.get("rating_count", 0)
+    avg_rating = counselor.get("rating_sum", 0) / rating_count if rating_count else 0
 
     return {
-        "total_sessions": total_sessions,
-        "total_tickets": total_tickets,
-        "resolved_tickets": resolved_tickets,
+        "total_sessions": counselor.get("sessions_completed", 0),
+        "total_tickets": counselor.get("tickets_total", 0),
+        "resolved_tickets": counselor.get("tickets_resolved", 0),
         "average_rating": round(float(avg_rating), 2) if avg_rating else 0
     }
 
@@ -97,27 +89,20 @@ def get_dashboard_metrics(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    today = datetime.now().date()
+    today = datetime.now(timezone.utc).date()
     week_ago = today - timedelta(days=7)
 
-    new_tickets_today = db.query(Ticket).filter(
-        func.date(Ticket.created_at) == today
-    ).count()
+    new_tickets_today = sum_buckets(db, "tickets_created", today, today)
+    new_tickets_week = sum_buckets(db, "tickets_created", week_ago)
 
-    new_tickets_week = db.query(Ticket).filter(
-        func.date(Ticket.created_at) >= week_ago
-    ).count()
-
-    active_sessions = db.query(Schedule).filter(
-        Schedule.status.in_(['confirmed', 'pending']),
-        Schedule.scheduled_at >= datetime.now()
-    ).count()
+    # Confirmed or pending sessions scheduled for today onwards
+    active_sessions = sum_buckets(db, "open_sessions", today)
 
-    pending_tickets = db.query(Ticket).filter(Ticket.status == TicketStatus.NEW).count()
+    pending_tickets = get_scope(db, "ticket_status").get(TicketStatus.NEW.value, 0)
 
     return {
         "new_tickets_today": new_tickets_today,
         "new_tickets_week": new_tickets_week,
         "active_sessions": active_sessions,
         "pending_tickets": pending_tickets
-    }
\ No newline at end of file
+    }
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 from app.core.database import get_db
 from app.core.security import get_current_user, require_role
 from app.models.models import Ticket, User, UserRole, TicketStatus
+from app.routers.websocket import manager
 from app.schemas.schemas import TicketResponse
 
 router = APIRouter(prefix="/api/tickets", tags=["ticket_status"])
@@ -32,6 +33,7 @@ def validate_transition(current_status: TicketStatus, new_status: TicketStatus,
 def update_ticket_status(
     ticket_id: int,
     new_status: TicketStatus,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -61,19 +63,30 @@ def update_ticket_status(
 
     db.commit()
     db.refresh(ticket)
+    background_tasks.add_task(manager.sync_ticket_members, ticket.id, [ticket.student_id, ticket.counselor_id])
     return ticket
 
 
 @router.post("/{ticket_id}/assign", response_model=TicketResponse)
 def assign_ticket(
     ticket_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.COUNSELOR]))
 ):
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    # Lock the row so this claim, assign-to-me and the dispatcher serialize
+    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).with_for_update().populate_existing().first()
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
+    if ticket.counselor_id == current_user.id:
+        # A retried claim by the counselor who already holds it
+        db.rollback()
+        return ticket
+
+    if ticket.counselor_id:
+        raise HTTPException(status_code=409, detail="Ticket already assigned")
+
     if ticket.status != TicketStatus.NEW:
         raise HTTPException(status_code=400, detail="Only new tickets can be assigned")
 
@@ -83,6 +96,7 @@ def assign_ticket(
 
     db.commit()
     db.refresh(ticket)
+    background_tasks.add_task(manager.sync_ticket_members, ticket.id, [ticket.student_id, ticket.counselor_id])
     return ticket
 
 
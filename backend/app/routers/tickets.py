@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Response, status, Query
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_
 from typing import List, Optional
 from datetime import datetime
 from app.core.database import get_db
 from app.core.security import get_current_user, require_role
 from app.models.models import User, Ticket, Message, Note, UserRole, TicketStatus, CrisisLevel
-from app.schemas.schemas import TicketCreate, TicketResponse, TicketUpdate
-from app.utils.email_utils import send_new_ticket_notification
+from app.schemas.schemas import MessageResponse, TicketCreate, TicketResponse, TicketUpdate
+from app.routers.websocket import manager
+from app.utils.email_utils import send_crisis_alert, send_new_ticket_notification
+from app.utils.idempotency import claim_key, complete_key, fingerprint
+from app.utils.ticket_dispatcher import ticket_dispatcher
+from app.utils.pagination import decode_cursor, encode_cursor, parse_cursor_datetime, parse_cursor_int, set_next_cursor
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/tickets", tags=["Tickets"])
@@ -26,9 +30,15 @@ class SessionNoteResponse(BaseModel):
 @router.post("/", response_model=TicketResponse, status_code=status.HTTP_201_CREATED)
 def create_ticket(
     ticket_data: TicketCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=200),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.STUDENT]))
 ):
+    if idempotency_key:
+        replay = claim_key(db, current_user.id, "tickets.create", idempotency_key, fingerprint(ticket_data))
+        if replay:
+            return replay
+
     ticket_number = f"TKT-{datetime.utcnow().strftime('%Y%m%d')}-{current_user.id}-{datetime.utcnow().microsecond}"
 
     new_ticket = Ticket(
@@ -42,15 +52,35 @@ def create_ticket(
     )
 
     db.add(new_ticket)
+
+    if new_ticket.priority:
+        counselors = db.query(User).filter(
+            User.role.in_([UserRole.COUNSELOR, UserRole.PEER_COUNSELOR]),
+            User.is_active == True
+        ).all()
+        send_crisis_alert(db, counselors, new_ticket)
+
+    if idempotency_key:
+        db.flush()
+        db.refresh(new_ticket)
+        complete_key(
+            db, current_user.id, "tickets.create", idempotency_key, status.HTTP_201_CREATED,
+            TicketResponse.model_validate(new_ticket).model_dump(mode="json")
+        )
+
     db.commit()
     db.refresh(new_ticket)
+    ticket_dispatcher.wake()
     return new_ticket
 
 
 @router.get("/my-tickets", response_model=List[TicketResponse])
 def get_my_tickets(
+    response: Response,
     status_filter: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -72,17 +102,61 @@ def get_my_tickets(
             )
         )
 
-    return query.order_by(Ticket.created_at.desc()).all()
+    # Newest first, keyset on (created_at, id)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, 2)
+        created_at, last_id = parse_cursor_datetime(created_at), parse_cursor_int(last_id)
+        query = query.filter(
+            or_(
+                Ticket.created_at < created_at,
+                and_(Ticket.created_at == created_at, Ticket.id < last_id)
+            )
+        )
+
+    tickets = query.order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(limit + 1).all()
+
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        set_next_cursor(response, encode_cursor(tickets[-1].created_at, tickets[-1].id))
+    return tickets
 
 
 @router.get("/available", response_model=List[TicketResponse])
 def get_available_tickets(
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.COUNSELOR, UserRole.PEER_COUNSELOR, UserRole.ADMIN]))
 ):
-    return db.query(Ticket).filter(
+    query = db.query(Ticket).filter(
         Ticket.status.in_([TicketStatus.NEW, TicketStatus.ASSIGNED])
-    ).order_by(Ticket.priority.desc(), Ticket.created_at).all()
+    )
+
+    # Highest priority first, then oldest; keyset on (priority, created_at, id)
+    if cursor:
+        priority, created_at, last_id = decode_cursor(cursor, 3)
+        priority, created_at, last_id = parse_cursor_int(priority), parse_cursor_datetime(created_at), parse_cursor_int(last_id)
+        query = query.filter(
+            or_(
+                Ticket.priority < priority,
+                and_(
+                    Ticket.priority == priority,
+                    or_(
+                        Ticket.created_at > created_at,
+                        and_(Ticket.created_at == created_at, Ticket.id > last_id)
+                    )
+                )
+            )
+        )
+
+    tickets = query.order_by(Ticket.priority.desc(), Ticket.created_at, Ticket.id).limit(limit + 1).all()
+
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        last = tickets[-1]
+        set_next_cursor(response, encode_cursor(last.priority, last.created_at, last.id))
+    return tickets
 
 
 @router.get("/{ticket_id}", response_model=TicketResponse)
@@ -129,6 +203,7 @@ def update_ticket_basic(
 @router.delete("/{ticket_id}", status_code=status.HTTP_200_OK)
 def delete_ticket(
     ticket_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
@@ -138,19 +213,27 @@ def delete_ticket(
 
     db.delete(ticket)
     db.commit()
+    background_tasks.add_task(manager.sync_ticket_members, ticket_id, [])
     return {"success": True, "message": "Ticket deleted successfully"}
 
 
 @router.post("/{ticket_id}/assign-to-me", response_model=TicketResponse)
 def assign_ticket_to_me(
     ticket_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.COUNSELOR, UserRole.PEER_COUNSELOR]))
 ):
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    # Lock the row so concurrent claims queue up and see the winner's write
+    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).with_for_update().populate_existing().first()
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
+    if ticket.counselor_id == current_user.id:
+        # A retried claim by the counselor who already holds it
+        db.rollback()
+        return ticket
+
     if ticket.counselor_id:
         raise HTTPException(status_code=400, detail="Ticket already assigned")
 
@@ -158,11 +241,9 @@ def assign_ticket_to_me(
     ticket.assigned_at = datetime.utcnow()
     ticket.status = TicketStatus.ASSIGNED
 
-    db.commit()
-    db.refresh(ticket)
-
     student = db.query(User).filter(User.id == ticket.student_id).first()
     send_new_ticket_notification(
+        db,
         counselor_email=current_user.email,
         counselor_name=current_user.full_name,
         student_name=student.full_name if student else "A student",
@@ -171,10 +252,107 @@ def assign_ticket_to_me(
         initial_message=ticket.initial_message or ""
     )
 
+    db.commit()
+    db.refresh(ticket)
+    background_tasks.add_task(manager.sync_ticket_members, ticket.id, [ticket.student_id, ticket.counselor_id])
+
     return ticket
 
 
 
+def get_chat_ticket(db: Session, ticket_id: int, user: User) -> Ticket:
+    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+
+    if user.role != UserRole.ADMIN and user.id not in (ticket.student_id, ticket.counselor_id):
+        raise HTTPException(status_code=403, detail="Not authorized to view this chat")
+    return ticket
+
+
+@router.get("/{ticket_id}/messages", response_model=List[MessageResponse])
+def get_chat_messages(
+    ticket_id: int,
+    response: Response,
+    since: Optional[int] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Chat history for a ticket, oldest first.
+    Without `since`, returns the newest `limit` messages and X-Next-Cursor
+    pages back through older ones.
+    With `since` (the id of the last message the client has), returns the
+    messages after it, to fill the gap left by a dropped socket. Call again
+    with the last id returned while full pages come back. If that message
+    isn't stored (not written yet, or deleted), returns messages with a
+    higher id.
+    """
+    get_chat_ticket(db, ticket_id, current_user)
+
+    query = db.query(Message).options(joinedload(Message.sender)).filter(Message.ticket_id == ticket_id)
+
+    # Ordered by (created_at, id) rather than id alone: the message writer
+    # reserves ids in blocks per worker, so ids don't follow send order
+    if since is not None:
+        anchor_created = db.query(Message.created_at).filter(
+            Message.id == since, Message.ticket_id == ticket_id
+        ).scalar()
+        if anchor_created is None:
+            # Messages are broadcast before the message writer stores them, so
+            # a client can resync from one that isn't written yet
+            query = query.filter(Message.id > since)
+        else:
+            query = query.filter(
+                or_(
+                    Message.created_at > anchor_created,
+                    and_(Message.created_at == anchor_created, Message.id > since)
+                )
+            )
+        return query.order_by(Message.created_at, Message.id).limit(limit).all()
+
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, 2)
+        created_at, last_id = parse_cursor_datetime(created_at), parse_cursor_int(last_id)
+        query = query.filter(
+            or_(
+                Message.created_at < created_at,
+                and_(Message.created_at == created_at, Message.id < last_id)
+            )
+        )
+
+    messages = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1).all()
+
+    if len(messages) > limit:
+        messages = messages[:limit]
+        set_next_cursor(response, encode_cursor(messages[-1].created_at, messages[-1].id))
+    messages.reverse()
+    return messages
+
+
+@router.post("/{ticket_id}/messages/read", status_code=status.HTTP_200_OK)
+def mark_chat_messages_read(
+    ticket_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mark every unread message from the other participant as read."""
+    ticket = get_chat_ticket(db, ticket_id, current_user)
+    if current_user.id not in (ticket.student_id, ticket.counselor_id):
+        raise HTTPException(status_code=403, detail="Only chat participants can mark messages read")
+
+    updated = db.query(Message).filter(
+        Message.ticket_id == ticket_id,
+        Message.sender_id != current_user.id,
+        Message.is_read == False
+    ).update({Message.is_read: True}, synchronize_session=False)
+    db.commit()
+
+    return {"success": True, "updated": updated}
+
+
 @router.delete("/{ticket_id}/messages", status_code=status.HTTP_200_OK)
 def delete_chat_messages(
     ticket_id: int,
@@ -1,115 +1,333 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query, status
-from sqlalchemy.orm import Session
-from typing import Dict, List
-from app.core.database import get_db
-from app.core.security import decode_token
-from app.models.models import User, Ticket, Message
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, status
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional, Set, Tuple
+from app.core.broker import BrokerError, create_broker
+from app.core.config import settings
+from app.core.connections import close_socket, connection_supervisor, send_all, send_json
+from app.core.database import SessionLocal
+from app.core.message_writer import message_writer
+from app.core.security import decode_token, load_principal
+from app.models.models import User, Ticket
+import asyncio
 import json
+import time
+import uuid
 from datetime import datetime
 
 router = APIRouter()
 
+class Room:
+    """Sockets connected to one ticket's chat. Admin sockets are observers and
+    are kept when the ticket's participants change."""
+
+    def __init__(self, ticket_id: int):
+        self.ticket_id = ticket_id
+        self.members: Dict[WebSocket, int] = {}
+        self.observers: Set[WebSocket] = set()
+
+    def join(self, websocket: WebSocket, user_id: int, observer: bool = False):
+        self.members[websocket] = user_id
+        if observer:
+            self.observers.add(websocket)
+
+    def leave(self, websocket: WebSocket):
+        self.members.pop(websocket, None)
+        self.observers.discard(websocket)
+
+    def __len__(self):
+        return len(self.members)
+
+
+class ReplayBuffer:
+    """The last frames broadcast to one ticket on this worker, numbered from 1.
+
+    Sequence numbers are local to the worker, so each buffer has a random
+    epoch. A client resuming with another epoch (a different worker, or a
+    restart) is told to resync instead of being replayed the wrong frames.
+    """
+
+    def __init__(self, size: int):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self.frames: deque = deque(maxlen=size)
+        self.idle_since: Optional[float] = None
+
+    def append(self, message: dict) -> dict:
+        self.seq += 1
+        frame = {**message, "seq": self.seq, "epoch": self.epoch}
+        self.frames.append(frame)
+        return frame
+
+    def since(self, seq: int) -> Optional[List[dict]]:
+        """Frames after `seq`, or None if some of them were already evicted."""
+        if seq > self.seq:
+            return None
+        oldest = self.frames[0]["seq"] if self.frames else self.seq + 1
+        if seq + 1 < oldest:
+            return None
+        return list(islice(self.frames, max(seq + 1 - oldest, 0), None))
+
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[int, List[WebSocket]] = {}
-    
-    async def connect(self, websocket: WebSocket, user_id: int):
+    def __init__(
+        self,
+        broker=None,
+        send_timeout: float = settings.WS_SEND_TIMEOUT_SECONDS,
+        replay_size: int = settings.WS_REPLAY_BUFFER_SIZE,
+        replay_ttl: float = settings.WS_REPLAY_TTL_SECONDS
+    ):
+        self.active_connections: Dict[int, Set[WebSocket]] = {}
+        self.rooms: Dict[int, Room] = {}
+        self.socket_index: Dict[WebSocket, Tuple[int, int]] = {}
+        self.replay: Dict[int, ReplayBuffer] = {}
+        self.replay_size = replay_size
+        self.replay_ttl = replay_ttl
+        self.send_timeout = send_timeout
+        self.broker = broker or create_broker()
+        self._broker_start = None
+
+    async def start(self):
+        if self._broker_start is None:
+            self._broker_start = asyncio.ensure_future(self.broker.start(self._deliver))
+        try:
+            await self._broker_start
+        except Exception:
+            self._broker_start = None
+            raise
+
+    async def stop(self):
+        if self._broker_start is not None:
+            self._broker_start = None
+            await self.broker.stop()
+
+    def _replay_buffer(self, ticket_id: int) -> ReplayBuffer:
+        buffer = self.replay.get(ticket_id)
+        if buffer is None:
+            buffer = self.replay[ticket_id] = ReplayBuffer(self.replay_size)
+        return buffer
+
+    def prune_replay(self):
+        """Drop buffers of tickets that have had no sockets here for longer
+        than the replay TTL."""
+        cutoff = time.monotonic() - self.replay_ttl
+        for ticket_id in [
+            ticket_id for ticket_id, buffer in self.replay.items()
+            if buffer.idle_since is not None and buffer.idle_since < cutoff
+        ]:
+            del self.replay[ticket_id]
+
+    async def _replay(self, websocket: WebSocket, buffer: ReplayBuffer, after: int) -> bool:
+        """Send the frames after `after`. Returns False if the buffer no longer
+        holds all of them. Loops until it has caught up, so frames broadcast
+        while it was sending are not missed."""
+        while True:
+            frames = buffer.since(after)
+            if frames is None:
+                return False
+            if not frames:
+                return True
+            for frame in frames:
+                if not await send_json(websocket, frame, self.send_timeout):
+                    return True
+            after = frames[-1]["seq"]
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        ticket_id: int,
+        observer: bool = False,
+        resume_from: Optional[int] = None,
+        epoch: Optional[str] = None
+    ):
+        await self.start()
         await websocket.accept()
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = []
-        self.active_connections[user_id].append(websocket)
-        print(f"User {user_id} connected. Total connections: {len(self.active_connections)}")
+        self.prune_replay()
+        buffer = self._replay_buffer(ticket_id)
+
+        resync = False
+        if resume_from is not None:
+            resync = epoch != buffer.epoch or not await self._replay(websocket, buffer, resume_from)
+
+        # Nothing below awaits until the socket is in the room, so no frame
+        # can fall between the replay and live delivery
+        self.active_connections.setdefault(user_id, set()).add(websocket)
+        room = self.rooms.get(ticket_id)
+        if room is None:
+            room = self.rooms[ticket_id] = Room(ticket_id)
+        room.join(websocket, user_id, observer)
+        buffer.idle_since = None
+        self.socket_index[websocket] = (user_id, ticket_id)
+        await send_json(websocket, {"type": "session", "epoch": buffer.epoch, "seq": buffer.seq, "resync": resync}, self.send_timeout)
+        print(f"User {user_id} joined ticket {ticket_id}. Total connections: {len(self.active_connections)}")
     
-    def disconnect(self, websocket: WebSocket, user_id: int):
-        if user_id in self.active_connections:
-            if websocket in self.active_connections[user_id]:
-                self.active_connections[user_id].remove(websocket)
-            if not self.active_connections[user_id]:
+    def _remove(self, websocket: WebSocket):
+        connection_supervisor.release(websocket)
+        entry = self.socket_index.pop(websocket, None)
+        if entry is None:
+            return
+        user_id, ticket_id = entry
+        sockets = self.active_connections.get(user_id)
+        if sockets is not None:
+            sockets.discard(websocket)
+            if not sockets:
                 del self.active_connections[user_id]
-        print(f"User {user_id} disconnected. Total connections: {len(self.active_connections)}")
+        room = self.rooms.get(ticket_id)
+        if room is not None:
+            room.leave(websocket)
+            if not room:
+                del self.rooms[ticket_id]
+                buffer = self.replay.get(ticket_id)
+                if buffer is not None:
+                    buffer.idle_since = time.monotonic()
+
+    def disconnect(self, websocket: WebSocket, user_id: int, ticket_id: int):
+        self._remove(websocket)
+        print(f"User {user_id} left ticket {ticket_id}. Total connections: {len(self.active_connections)}")
+
+    async def _close_members(self, ticket_id: int, user_ids: Set[int]):
+        room = self.rooms.get(ticket_id)
+        if room is None:
+            return
+        removed = [
+            ws for ws, user_id in room.members.items()
+            if ws not in room.observers and user_id not in user_ids
+        ]
+        for websocket in removed:
+            self._remove(websocket)
+            await close_socket(websocket, timeout=self.send_timeout)
+
+    async def _deliver(self, envelope: dict):
+        kind = envelope.get("type")
+        if kind == "room":
+            ticket_id = envelope["ticket_id"]
+            room = self.rooms.get(ticket_id)
+            buffer = self.replay.get(ticket_id)
+            if room is None and buffer is None:
+                return
+            frame = self._replay_buffer(ticket_id).append(envelope["message"])
+            if room is not None:
+                await send_all(room.members, frame, self._remove, self.send_timeout)
+        elif kind == "user":
+            await send_all(self.active_connections.get(envelope["user_id"], ()), envelope["message"], self._remove, self.send_timeout)
+        elif kind == "members":
+            await self._close_members(envelope["ticket_id"], set(envelope["user_ids"]))
+    
+    async def _publish(self, envelope: dict):
+        await self.start()
+        await self.broker.publish(envelope)
     
     async def send_personal_message(self, message: dict, user_id: int):
-        if user_id in self.active_connections:
-            disconnected = []
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    print(f"Failed to send to user {user_id}: {e}")
-                    disconnected.append(connection)
-            
-            for conn in disconnected:
-                if conn in self.active_connections[user_id]:
-                    self.active_connections[user_id].remove(conn)
+        await self._publish({"type": "user", "user_id": user_id, "message": message})
     
-    async def broadcast_to_ticket(self, message: dict, user_ids: List[int]):
-        for user_id in user_ids:
-            await self.send_personal_message(message, user_id)
+    async def broadcast_to_ticket(self, message: dict, ticket_id: int):
+        await self._publish({"type": "room", "ticket_id": ticket_id, "message": message})
+
+    async def sync_ticket_members(self, ticket_id: int, user_ids: List[Optional[int]]):
+        """Called after a ticket's participants change. Sockets of users who
+        are no longer on the ticket are closed; new participants join the room
+        when they open the chat."""
+        user_ids = [user_id for user_id in user_ids if user_id]
+        await self._publish({"type": "members", "ticket_id": ticket_id, "user_ids": user_ids})
 
 manager = ConnectionManager()
 
+
+@router.on_event("shutdown")
+async def stop_chat_broker():
+    await connection_supervisor.stop()
+    await message_writer.stop()
+    await manager.stop()
+
+def authorize_chat(token: str, ticket_id: int) -> Optional[User]:
+    """Resolve the socket's user and check they may join the ticket. Runs in
+    a session of its own so the socket doesn't hold a pooled connection for
+    its lifetime; messages are persisted by the message writer's sessions."""
+    payload = decode_token(token)
+    if not payload:
+        print("Invalid token")
+        return None
+
+    with SessionLocal() as db:
+        email = payload.get("sub")
+        user = load_principal(db, email)
+        if not user:
+            print(f"User not found for email: {email}")
+            return None
+
+        ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+        if not ticket:
+            print(f"Ticket {ticket_id} not found")
+            return None
+
+        if user.id != ticket.student_id and user.id != ticket.counselor_id:
+            if user.role.value not in ['admin']:
+                print(f"User {user.id} not authorized for ticket {ticket_id}")
+                return None
+        return user
+
+
 @router.websocket("/ws/chat/{ticket_id}")
 async def websocket_endpoint(
     websocket: WebSocket,
     ticket_id: int,
     token: str = Query(...),
-    db: Session = Depends(get_db)
+    resume_from: Optional[int] = Query(None, ge=0),
+    epoch: Optional[str] = Query(None, max_length=32)
 ):
+    """Chat socket for one ticket. Broadcast frames carry `seq` and `epoch`;
+    a client reconnecting with `resume_from` (the last seq it saw) and that
+    epoch is sent only the frames it missed. The server then sends a
+    `session` frame, with `resync: true` if the missed frames were no longer
+    buffered and must be loaded from GET /api/tickets/{id}/messages?since=.
+    A message that is too long or could not be published is answered with
+    an `error` frame to the sender only."""
     user = None
     user_id = None
     
     try:
-        payload = decode_token(token)
-        if not payload:
-            print("Invalid token")
-            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-            return
-        
-        email = payload.get("sub")
-        user = db.query(User).filter(User.email == email).first()
-        
+        user = await asyncio.get_running_loop().run_in_executor(None, authorize_chat, token, ticket_id)
         if not user:
-            print(f"User not found for email: {email}")
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
         
         user_id = user.id
         
-        ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-        if not ticket:
-            print(f"Ticket {ticket_id} not found")
-            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        if not await connection_supervisor.admit(websocket, user.id, "chat", manager._remove):
             return
-        
-        if user.id != ticket.student_id and user.id != ticket.counselor_id:
-            if user.role.value not in ['admin']:
-                print(f"User {user.id} not authorized for ticket {ticket_id}")
-                await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-                return
-        
-        await manager.connect(websocket, user.id)
+
+        await manager.connect(
+            websocket, user.id, ticket_id,
+            observer=user.role.value == 'admin',
+            resume_from=resume_from,
+            epoch=epoch
+        )
         
         while True:
             data = await websocket.receive_text()
+            connection_supervisor.touch(websocket)
             message_data = json.loads(data)
+            if message_data.get("type") == "pong":
+                continue
             
-            new_message = Message(
-                ticket_id=ticket_id,
-                sender_id=user.id,
-                message=message_data.get("message", ""),
-                created_at=datetime.utcnow()
-            )
-            
-            db.add(new_message)
-            db.commit()
-            db.refresh(new_message)
+            message_text = message_data.get("message", "")
+            if not isinstance(message_text, str) or len(message_text) > settings.CHAT_MAX_MESSAGE_LENGTH:
+                await send_json(websocket, {
+                    "type": "error",
+                    "detail": f"Messages are limited to {settings.CHAT_MAX_MESSAGE_LENGTH} characters"
+                }, manager.send_timeout)
+                continue
+
+            message_id = await message_writer.next_id()
+            created_at = datetime.utcnow()
             
             response = {
-                "id": new_message.id,
-                "ticket_id": new_message.ticket_id,
-                "sender_id": new_message.sender_id,
-                "message": new_message.message,
-                "created_at": new_message.created_at.isoformat(),
+                "id": message_id,
+                "ticket_id": ticket_id,
+                "sender_id": user.id,
+                "message": message_text,
+                "created_at": created_at.isoformat(),
                 "sender": {
                     "id": user.id,
                     "email": user.email,
@@ -118,20 +336,32 @@ async def websocket_endpoint(
                 }
             }
             
-            recipient_ids = [ticket.student_id]
-            if ticket.counselor_id:
-                recipient_ids.append(ticket.counselor_id)
-            
-            await manager.broadcast_to_ticket(response, recipient_ids)
+            try:
+                await manager.broadcast_to_ticket(response, ticket_id)
+            except BrokerError as e:
+                # Delivered to no one, so it isn't stored either
+                print(f"Chat message from user {user.id} not sent: {e}")
+                await send_json(websocket, {
+                    "type": "error",
+                    "detail": "Message could not be sent. Please try again."
+                }, manager.send_timeout)
+                continue
+            await message_writer.enqueue({
+                "id": message_id,
+                "ticket_id": ticket_id,
+                "sender_id": user.id,
+                "message": message_text,
+                "created_at": created_at
+            })
             
     except WebSocketDisconnect:
         print(f"WebSocket disconnected for user {user_id}")
         if user_id:
-            manager.disconnect(websocket, user_id)
+            manager.disconnect(websocket, user_id, ticket_id)
     except Exception as e:
         print(f"WebSocket error: {e}")
         if user_id:
-            manager.disconnect(websocket, user_id)
+            manager.disconnect(websocket, user_id, ticket_id)
         try:
             await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
         except:
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, time
 from app.models.models import UserRole, TicketStatus, CrisisLevel
 
 
@@ -50,6 +50,12 @@ class Token(BaseModel):
     access_token: str
     token_type: str
     user: UserResponse
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class TicketCreate(BaseModel):
@@ -82,6 +88,16 @@ class MessageCreate(BaseModel):
     message: str
 
 
+class MessageSender(BaseModel):
+    id: int
+    email: str
+    full_name: str
+    role: UserRole
+
+    class Config:
+        from_attributes = True
+
+
 class MessageResponse(BaseModel):
     id: int
     ticket_id: int
@@ -89,6 +105,7 @@ class MessageResponse(BaseModel):
     message: str
     is_read: bool
     created_at: datetime
+    sender: Optional[MessageSender] = None
 
     class Config:
         from_attributes = True
@@ -144,6 +161,15 @@ class ScheduleCreate(BaseModel):
     ticket_id: Optional[int] = None
 
 
+class WorkingHoursEntry(BaseModel):
+    weekday: int = Field(..., ge=0, le=6)
+    start_time: time
+    end_time: time
+
+    class Config:
+        from_attributes = True
+
+
 class ScheduleResponse(BaseModel):
     id: int
     student_id: int
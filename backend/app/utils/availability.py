@@ -0,0 +1,114 @@
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.models import CounselorWorkingHours, Schedule
+
+ACTIVE_SCHEDULE_STATUSES = ('pending', 'scheduled', 'confirmed')
+LOCAL_TZ = ZoneInfo(settings.TIMEZONE)
+
+Interval = Tuple[datetime, datetime]
+WeeklyHours = Dict[int, List[Tuple[time, time]]]
+
+
+def parse_default_hours() -> WeeklyHours:
+    start, _, end = settings.DEFAULT_WORKING_HOURS.partition("-")
+    window = (time.fromisoformat(start.strip()), time.fromisoformat(end.strip()))
+    return {int(day): [window] for day in settings.DEFAULT_WORKING_DAYS.split(",") if day.strip()}
+
+
+DEFAULT_HOURS = parse_default_hours()
+
+
+def load_working_hours(db: Session, counselor_ids: List[int]) -> Dict[int, WeeklyHours]:
+    """Weekly hours per counselor in local time. Counselors who haven't set
+    any get DEFAULT_WORKING_DAYS / DEFAULT_WORKING_HOURS."""
+    hours: Dict[int, WeeklyHours] = {counselor_id: {} for counselor_id in counselor_ids}
+    if not counselor_ids:
+        return hours
+    rows = db.query(
+        CounselorWorkingHours.counselor_id,
+        CounselorWorkingHours.weekday,
+        CounselorWorkingHours.start_time,
+        CounselorWorkingHours.end_time
+    ).filter(
+        CounselorWorkingHours.counselor_id.in_(counselor_ids)
+    ).order_by(CounselorWorkingHours.start_time).all()
+    for row in rows:
+        hours[row.counselor_id].setdefault(row.weekday, []).append((row.start_time, row.end_time))
+    return {counselor_id: weekly or DEFAULT_HOURS for counselor_id, weekly in hours.items()}
+
+
+def load_busy(db: Session, counselor_ids: List[int], start: datetime, end: datetime) -> Dict[int, List[Interval]]:
+    """Live bookings overlapping [start, end), merged into disjoint sorted
+    intervals per counselor."""
+    busy: Dict[int, List[Interval]] = {counselor_id: [] for counselor_id in counselor_ids}
+    if not counselor_ids:
+        return busy
+    rows = db.query(Schedule.counselor_id, Schedule.scheduled_at, Schedule.ends_at).filter(
+        Schedule.counselor_id.in_(counselor_ids),
+        Schedule.status.in_(ACTIVE_SCHEDULE_STATUSES),
+        Schedule.scheduled_at < end,
+        Schedule.ends_at > start
+    ).order_by(Schedule.counselor_id, Schedule.scheduled_at).all()
+    for row in rows:
+        intervals = busy[row.counselor_id]
+        if intervals and row.scheduled_at <= intervals[-1][1]:
+            intervals[-1] = (intervals[-1][0], max(intervals[-1][1], row.ends_at))
+        else:
+            intervals.append((row.scheduled_at, row.ends_at))
+    return busy
+
+
+def working_windows(weekly: WeeklyHours, day: date) -> List[Interval]:
+    return [
+        (datetime.combine(day, start, LOCAL_TZ), datetime.combine(day, end, LOCAL_TZ))
+        for start, end in weekly.get(day.weekday(), [])
+    ]
+
+
+def within_working_hours(weekly: WeeklyHours, start: datetime, end: datetime) -> bool:
+    day = start.astimezone(LOCAL_TZ).date()
+    return any(w_start <= start and end <= w_end for w_start, w_end in working_windows(weekly, day))
+
+
+def free_slots(
+    weekly: WeeklyHours,
+    busy: List[Interval],
+    days: List[date],
+    duration: timedelta,
+    step: timedelta,
+    not_before: Optional[datetime] = None
+) -> Dict[date, List[datetime]]:
+    """Slot starts of length `duration`, on a `step` grid from the start of
+    each working window, that don't overlap `busy`. Merged busy intervals
+    have increasing ends, so each window bisects to its first candidate and
+    then walks forward."""
+    ends = [end for _, end in busy]
+    slots: Dict[date, List[datetime]] = {}
+    for day in days:
+        day_slots = []
+        for w_start, w_end in working_windows(weekly, day):
+            i = bisect_right(ends, w_start)
+            slot = w_start
+            while slot + duration <= w_end:
+                slot_end = slot + duration
+                while i < len(busy) and busy[i][1] <= slot:
+                    i += 1
+                overlaps = i < len(busy) and busy[i][0] < slot_end
+                if not overlaps and (not_before is None or slot >= not_before):
+                    day_slots.append(slot)
+                slot += step
+        slots[day] = day_slots
+    return slots
+
+
+def find_overlap(db: Session, counselor_id: int, start: datetime, end: datetime) -> Optional[Schedule]:
+    return db.query(Schedule).filter(
+        Schedule.counselor_id == counselor_id,
+        Schedule.status.in_(ACTIVE_SCHEDULE_STATUSES),
+        Schedule.scheduled_at < end,
+        Schedule.ends_at > start
+    ).first()
@@ -0,0 +1,133 @@
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import OutboundEmail
+from app.utils.email_utils import build_message
+
+
+class SMTPConnection:
+    """One authenticated SMTP session, reused across messages and reopened
+    when the relay drops it or it has been idle too long."""
+
+    def __init__(self):
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _open(self):
+        server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS)
+        server.ehlo()
+        if settings.SMTP_STARTTLS:
+            server.starttls()
+            server.ehlo()
+        if settings.SMTP_USERNAME:
+            server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+        self._server = server
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+    def send(self, email: OutboundEmail):
+        if self._server is not None and time.monotonic() - self._last_used > settings.EMAIL_SMTP_IDLE_SECONDS:
+            self.close()
+
+        msg = build_message(email.to_email, email.subject, email.html_body, email.text_body)
+        for attempt in range(2):
+            if self._server is None:
+                self._open()
+            try:
+                self._server.sendmail(settings.SMTP_FROM_EMAIL, email.to_email, msg.as_string())
+                self._last_used = time.monotonic()
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._server = None
+                if attempt:
+                    raise
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), 6 * 3600))
+
+
+def claim_batch(db: Session, limit: int) -> List[OutboundEmail]:
+    """Lock due messages for this worker; rows locked by other workers (in
+    this or another process) are skipped."""
+    return db.query(OutboundEmail).filter(
+        OutboundEmail.status == "pending",
+        OutboundEmail.next_attempt_at <= datetime.now(timezone.utc)
+    ).order_by(OutboundEmail.next_attempt_at).limit(limit).with_for_update(skip_locked=True).all()
+
+
+def deliver_batch(db: Session, connection: SMTPConnection, limit: int) -> int:
+    emails = claim_batch(db, limit)
+    for email in emails:
+        try:
+            connection.send(email)
+            email.status = "sent"
+            email.sent_at = datetime.now(timezone.utc)
+            print(f"Email sent to {email.to_email}")
+        except Exception as e:
+            connection.close()
+            email.attempts += 1
+            email.last_error = str(e)[:1000]
+            if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                email.status = "dead"
+                print(f"Email {email.id} to {email.to_email} dead-lettered after {email.attempts} attempts: {e}")
+            else:
+                email.next_attempt_at = datetime.now(timezone.utc) + retry_delay(email.attempts)
+                print(f"Failed to send email to {email.to_email} (attempt {email.attempts}): {e}")
+    db.commit()
+    return len(emails)
+
+
+class EmailWorkerPool:
+    def __init__(self, workers: int, batch_size: int, poll_seconds: float):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def _run(self):
+        connection = SMTPConnection()
+        try:
+            while not self._stop.is_set():
+                db = SessionLocal()
+                try:
+                    sent = deliver_batch(db, connection, self.batch_size)
+                except Exception as e:
+                    db.rollback()
+                    print(f"Email worker error: {e}")
+                    sent = 0
+                finally:
+                    db.close()
+                if sent < self.batch_size:
+                    self._stop.wait(self.poll_seconds)
+        finally:
+            connection.close()
+
+    def start(self):
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"email-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"✓ Email worker pool started ({self.workers} workers)")
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+email_workers = EmailWorkerPool(settings.EMAIL_WORKERS, settings.EMAIL_BATCH_SIZE, settings.EMAIL_POLL_SECONDS)
@@ -0,0 +1,56 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template, select_autoescape
+from app.core.config import settings
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+TEMPLATE_NAMES = ("new_ticket", "schedule_approved", "schedule_declined", "crisis_alert")
+
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    html_body: str
+    text_body: str
+
+
+class EmailTemplates:
+    """Each notification type is a subject, an HTML body and a plaintext body
+    under app/templates/email. All of them are parsed and compiled once in
+    load(); rendering only evaluates the compiled templates. HTML templates
+    are autoescaped, text and subject templates are not."""
+
+    def __init__(self, directory: Path):
+        self.env = Environment(
+            loader=FileSystemLoader(str(directory)),
+            autoescape=select_autoescape(enabled_extensions=("html",), default_for_string=False),
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            auto_reload=False
+        )
+        self.env.globals["frontend_url"] = settings.FRONTEND_URL
+        self.compiled: Dict[str, Tuple[Template, Template, Template]] = {}
+
+    def load(self):
+        for name in TEMPLATE_NAMES:
+            self.compiled[name] = (
+                self.env.get_template(f"{name}.subject.txt"),
+                self.env.get_template(f"{name}.html"),
+                self.env.get_template(f"{name}.txt"),
+            )
+
+    def render(self, name: str, **context) -> RenderedEmail:
+        subject, html_body, text_body = self.compiled[name]
+        context = {"action_url": None, "action_label": None, **context}
+        return RenderedEmail(
+            subject=subject.render(context).strip(),
+            html_body=html_body.render(context),
+            text_body=text_body.render(context)
+        )
+
+    def render_many(self, name: str, contexts: Iterable[dict]) -> List[RenderedEmail]:
+        return [self.render(name, **context) for context in contexts]
+
+
+email_templates = EmailTemplates(TEMPLATE_DIR)
+email_templates.load()
@@ -1,71 +1,102 @@
-import smtplib
+from datetime import datetime, timezone
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.models.models import OutboundEmail, Schedule, Ticket, User
+from app.utils.availability import LOCAL_TZ
+from app.utils.email_templates import email_templates
 
 
-def send_email(to_email: str, subject: str, html_body: str):
-    try:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = settings.SMTP_FROM_EMAIL
-        msg["To"] = to_email
-
-        msg.attach(MIMEText(html_body, "html"))
-
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.ehlo()
-            server.starttls()
-            server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            server.sendmail(settings.SMTP_FROM_EMAIL, to_email, msg.as_string())
-
-        print(f"Email sent to {to_email}")
-    except Exception as e:
-        print(f"Failed to send email to {to_email}: {e}")
-
-
-def send_new_ticket_notification(counselor_email: str, counselor_name: str, student_name: str, ticket_number: str, category: str, initial_message: str):
-    subject = f"New Counseling Request — {ticket_number}"
-
-    html_body = f"""
-    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f9fafb;">
-        <div style="background-color: #ffffff; border-radius: 8px; padding: 30px; border: 1px solid #e5e7eb;">
-            
-            <div style="text-align: center; margin-bottom: 24px;">
-                <h1 style="color: #1d4ed8; font-size: 20px; margin: 0;">University of Embu</h1>
-                <p style="color: #6b7280; font-size: 14px; margin: 4px 0 0;">Mental Health Counselling Platform</p>
-            </div>
-
-            <p style="color: #111827; font-size: 16px;">Dear {counselor_name},</p>
-
-            <p style="color: #374151; font-size: 14px; line-height: 1.6;">
-                A student has initiated a counseling session and has been assigned to you. Please log in to respond at your earliest convenience.
-            </p>
-
-            <div style="background-color: #eff6ff; border-left: 4px solid #1d4ed8; border-radius: 4px; padding: 16px; margin: 20px 0;">
-                <p style="margin: 0 0 8px; font-size: 13px; color: #6b7280; text-transform: uppercase; letter-spacing: 0.05em;">Ticket Details</p>
-                <p style="margin: 4px 0; font-size: 14px; color: #111827;"><strong>Ticket:</strong> {ticket_number}</p>
-                <p style="margin: 4px 0; font-size: 14px; color: #111827;"><strong>Student:</strong> {student_name}</p>
-                <p style="margin: 4px 0; font-size: 14px; color: #111827;"><strong>Category:</strong> {category}</p>
-            </div>
-
-            <div style="background-color: #f3f4f6; border-radius: 4px; padding: 16px; margin: 20px 0;">
-                <p style="margin: 0 0 8px; font-size: 13px; color: #6b7280; text-transform: uppercase; letter-spacing: 0.05em;">Initial Message</p>
-                <p style="margin: 0; font-size: 14px; color: #374151; line-height: 1.6; font-style: italic;">"{initial_message}"</p>
-            </div>
-
-            <div style="text-align: center; margin: 28px 0;">
-                <a href="{settings.FRONTEND_URL}/counselor/dashboard" 
-                   style="background-color: #1d4ed8; color: #ffffff; padding: 12px 28px; border-radius: 6px; text-decoration: none; font-size: 14px; font-weight: 600;">
-                    View in Dashboard
-                </a>
-            </div>
-
-            <p style="color: #6b7280; font-size: 12px; text-align: center; margin-top: 24px; border-top: 1px solid #e5e7eb; padding-top: 16px;">
-                University of Embu Mental Health Platform &mdash; This is an automated notification. Please do not reply to this email.
-            </p>
-        </div>
-    </div>
-    """
-
-    send_email(counselor_email, subject, html_body)
\ No newline at end of file
+def build_message(to_email: str, subject: str, html_body: str, text_body: Optional[str] = None) -> MIMEMultipart:
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = settings.SMTP_FROM_EMAIL
+    msg["To"] = to_email
+
+    if text_body:
+        msg.attach(MIMEText(text_body, "plain"))
+    msg.attach(MIMEText(html_body, "html"))
+    return msg
+
+
+def queue_email(db: Session, to_email: str, subject: str, html_body: str, text_body: Optional[str] = None) -> OutboundEmail:
+    """Add a message to the outbound queue. It is delivered by the email
+    worker once the caller commits, so it can share the caller's transaction."""
+    email = OutboundEmail(
+        to_email=to_email,
+        subject=subject,
+        html_body=html_body,
+        text_body=text_body
+    )
+    db.add(email)
+    return email
+
+
+def queue_templated_email(db: Session, template: str, to_email: str, **context) -> OutboundEmail:
+    rendered = email_templates.render(template, **context)
+    return queue_email(db, to_email, rendered.subject, rendered.html_body, rendered.text_body)
+
+
+def queue_templated_batch(db: Session, template: str, recipients: List[Tuple[str, dict]], **shared) -> List[OutboundEmail]:
+    """Render one template for many recipients. `recipients` pairs each
+    address with its own context, which is layered over `shared`."""
+    rendered = email_templates.render_many(template, ({**shared, **context} for _, context in recipients))
+    return [
+        queue_email(db, to_email, email.subject, email.html_body, email.text_body)
+        for (to_email, _), email in zip(recipients, rendered)
+    ]
+
+
+def send_new_ticket_notification(db: Session, counselor_email: str, counselor_name: str, student_name: str, ticket_number: str, category: str, initial_message: str):
+    queue_templated_email(
+        db, "new_ticket", counselor_email,
+        recipient_name=counselor_name,
+        student_name=student_name,
+        ticket_number=ticket_number,
+        category=category,
+        initial_message=initial_message,
+        action_url=f"{settings.FRONTEND_URL}/counselor/dashboard",
+        action_label="View in Dashboard"
+    )
+
+
+def format_local_time(value: datetime) -> str:
+    """Campus-local time with its zone abbreviation, e.g. "Monday 03 June
+    2024, 14:00 EAT". Naive values are taken to be UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(LOCAL_TZ).strftime("%A %d %B %Y, %H:%M %Z")
+
+
+def send_schedule_decision_notification(db: Session, student: User, counselor: User, schedule: Schedule, approved: bool, reason: Optional[str] = None):
+    context = dict(
+        recipient_name=student.full_name,
+        counselor_name=counselor.full_name,
+        scheduled_at=format_local_time(schedule.scheduled_at),
+        action_url=f"{settings.FRONTEND_URL}/student/schedule",
+        action_label="View My Sessions"
+    )
+    if approved:
+        queue_templated_email(
+            db, "schedule_approved", student.email,
+            duration_minutes=schedule.duration_minutes,
+            meeting_type=schedule.meeting_type,
+            meeting_link=schedule.meeting_link,
+            **context
+        )
+    else:
+        queue_templated_email(db, "schedule_declined", student.email, reason=reason, **context)
+
+
+def send_crisis_alert(db: Session, counselors: List[User], ticket: Ticket):
+    queue_templated_batch(
+        db, "crisis_alert",
+        [(counselor.email, {"recipient_name": counselor.full_name}) for counselor in counselors],
+        ticket_number=ticket.ticket_number,
+        category=ticket.category,
+        crisis_level=getattr(ticket.crisis_level, "value", ticket.crisis_level),
+        action_url=f"{settings.FRONTEND_URL}/counselor/dashboard",
+        action_label="Open Ticket Queue"
+    )
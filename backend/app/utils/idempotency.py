@@ -0,0 +1,59 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.models import IdempotencyKey
+
+
+def fingerprint(payload: BaseModel) -> str:
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+def claim_key(db: Session, user_id: int, scope: str, key: str, request_fingerprint: str) -> Optional[JSONResponse]:
+    """Reserve `key` for this request inside the caller's transaction.
+
+    Returns None when the key is new; the caller does its write, records the
+    response with complete_key and commits. When the key was already used,
+    returns the stored response instead. A concurrent request holding the
+    same key makes the insert wait until that request commits or rolls back,
+    so only one of them ever performs the write. Failed requests roll back
+    their claim and can be retried with the same key."""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.created_at < cutoff
+    ).delete(synchronize_session=False)
+
+    stmt = insert(IdempotencyKey).values(
+        user_id=user_id, scope=scope, key=key, fingerprint=request_fingerprint
+    ).on_conflict_do_nothing().returning(IdempotencyKey.key)
+    if db.execute(stmt).scalar() is not None:
+        return None
+
+    existing = db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.scope == scope,
+        IdempotencyKey.key == key
+    ).first()
+    if existing is None:
+        # Claimed and then released by a request that rolled back
+        return claim_key(db, user_id, scope, key, request_fingerprint)
+    if existing.fingerprint != request_fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    if existing.status_code is None:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+    return JSONResponse(status_code=existing.status_code, content=json.loads(existing.response_body))
+
+
+def complete_key(db: Session, user_id: int, scope: str, key: str, status_code: int, body: dict):
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.scope == scope,
+        IdempotencyKey.key == key
+    ).update({"status_code": status_code, "response_body": json.dumps(body)}, synchronize_session=False)
@@ -0,0 +1,218 @@
+import asyncio
+import statistics
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import User, CounselorProfile, Ticket, UserRole, TicketStatus
+from app.routers.counselors import load_counselor_stats, score_counselor
+from app.routers.websocket import manager
+from app.utils.email_utils import send_new_ticket_notification
+
+SAMPLE_SIZE = 500
+
+
+def priority_label(priority: int) -> str:
+    return "crisis" if priority else "normal"
+
+
+def load_continuity(db: Session, counselor_ids: List[int], student_ids: List[int]) -> Dict[tuple, int]:
+    """Past tickets per (counselor, student) pair, for every pair in one query."""
+    if not counselor_ids or not student_ids:
+        return {}
+    rows = db.query(Ticket.counselor_id, Ticket.student_id, func.count(Ticket.id)).filter(
+        Ticket.counselor_id.in_(counselor_ids),
+        Ticket.student_id.in_(student_ids)
+    ).group_by(Ticket.counselor_id, Ticket.student_id).all()
+    return {(counselor_id, student_id): count for counselor_id, student_id, count in rows}
+
+
+def claim_new_tickets(db: Session, limit: int) -> List[Ticket]:
+    """Lock the next NEW tickets, crisis first and then oldest. Tickets locked
+    by another dispatcher or a counselor's manual claim are skipped."""
+    return db.query(Ticket).filter(
+        Ticket.status == TicketStatus.NEW,
+        Ticket.counselor_id.is_(None)
+    ).order_by(
+        Ticket.priority.desc(), Ticket.created_at, Ticket.id
+    ).limit(limit).with_for_update(skip_locked=True).all()
+
+
+def dispatch_batch(db: Session, limit: int) -> List[dict]:
+    """Assign one batch and commit. Returns what was assigned, captured
+    before the commit expires the tickets."""
+    tickets = claim_new_tickets(db, limit)
+    if not tickets:
+        db.rollback()
+        return []
+
+    # Profiles are locked (not skipped) so two dispatchers can't both fill
+    # the same counselor's last slot
+    rows = db.query(User, CounselorProfile).join(
+        CounselorProfile, CounselorProfile.user_id == User.id
+    ).filter(
+        User.role == UserRole.COUNSELOR,
+        User.is_active == True,
+        CounselorProfile.is_available == True
+    ).order_by(User.id).with_for_update(of=CounselorProfile).all()
+
+    counselor_ids = [counselor.id for counselor, _ in rows]
+    stats = load_counselor_stats(db, counselor_ids, student_id=0)
+    students = {
+        student.id: student
+        for student in db.query(User).filter(User.id.in_({ticket.student_id for ticket in tickets}))
+    }
+    continuity = load_continuity(db, counselor_ids, list(students))
+
+    assigned = []
+    for ticket in tickets:
+        student = students[ticket.student_id]
+        best = None
+        for counselor, profile in rows:
+            counselor_stats = stats[counselor.id]
+            if counselor_stats["active_tickets"] >= (profile.max_active_tickets or 10):
+                continue
+            score, _ = score_counselor(
+                profile=profile,
+                student=student,
+                category=ticket.category,
+                stats={**counselor_stats, "past_tickets": continuity.get((counselor.id, student.id), 0)}
+            )
+            # Highest score, then lightest load, then lowest id
+            key = (score, -counselor_stats["active_tickets"], -counselor.id)
+            if best is None or key > best[0]:
+                best = (key, counselor)
+        if best is None:
+            break  # every counselor is at capacity
+
+        counselor = best[1]
+        ticket.counselor_id = counselor.id
+        ticket.assigned_at = datetime.now(timezone.utc)
+        ticket.status = TicketStatus.ASSIGNED
+        stats[counselor.id]["active_tickets"] += 1
+        send_new_ticket_notification(
+            db,
+            counselor_email=counselor.email,
+            counselor_name=counselor.full_name,
+            student_name=student.full_name,
+            ticket_number=ticket.ticket_number,
+            category=ticket.category,
+            initial_message=ticket.initial_message or ""
+        )
+        assigned.append({
+            "ticket_id": ticket.id,
+            "student_id": ticket.student_id,
+            "counselor_id": counselor.id,
+            "priority": ticket.priority,
+            "created_at": ticket.created_at
+        })
+
+    db.commit()
+    return assigned
+
+
+class TicketDispatcher:
+    """Background thread that routes NEW tickets to counselors. It wakes on
+    every poll interval and immediately when create_ticket calls wake()."""
+
+    def __init__(self, batch_size: int, poll_seconds: float):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.assigned_total = 0
+        self.samples: Dict[str, deque] = {"crisis": deque(maxlen=SAMPLE_SIZE), "normal": deque(maxlen=SAMPLE_SIZE)}
+
+    def _record(self, assigned: List[dict]):
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            self.assigned_total += len(assigned)
+            for item in assigned:
+                created_at = item["created_at"]
+                if created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=timezone.utc)
+                self.samples[priority_label(item["priority"])].append((now - created_at).total_seconds())
+
+    def _sync_rooms(self, assigned: List[dict]):
+        if self._loop is None:
+            return
+        for item in assigned:
+            asyncio.run_coroutine_threadsafe(
+                manager.sync_ticket_members(item["ticket_id"], [item["student_id"], item["counselor_id"]]), self._loop
+            )
+
+    def _run(self):
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                assigned = dispatch_batch(db, self.batch_size)
+                if assigned:
+                    self._record(assigned)
+                    self._sync_rooms(assigned)
+                    print(f"✓ Dispatcher assigned {len(assigned)} ticket(s)")
+            except Exception as e:
+                db.rollback()
+                print(f"Ticket dispatcher error: {e}")
+                assigned = []
+            finally:
+                db.close()
+            if len(assigned) < self.batch_size:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+    def wake(self):
+        self._wake.set()
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self._loop = loop
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ticket-dispatcher", daemon=True)
+        self._thread.start()
+        print("✓ Ticket dispatcher started")
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def metrics(self, db: Session) -> dict:
+        queue = {"crisis": 0, "normal": 0}
+        for priority, count in db.query(Ticket.priority, func.count(Ticket.id)).filter(
+            Ticket.status == TicketStatus.NEW,
+            Ticket.counselor_id.is_(None)
+        ).group_by(Ticket.priority):
+            queue[priority_label(priority)] += count
+
+        with self._lock:
+            samples = {label: list(values) for label, values in self.samples.items()}
+            assigned_total = self.assigned_total
+
+        def summarize(values):
+            if not values:
+                return {"count": 0, "avg_seconds": None, "p50_seconds": None, "p95_seconds": None}
+            ordered = sorted(values)
+            return {
+                "count": len(ordered),
+                "avg_seconds": round(statistics.fmean(ordered), 2),
+                "p50_seconds": round(ordered[len(ordered) // 2], 2),
+                "p95_seconds": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2)
+            }
+
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "queue_depth": queue,
+            "assigned_total": assigned_total,
+            "time_to_assignment": {label: summarize(values) for label, values in samples.items()}
+        }
+
+
+ticket_dispatcher = TicketDispatcher(settings.DISPATCHER_BATCH_SIZE, settings.DISPATCHER_POLL_SECONDS)
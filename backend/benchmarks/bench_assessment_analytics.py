@@ -0,0 +1,104 @@
+"""
+Assessment analytics benchmark on synthetic data.
+
+Inserts STUDENTS synthetic students and ASSESSMENTS assessments (default
+500k) spread over the last WEEKS weeks with INSERT ... SELECT
+generate_series, and ANALYZEs. It then times the per-student trajectory
+query and the weekly cohort distribution, cold and then served from the
+completed-week cache. Rows are written with plain SQL so the stat counters
+are not touched, and everything is deleted at the end.
+
+    python -m benchmarks.bench_assessment_analytics [assessments]
+"""
+import random
+import sys
+import time
+from sqlalchemy import text
+from app.core.database import SessionLocal
+from app.routers.assessment_analytics import get_cohort_distribution, load_trajectory, week_cache
+
+ASSESSMENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+STUDENTS = 5000
+WEEKS = 52
+TRAJECTORY_RUNS = 50
+MARKER = "bench-analytics"
+
+
+def seed(db):
+    print(f"Inserting {STUDENTS:,} students and {ASSESSMENTS:,} assessments...")
+    start = time.perf_counter()
+    db.execute(text("""
+        INSERT INTO users (username, email, hashed_password, full_name, role, is_active, is_verified)
+        SELECT :marker || '-' || g, :marker || '-' || g || '@bench.local', 'x', 'Bench Student ' || g,
+               'STUDENT', true, true
+        FROM generate_series(1, :students) AS g
+    """), {"marker": MARKER, "students": STUDENTS})
+    db.execute(text("""
+        WITH students AS (
+            SELECT array_agg(id) AS ids FROM users WHERE username LIKE :marker || '-%'
+        ), scored AS (
+            SELECT s.ids[1 + (g % array_length(s.ids, 1))] AS student_id,
+                   floor(random() * 31)::int AS mental, floor(random() * 31)::int AS emotional,
+                   floor(random() * 31)::int AS social, floor(random() * 11)::int AS needs,
+                   now() - random() * (:weeks * interval '1 week') AS created_at
+            FROM generate_series(1, :count) AS g, students s
+        )
+        INSERT INTO assessments (
+            student_id, assessment_type, score, severity_level, mental_health_score,
+            emotional_health_score, social_health_score, needs_awareness_score, needs_followup, created_at
+        )
+        SELECT student_id, 'Mental Health Self-Assessment', total,
+               CASE WHEN total >= 80 THEN 'Excellent - No concerns'
+                    WHEN total >= 60 THEN 'Good - Minor areas to work on'
+                    WHEN total >= 40 THEN 'Moderate - Some challenges present'
+                    WHEN total >= 20 THEN 'Concerning - Multiple challenges'
+                    ELSE 'Critical - Immediate support recommended' END,
+               mental, emotional, social, needs, total < 40, created_at
+        FROM (SELECT *, mental + emotional + social + needs AS total FROM scored) t
+    """), {"marker": MARKER, "weeks": WEEKS, "count": ASSESSMENTS})
+    db.commit()
+    db.execute(text("ANALYZE assessments"))
+    print(f"  done in {time.perf_counter() - start:.1f}s")
+    return [row[0] for row in db.execute(
+        text("SELECT id FROM users WHERE username LIKE :marker || '-%'"), {"marker": MARKER}
+    )]
+
+
+def cleanup(db):
+    db.execute(text("""
+        DELETE FROM assessments WHERE student_id IN (SELECT id FROM users WHERE username LIKE :marker || '-%')
+    """), {"marker": MARKER})
+    db.execute(text("DELETE FROM users WHERE username LIKE :marker || '-%'"), {"marker": MARKER})
+    db.commit()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def run():
+    db = SessionLocal()
+    try:
+        student_ids = seed(db)
+
+        elapsed = 0.0
+        for student_id in random.sample(student_ids, TRAJECTORY_RUNS):
+            ms, _ = timed(lambda: load_trajectory(db, student_id, 3))
+            elapsed += ms
+        print(f"trajectory ({ASSESSMENTS // STUDENTS} assessments/student): {elapsed / TRAJECTORY_RUNS:.2f} ms avg")
+
+        week_cache.clear()
+        cold, weeks = timed(lambda: get_cohort_distribution(weeks=WEEKS, db=db, current_user=None))
+        warm, _ = timed(lambda: get_cohort_distribution(weeks=WEEKS, db=db, current_user=None))
+        print(f"cohort, {len(weeks)} weeks, cold: {cold:.2f} ms")
+        print(f"cohort, {len(weeks)} weeks, cached completed weeks: {warm:.2f} ms")
+    finally:
+        cleanup(db)
+        week_cache.clear()
+        db.close()
+
+
+if __name__ == "__main__":
+    run()
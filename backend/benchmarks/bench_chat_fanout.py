@@ -0,0 +1,92 @@
+"""
+Cross-worker chat delivery check for the PostgreSQL LISTEN/NOTIFY broker.
+
+Starts WORKERS processes, each running its own ConnectionManager with a fake
+socket for one user in the same ticket room. Worker 0 publishes MESSAGES
+envelopes to that room; each process must receive all of them. Reports
+per-worker delivery throughput. Exits non-zero if any envelope is lost.
+
+    python -m benchmarks.bench_chat_fanout
+"""
+import asyncio
+import multiprocessing
+import sys
+import time
+
+WORKERS = 4
+MESSAGES = 500
+BENCH_TICKET_ID = 1
+
+
+class FakeSocket:
+    def __init__(self):
+        self.received = []
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        if "type" not in message:  # skip the session frame sent on connect
+            self.received.append((time.perf_counter(), message))
+
+
+async def worker_main(index, ready, go, results):
+    from app.core.broker import PostgresBroker
+    from app.core.config import settings
+    from app.routers.websocket import ConnectionManager
+
+    manager = ConnectionManager(broker=PostgresBroker(settings.DATABASE_URL, "chat_events_bench"))
+    socket = FakeSocket()
+    await manager.connect(socket, user_id=index + 1, ticket_id=BENCH_TICKET_ID)
+    ready.release()
+
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, go.wait)
+
+    if index == 0:
+        for i in range(MESSAGES):
+            await manager.broadcast_to_ticket({"seq": i}, BENCH_TICKET_ID)
+
+    deadline = time.perf_counter() + 30
+    while len(socket.received) < MESSAGES and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+
+    received_at = [at for at, _ in socket.received]
+    span = received_at[-1] - received_at[0] if received_at else 0
+    results.put((index, len(socket.received), span))
+    await manager.stop()
+
+
+def run_worker(index, ready, go, results):
+    asyncio.run(worker_main(index, ready, go, results))
+
+
+def run():
+    ready = multiprocessing.Semaphore(0)
+    go = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(i, ready, go, results))
+        for i in range(WORKERS)
+    ]
+    for p in processes:
+        p.start()
+    for _ in processes:
+        ready.acquire()
+    go.set()
+
+    failed = False
+    for _ in processes:
+        index, received, span = results.get(timeout=60)
+        rate = received / span if span else float("inf")
+        status = "ok" if received == MESSAGES else "LOST MESSAGES"
+        failed = failed or received != MESSAGES
+        print(f"worker {index}: received {received}/{MESSAGES} ({rate:.0f} msg/s) {status}")
+    for p in processes:
+        p.join()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,99 @@
+"""
+Chat delivery latency with inline commits vs the batched message writer.
+
+Simulates N concurrent conversations on one event loop, each sending
+MESSAGES_PER_CONVERSATION frames. Delivery latency is measured from frame
+receipt to broadcast completion. The inline path commits each message on the
+event loop before broadcasting (the old handler). The batched path reserves an
+id, broadcasts, and hands the row to MessageWriter. Rows are written against
+the first ticket in the database and deleted afterwards.
+
+    python -m benchmarks.bench_chat_write
+"""
+import asyncio
+import statistics
+import time
+from datetime import datetime
+from app.core.broker import InMemoryBroker
+from app.core.database import SessionLocal
+from app.core.message_writer import MessageWriter
+from app.models.models import Message, Ticket
+from app.routers.websocket import ConnectionManager
+
+CONVERSATIONS = [1, 10, 50, 200]
+MESSAGES_PER_CONVERSATION = 20
+MARKER = "bench-chat-write"
+
+
+class FakeSocket:
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        pass
+
+
+def p99(samples):
+    return statistics.quantiles(samples, n=100)[98] * 1000 if len(samples) > 1 else samples[0] * 1000
+
+
+async def inline_conversation(manager, ticket, latencies):
+    db = SessionLocal()
+    try:
+        for _ in range(MESSAGES_PER_CONVERSATION):
+            start = time.perf_counter()
+            message = Message(ticket_id=ticket.id, sender_id=ticket.student_id, message=MARKER, created_at=datetime.utcnow())
+            db.add(message)
+            db.commit()
+            db.refresh(message)
+            await manager.broadcast_to_ticket({"id": message.id}, ticket.id)
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+    finally:
+        db.close()
+
+
+async def batched_conversation(manager, writer, ticket, latencies):
+    for _ in range(MESSAGES_PER_CONVERSATION):
+        start = time.perf_counter()
+        message_id = await writer.next_id()
+        await manager.broadcast_to_ticket({"id": message_id}, ticket.id)
+        latencies.append(time.perf_counter() - start)
+        await writer.enqueue({
+            "id": message_id, "ticket_id": ticket.id, "sender_id": ticket.student_id,
+            "message": MARKER, "created_at": datetime.utcnow()
+        })
+        await asyncio.sleep(0)
+
+
+async def run():
+    db = SessionLocal()
+    ticket = db.query(Ticket).first()
+    db.close()
+    if not ticket:
+        print("Create at least one ticket before running this benchmark")
+        return
+
+    manager = ConnectionManager(broker=InMemoryBroker())
+    await manager.connect(FakeSocket(), ticket.student_id, ticket.id)
+
+    print(f"{'conversations':>13} | {'inline p99 ms':>13} | {'batched p99 ms':>14}")
+    print("-" * 46)
+    for count in CONVERSATIONS:
+        inline_latencies, batched_latencies = [], []
+        await asyncio.gather(*(inline_conversation(manager, ticket, inline_latencies) for _ in range(count)))
+
+        writer = MessageWriter()
+        await asyncio.gather(*(batched_conversation(manager, writer, ticket, batched_latencies) for _ in range(count)))
+        await writer.stop()
+
+        print(f"{count:>13} | {p99(inline_latencies):>13.2f} | {p99(batched_latencies):>14.2f}")
+
+    db = SessionLocal()
+    db.query(Message).filter(Message.message == MARKER).delete()
+    db.commit()
+    db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
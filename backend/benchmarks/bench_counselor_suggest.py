@@ -0,0 +1,129 @@
+"""
+Benchmark for /api/counselors/suggest scoring.
+
+Seeds N counselors (with tickets and rated schedules) inside a transaction that
+is rolled back at the end, then compares the old per-counselor query pattern
+with the batched aggregate loader. Reports query count and latency per N.
+
+    python -m benchmarks.bench_counselor_suggest
+"""
+import time
+from sqlalchemy import event, func
+from app.core.database import engine, SessionLocal
+from app.models.models import User, UserRole, CounselorProfile, Ticket, TicketStatus, Schedule
+from app.routers.counselors import load_counselor_stats, score_counselor, ACTIVE_TICKET_STATUSES
+
+COUNSELOR_COUNTS = [10, 40, 80, 160]
+RUNS = 5
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def legacy_stats(db, counselor_id, student_id):
+    return {
+        "active_tickets": db.query(Ticket).filter(
+            Ticket.counselor_id == counselor_id,
+            Ticket.status.in_(ACTIVE_TICKET_STATUSES)
+        ).count(),
+        "past_tickets": db.query(Ticket).filter(
+            Ticket.student_id == student_id,
+            Ticket.counselor_id == counselor_id
+        ).count(),
+        "in_person_sessions": db.query(Schedule).filter(
+            Schedule.counselor_id == counselor_id,
+            Schedule.meeting_type == "in-person"
+        ).count(),
+        "online_sessions": db.query(Schedule).filter(
+            Schedule.counselor_id == counselor_id,
+            Schedule.meeting_type == "online"
+        ).count(),
+        "avg_rating": db.query(func.avg(Schedule.rating)).filter(
+            Schedule.counselor_id == counselor_id,
+            Schedule.rating.isnot(None)
+        ).scalar(),
+    }
+
+
+def seed(db, prefix, count):
+    student = User(
+        username=f"{prefix}-student", email=f"{prefix}-student@bench.local",
+        hashed_password="x", full_name="Bench Student", residence_status="on_campus",
+        role=UserRole.STUDENT, is_active=True
+    )
+    db.add(student)
+    db.flush()
+
+    for i in range(count):
+        counselor = User(
+            username=f"{prefix}-c{i}", email=f"{prefix}-c{i}@bench.local",
+            hashed_password="x", full_name=f"Counselor {i}",
+            role=UserRole.COUNSELOR, is_active=True
+        )
+        db.add(counselor)
+        db.flush()
+        db.add(CounselorProfile(
+            user_id=counselor.id, staff_id=f"{prefix}-s{i}", department="Counseling",
+            specializations=["Anxiety", "Academic Stress"], years_of_experience=i % 12
+        ))
+        for j in range(i % 6):
+            db.add(Ticket(
+                ticket_number=f"{prefix}-t{i}-{j}", student_id=student.id, counselor_id=counselor.id,
+                category="Anxiety", status=TicketStatus.ACTIVE if j % 2 else TicketStatus.RESOLVED
+            ))
+            db.add(Schedule(
+                student_id=student.id, counselor_id=counselor.id, scheduled_at=func.now(),
+                meeting_type="online" if j % 2 else "in-person", rating=1 + (i + j) % 5
+            ))
+    db.flush()
+    return student
+
+
+def measure(db, fn):
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            fn()
+        elapsed = (time.perf_counter() - start) / RUNS
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    return counter.count // RUNS, elapsed * 1000
+
+
+def run():
+    print(f"{'counselors':>10} | {'legacy queries':>14} | {'legacy ms':>9} | {'batched queries':>15} | {'batched ms':>10}")
+    print("-" * 72)
+    for count in COUNSELOR_COUNTS:
+        db = SessionLocal()
+        try:
+            student = seed(db, f"bench{count}", count)
+            rows = db.query(User, CounselorProfile).join(
+                CounselorProfile, CounselorProfile.user_id == User.id
+            ).filter(User.username.like(f"bench{count}-c%")).order_by(User.id).all()
+            ids = [counselor.id for counselor, _ in rows]
+
+            def legacy():
+                return [score_counselor(p, student, "Anxiety", legacy_stats(db, c.id, student.id)) for c, p in rows]
+
+            def batched():
+                stats = load_counselor_stats(db, ids, student.id)
+                return [score_counselor(p, student, "Anxiety", stats[c.id]) for c, p in rows]
+
+            assert legacy() == batched(), "batched scoring diverged from legacy scoring"
+            legacy_q, legacy_ms = measure(db, legacy)
+            batched_q, batched_ms = measure(db, batched)
+            print(f"{count:>10} | {legacy_q:>14} | {legacy_ms:>9.1f} | {batched_q:>15} | {batched_ms:>10.1f}")
+        finally:
+            db.rollback()
+            db.close()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,107 @@
+"""
+Time-to-assignment benchmark for the background ticket dispatcher.
+
+Seeds COUNSELORS available counselors, then creates TICKETS new tickets in
+bursts of BURST, every CRISIS_EVERY-th one flagged as a crisis, waking the
+dispatcher after each burst the way create_ticket does. It waits for the
+queue to drain and prints the dispatcher's queue depth and per-priority
+time-to-assignment. The dispatcher routes every NEW ticket, so run this
+against a development database. All synthetic rows are deleted at the end.
+
+    python -m benchmarks.bench_dispatcher
+"""
+import json
+import time
+from app.core.database import SessionLocal
+from app.models.models import User, CounselorProfile, Ticket, OutboundEmail, UserRole, TicketStatus
+from app.utils.ticket_dispatcher import TicketDispatcher
+
+COUNSELORS = 20
+TICKETS = 500
+BURST = 25
+CRISIS_EVERY = 10
+MARKER = "bench-dispatch"
+
+
+def make_user(i: int, role: UserRole) -> User:
+    name = f"{MARKER}-{role.value}-{i}"
+    return User(
+        username=name, email=f"{name}@bench.local", hashed_password="x",
+        full_name=name, role=role, is_active=True
+    )
+
+
+def seed():
+    db = SessionLocal()
+    counselors = [make_user(i, UserRole.COUNSELOR) for i in range(COUNSELORS)]
+    students = [make_user(i, UserRole.STUDENT) for i in range(TICKETS // 5)]
+    db.add_all(counselors + students)
+    db.flush()
+    db.add_all(
+        CounselorProfile(
+            user_id=counselor.id, staff_id=f"{MARKER}-{counselor.id}", department="Benchmark",
+            specializations=["Academic Stress", "Anxiety"], is_available=True,
+            max_active_tickets=TICKETS
+        )
+        for counselor in counselors
+    )
+    db.commit()
+    ids = [c.id for c in counselors], [s.id for s in students]
+    db.close()
+    return ids
+
+
+def create_burst(student_ids, start):
+    db = SessionLocal()
+    for i in range(start, min(start + BURST, TICKETS)):
+        db.add(Ticket(
+            ticket_number=f"{MARKER}-{i}", student_id=student_ids[i % len(student_ids)],
+            category="Anxiety" if i % 2 else "Academic Stress", status=TicketStatus.NEW,
+            priority=1 if i % CRISIS_EVERY == 0 else 0, initial_message="benchmark"
+        ))
+    db.commit()
+    db.close()
+
+
+def cleanup(counselor_ids, student_ids):
+    db = SessionLocal()
+    for ticket in db.query(Ticket).filter(Ticket.ticket_number.like(f"{MARKER}-%")):
+        db.delete(ticket)
+    db.query(OutboundEmail).filter(OutboundEmail.to_email.like(f"{MARKER}-%@bench.local")).delete(synchronize_session=False)
+    db.query(CounselorProfile).filter(CounselorProfile.user_id.in_(counselor_ids)).delete(synchronize_session=False)
+    db.flush()
+    for user in db.query(User).filter(User.id.in_(counselor_ids + student_ids)):
+        db.delete(user)
+    db.commit()
+    db.close()
+
+
+def run():
+    counselor_ids, student_ids = seed()
+    dispatcher = TicketDispatcher(batch_size=50, poll_seconds=1.0)
+    dispatcher.start()
+    try:
+        start = time.perf_counter()
+        for offset in range(0, TICKETS, BURST):
+            create_burst(student_ids, offset)
+            dispatcher.wake()
+
+        db = SessionLocal()
+        try:
+            while True:
+                metrics = dispatcher.metrics(db)
+                db.rollback()
+                if metrics["assigned_total"] >= TICKETS or time.perf_counter() - start > 120:
+                    break
+                time.sleep(0.1)
+        finally:
+            db.close()
+        print(f"{metrics['assigned_total']}/{TICKETS} tickets assigned in {time.perf_counter() - start:.2f}s")
+        print(json.dumps(metrics, indent=2))
+    finally:
+        dispatcher.stop()
+        cleanup(counselor_ids, student_ids)
+
+
+if __name__ == "__main__":
+    run()
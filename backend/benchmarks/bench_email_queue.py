@@ -0,0 +1,81 @@
+"""
+Outbound email queue check against a local aiosmtpd stand-in.
+
+Starts an aiosmtpd server on 127.0.0.1:8025 (from requirements-dev.txt), queues
+EMAILS messages, and drains them with deliver_batch over one reused SMTP
+session. It then sends the same number with a new connection per message,
+which is what send_email used to do, for comparison. Queued rows are deleted
+afterwards.
+
+    python -m benchmarks.bench_email_queue
+"""
+import sys
+import time
+from aiosmtpd.controller import Controller
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import OutboundEmail
+from app.utils.email_queue import SMTPConnection, deliver_batch
+from app.utils.email_utils import queue_email
+
+EMAILS = 200
+SUBJECT = "bench-email-queue"
+
+
+class CollectingHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def run():
+    settings.SMTP_HOST = "127.0.0.1"
+    settings.SMTP_PORT = 8025
+    settings.SMTP_STARTTLS = False
+    settings.SMTP_USERNAME = ""
+    settings.SMTP_FROM_EMAIL = "noreply@bench.local"
+
+    handler = CollectingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=8025)
+    controller.start()
+    db = SessionLocal()
+    try:
+        for i in range(EMAILS):
+            queue_email(db, f"user{i}@bench.local", SUBJECT, "<p>hello</p>", "hello")
+        db.commit()
+
+        connection = SMTPConnection()
+        start = time.perf_counter()
+        while deliver_batch(db, connection, settings.EMAIL_BATCH_SIZE):
+            pass
+        pooled = time.perf_counter() - start
+        connection.close()
+        pooled_received = handler.received
+
+        emails = db.query(OutboundEmail).filter(OutboundEmail.subject == SUBJECT).all()
+        start = time.perf_counter()
+        for email in emails:
+            single = SMTPConnection()
+            single.send(email)
+            single.close()
+        per_message = time.perf_counter() - start
+
+        sent = sum(1 for email in emails if email.status == "sent")
+        print(f"queued {EMAILS}, marked sent {sent}, received by relay {pooled_received}")
+        print(f"reused session:        {EMAILS / pooled:8.0f} msg/s")
+        print(f"connection per message:{EMAILS / per_message:8.0f} msg/s")
+        ok = sent == EMAILS and pooled_received == EMAILS
+    finally:
+        db.query(OutboundEmail).filter(OutboundEmail.subject == SUBJECT).delete()
+        db.commit()
+        db.close()
+        controller.stop()
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,79 @@
+"""
+Login throughput and threadpool starvation under a burst of sign-ins.
+
+Runs CONCURRENCY login attempts at once and measures two things: login
+throughput, and the latency of a cheap sync endpoint probed while the burst
+is in flight. The inline path verifies bcrypt on Starlette's threadpool, as
+the sync login handler did. The pooled path awaits PasswordHasher, which
+leaves the threadpool free for other endpoints. No database is needed; the
+hash is made with the configured BCRYPT_ROUNDS.
+
+    python -m benchmarks.bench_login
+"""
+import asyncio
+import statistics
+import time
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.hashing import PasswordHasher, pwd_context
+
+CONCURRENCY = [10, 50, 200]
+PROBES = 50
+PASSWORD = "correct horse battery staple"
+
+
+def p99(samples):
+    return statistics.quantiles(samples, n=100)[98] * 1000 if len(samples) > 1 else samples[0] * 1000
+
+
+def cheap_endpoint():
+    return {"status": "ok"}
+
+
+async def probe(latencies, done):
+    while not done.is_set() and len(latencies) < PROBES:
+        start = time.perf_counter()
+        await run_in_threadpool(cheap_endpoint)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def burst(login, count):
+    done = asyncio.Event()
+    probe_latencies = []
+    prober = asyncio.create_task(probe(probe_latencies, done))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(count)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+    assert all(results)
+    return count / elapsed, p99(probe_latencies) if probe_latencies else 0.0
+
+
+async def run():
+    hashed = pwd_context.hash(PASSWORD)
+    hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, max(CONCURRENCY))
+    hasher.start()
+    await hasher.verify(PASSWORD, hashed)
+
+    async def inline_login():
+        return await run_in_threadpool(pwd_context.verify, PASSWORD, hashed)
+
+    async def pooled_login():
+        return await hasher.verify(PASSWORD, hashed)
+
+    print(f"bcrypt rounds {settings.BCRYPT_ROUNDS}, {hasher.workers} hash processes")
+    print(f"{'logins':>6} | {'inline/s':>8} | {'probe p99 ms':>12} | {'pooled/s':>8} | {'probe p99 ms':>12}")
+    print("-" * 60)
+    for count in CONCURRENCY:
+        inline_rate, inline_probe = await burst(inline_login, count)
+        pooled_rate, pooled_probe = await burst(pooled_login, count)
+        print(f"{count:>6} | {inline_rate:>8.1f} | {inline_probe:>12.2f} | {pooled_rate:>8.1f} | {pooled_probe:>12.2f}")
+
+    print(hasher.stats())
+    hasher.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
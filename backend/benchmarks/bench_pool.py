@@ -0,0 +1,45 @@
+"""
+Connection pool sizing benchmark.
+
+Runs THREADS threads (the size of the HTTP threadpool) that each check out a
+session, hold it for a QUERY_MS query and release it, REQUESTS times in
+total. Prints throughput and the pool's checkout wait metrics, the same
+numbers /health reports. Rerun with DB_POOL_SIZE / DB_MAX_OVERFLOW /
+DB_DISCONNECT_STRATEGY overridden in the environment to compare settings
+for a given worker count.
+
+    DB_POOL_SIZE=5 DB_MAX_OVERFLOW=0 python -m benchmarks.bench_pool
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import SessionLocal, database_stats
+
+THREADS = 40
+REQUESTS = 2000
+QUERY_MS = 5
+
+
+def request(_):
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT pg_sleep(:seconds)"), {"seconds": QUERY_MS / 1000})
+    finally:
+        db.close()
+
+
+def run():
+    print(f"pool_size={settings.DB_POOL_SIZE} max_overflow={settings.DB_MAX_OVERFLOW} "
+          f"strategy={settings.DB_DISCONNECT_STRATEGY} threads={THREADS}")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(request, range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+    print(f"{REQUESTS} requests in {elapsed:.2f}s ({REQUESTS / elapsed:.0f} req/s)")
+    print(json.dumps(database_stats(), indent=2))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,100 @@
+"""
+Search benchmark on a synthetic chat corpus.
+
+Inserts CORPUS_SIZE synthetic messages (default 1M) into one throwaway ticket
+with INSERT ... SELECT generate_series, ANALYZEs, then compares the old
+ILIKE '%term%' scan with the GIN-backed full-text search used by
+/api/search. The synthetic student, ticket and messages are deleted at the end.
+
+    python -m benchmarks.bench_search [corpus_size]
+"""
+import sys
+import time
+from sqlalchemy import text
+from app.core.database import SessionLocal
+from app.models.models import User, Ticket, UserRole, TicketStatus
+from app.routers.search import search_messages
+
+CORPUS_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+TERMS = ["exam anxiety", "sleep", "homesick", "panic attack"]
+RUNS = 5
+
+WORDS = [
+    "exam", "anxiety", "sleep", "lecture", "friends", "family", "stress", "deadline",
+    "homesick", "lonely", "tired", "panic", "attack", "hostel", "fees", "project",
+    "relationship", "motivation", "focus", "counselor", "better", "today", "week", "class"
+]
+
+
+def seed(db):
+    student = User(
+        username="bench-search", email="bench-search@bench.local", hashed_password="x",
+        full_name="Bench Search", role=UserRole.STUDENT, is_active=True
+    )
+    db.add(student)
+    db.flush()
+    ticket = Ticket(
+        ticket_number="BENCH-SEARCH", student_id=student.id, category="Benchmark",
+        status=TicketStatus.ACTIVE, initial_message="synthetic search corpus"
+    )
+    db.add(ticket)
+    db.commit()
+
+    words = "ARRAY[" + ",".join(f"'{w}'" for w in WORDS) + "]"
+    print(f"Inserting {CORPUS_SIZE:,} synthetic messages...")
+    start = time.perf_counter()
+    db.execute(text(f"""
+        INSERT INTO messages (ticket_id, sender_id, message, is_read, created_at)
+        SELECT :ticket_id, :sender_id,
+               array_to_string(ARRAY(
+                   SELECT ({words})[1 + floor(random() * {len(WORDS)})::int]
+                   FROM generate_series(1, 12 + (g % 5))
+               ), ' '),
+               false, now() - (g || ' seconds')::interval
+        FROM generate_series(1, :count) AS g
+    """), {"ticket_id": ticket.id, "sender_id": student.id, "count": CORPUS_SIZE})
+    db.commit()
+    db.execute(text("ANALYZE messages"))
+    print(f"  done in {time.perf_counter() - start:.1f}s")
+    return student, ticket
+
+
+def cleanup(db, student, ticket):
+    db.execute(text("DELETE FROM messages WHERE ticket_id = :id"), {"id": ticket.id})
+    db.delete(ticket)
+    db.delete(student)
+    db.commit()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        fn()
+    return (time.perf_counter() - start) / RUNS * 1000
+
+
+def run():
+    db = SessionLocal()
+    admin = User(id=0, role=UserRole.ADMIN)
+    student = ticket = None
+    try:
+        student, ticket = seed(db)
+        print(f"{'term':>14} | {'ILIKE ms':>9} | {'full-text ms':>12} | {'hits':>6}")
+        print("-" * 50)
+        for term in TERMS:
+            ilike_ms = timed(lambda: db.execute(
+                text("SELECT id FROM messages WHERE message ILIKE :p ORDER BY id DESC LIMIT 20"),
+                {"p": f"%{term}%"}
+            ).all())
+            fts_ms = timed(lambda: search_messages(db, admin, term, 20))
+            hits = len(search_messages(db, admin, term, 20))
+            print(f"{term:>14} | {ilike_ms:>9.1f} | {fts_ms:>12.1f} | {hits:>6}")
+    finally:
+        db.rollback()
+        if ticket is not None:
+            cleanup(db, student, ticket)
+        db.close()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,49 @@
+"""
+Per-request token decode cost: python-jose on every call vs the TokenService
+cache.
+
+Issues TOKENS distinct access tokens, standing in for the active users, and
+decodes them round-robin ITERATIONS times. The old path is a plain
+jwt.decode with signature verification. The new path goes through
+token_service.decode, which verifies each token once and then serves its
+claims from the LRU. No database is needed.
+
+    python -m benchmarks.bench_token_decode
+"""
+import time
+from jose import jwt
+from app.core.config import settings
+from app.core.tokens import TokenService, load_signing_keys
+
+TOKENS = 1000
+ITERATIONS = 100_000
+
+
+def per_call_us(elapsed):
+    return elapsed / ITERATIONS * 1_000_000
+
+
+def run():
+    keys = load_signing_keys()
+    service = TokenService(keys, settings.JWT_ACTIVE_KID, settings.TOKEN_CACHE_SIZE)
+    tokens = [service.create_access_token({"sub": f"user{i}@bench.local"}) for i in range(TOKENS)]
+    key = keys[settings.JWT_ACTIVE_KID]
+
+    start = time.perf_counter()
+    for i in range(ITERATIONS):
+        jwt.decode(tokens[i % TOKENS], key, algorithms=[settings.ALGORITHM])
+    jose_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(ITERATIONS):
+        assert service.decode(tokens[i % TOKENS]) is not None
+    cached_elapsed = time.perf_counter() - start
+
+    print(f"{ITERATIONS} decodes over {TOKENS} tokens (cache size {settings.TOKEN_CACHE_SIZE})")
+    print(f"  jose verify every call: {per_call_us(jose_elapsed):8.2f} us/decode")
+    print(f"  TokenService cached:    {per_call_us(cached_elapsed):8.2f} us/decode")
+    print(f"  {service.stats()}")
+
+
+if __name__ == "__main__":
+    run()
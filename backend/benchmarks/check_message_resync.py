@@ -0,0 +1,82 @@
+"""
+Check that GET /api/tickets/{id}/messages?since= fills the gap when the
+`since` message isn't in the table.
+
+Chat messages are broadcast before the message writer stores them, so a client
+can resync from a message that isn't written yet; it may also have been
+removed by DELETE /messages. Both used to return an empty page, which the
+client reads as "nothing missed". Runs against the first ticket in the
+database; the rows it writes are deleted afterwards.
+
+    python -m benchmarks.check_message_resync
+"""
+import sys
+from datetime import datetime
+from fastapi import Response
+from sqlalchemy import text
+from app.core.database import SessionLocal
+from app.models.models import Message, Ticket, User
+from app.routers.tickets import get_chat_messages
+
+MARKER = "bench-resync"
+
+
+def reserve_id(db) -> int:
+    # The message writer reserves ids the same way before broadcasting
+    return db.execute(text("SELECT nextval(pg_get_serial_sequence('messages', 'id'))")).scalar()
+
+
+def write(db, ticket, message_id: int):
+    db.add(Message(id=message_id, ticket_id=ticket.id, sender_id=ticket.student_id, message=MARKER, created_at=datetime.utcnow()))
+    db.commit()
+
+
+def resync(db, ticket, student, since: int):
+    page = get_chat_messages(ticket.id, Response(), since=since, cursor=None, limit=50, db=db, current_user=student)
+    return [message.id for message in page if message.message == MARKER]
+
+
+def run():
+    db = SessionLocal()
+    ticket = db.query(Ticket).first()
+    if not ticket:
+        print("Create at least one ticket before running this check")
+        db.close()
+        return
+    student = db.query(User).filter(User.id == ticket.student_id).first()
+
+    checks = []
+    try:
+        # Anchor reserved and broadcast but not written yet
+        pending = reserve_id(db)
+        later = [reserve_id(db), reserve_id(db)]
+        for message_id in later:
+            write(db, ticket, message_id)
+        checks.append(("unwritten anchor", later, resync(db, ticket, student, pending)))
+
+        # Anchor written and then deleted
+        deleted = reserve_id(db)
+        write(db, ticket, deleted)
+        db.query(Message).filter(Message.id == deleted).delete()
+        db.commit()
+        after = reserve_id(db)
+        write(db, ticket, after)
+        checks.append(("deleted anchor", [after], resync(db, ticket, student, deleted)))
+
+        # Anchor present: the normal path
+        checks.append(("stored anchor", later[1:] + [after], resync(db, ticket, student, later[0])))
+    finally:
+        db.query(Message).filter(Message.message == MARKER).delete()
+        db.commit()
+        db.close()
+
+    ok = True
+    for name, expected, got in checks:
+        passed = got == expected
+        ok = ok and passed
+        print(f"{'✓' if passed else '✗'} {name}: expected {expected}, got {got}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    run()
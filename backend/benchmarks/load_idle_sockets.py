@@ -0,0 +1,154 @@
+"""
+Load test: many idle chat sockets against a running server must not grow the
+number of PostgreSQL connections.
+
+Seeds SOCKETS students with one ticket each, opens one chat socket per ticket
+against WS_URL (OPEN_CONCURRENCY handshakes at a time), holds them idle for
+HOLD_SECONDS answering the server's pings, and samples pg_stat_activity for
+the database as the sockets pile up. Before handlers switched to short-lived
+sessions each socket pinned a pooled connection, so the server stalled once
+DB_POOL_SIZE + DB_MAX_OVERFLOW sockets were open. Fails if the connection
+count ever exceeds the baseline plus the pool limit. All synthetic rows are
+deleted at the end.
+
+Start the API first (one worker), then:
+
+    WS_URL=ws://localhost:8000 python -m benchmarks.load_idle_sockets
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+import websockets
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.security import create_access_token
+from app.models.models import User, Ticket, UserRole, TicketStatus
+
+SOCKETS = 1000
+OPEN_CONCURRENCY = 100
+HOLD_SECONDS = 60
+SAMPLE_EVERY = 250
+WS_URL = os.environ.get("WS_URL", "ws://localhost:8000")
+MARKER = "bench-idle"
+
+
+def seed():
+    db = SessionLocal()
+    students = [
+        User(
+            username=f"{MARKER}-{i}", email=f"{MARKER}-{i}@bench.local", hashed_password="x",
+            full_name=f"{MARKER}-{i}", role=UserRole.STUDENT, is_active=True
+        )
+        for i in range(SOCKETS)
+    ]
+    db.add_all(students)
+    db.flush()
+    tickets = [
+        Ticket(
+            ticket_number=f"{MARKER}-{student.id}", student_id=student.id, category="Benchmark",
+            status=TicketStatus.ASSIGNED, initial_message="idle socket"
+        )
+        for student in students
+    ]
+    db.add_all(tickets)
+    db.commit()
+    pairs = [(student.email, ticket.id) for student, ticket in zip(students, tickets)]
+    db.close()
+    return pairs
+
+
+def cleanup():
+    db = SessionLocal()
+    for ticket in db.query(Ticket).filter(Ticket.ticket_number.like(f"{MARKER}-%")):
+        db.delete(ticket)
+    db.flush()
+    for user in db.query(User).filter(User.email.like(f"{MARKER}-%@bench.local")):
+        db.delete(user)
+    db.commit()
+    db.close()
+
+
+def database_connections() -> int:
+    db = SessionLocal()
+    try:
+        return db.execute(text(
+            "SELECT count(*) FROM pg_stat_activity "
+            "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+        )).scalar()
+    finally:
+        db.close()
+
+
+async def hold_socket(email: str, ticket_id: int, opened: asyncio.Semaphore, stop: asyncio.Event, sockets: list):
+    token = create_access_token({"sub": email})
+    async with opened:
+        socket = await websockets.connect(f"{WS_URL}/ws/chat/{ticket_id}?token={token}", open_timeout=60)
+    sockets.append(socket)
+    try:
+        while not stop.is_set():
+            try:
+                frame = json.loads(await asyncio.wait_for(socket.recv(), 1))
+            except asyncio.TimeoutError:
+                continue
+            if frame.get("type") == "ping":
+                await socket.send(json.dumps({"type": "pong"}))
+    finally:
+        await socket.close()
+
+
+async def run_load(pairs):
+    loop = asyncio.get_running_loop()
+    baseline = await loop.run_in_executor(None, database_connections)
+    limit = baseline + settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    print(f"baseline: {baseline} database connections (limit {limit})")
+
+    opened = asyncio.Semaphore(OPEN_CONCURRENCY)
+    stop = asyncio.Event()
+    sockets = []
+    start = time.perf_counter()
+    tasks = [asyncio.ensure_future(hold_socket(email, ticket_id, opened, stop, sockets)) for email, ticket_id in pairs]
+
+    samples = []
+    next_mark = SAMPLE_EVERY
+    while len(sockets) < len(pairs):
+        failed = [task for task in tasks if task.done() and task.exception()]
+        if failed:
+            raise failed[0].exception()
+        if len(sockets) >= next_mark:
+            count = await loop.run_in_executor(None, database_connections)
+            samples.append(count)
+            print(f"{len(sockets):>5} sockets open: {count} database connections")
+            next_mark += SAMPLE_EVERY
+        await asyncio.sleep(0.05)
+    print(f"{len(sockets)} sockets open in {time.perf_counter() - start:.1f}s")
+
+    hold_until = time.perf_counter() + HOLD_SECONDS
+    while time.perf_counter() < hold_until:
+        count = await loop.run_in_executor(None, database_connections)
+        samples.append(count)
+        print(f"idle {HOLD_SECONDS - (hold_until - time.perf_counter()):>4.0f}s: {count} database connections")
+        await asyncio.sleep(5)
+
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    peak = max(samples)
+    print(f"peak {peak} database connections for {len(pairs)} idle sockets")
+    return peak <= limit
+
+
+def run():
+    pairs = seed()
+    try:
+        ok = asyncio.run(run_load(pairs))
+    finally:
+        cleanup()
+    print("✓ database connections stayed within the pool" if ok else "✗ database connections grew with sockets")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,153 @@
+"""
+Concurrency stress test for ticket claims and session bookings.
+
+Fires CLAIMS concurrent assign-to-me calls from different counselors at one
+ticket, CLAIMS concurrent bookings from different students for one slot, and
+RETRIES concurrent bookings from one student that share an Idempotency-Key.
+Each scenario asserts exactly one winner and, for the retries, that one
+schedule row exists and every replay returns its id. Threads start together
+behind a barrier. Calls beyond the connection pool size wait for a
+connection, but their transactions still overlap. All synthetic users,
+tickets, schedules and queued emails are deleted at the end.
+
+    python -m benchmarks.stress_claims
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from fastapi import BackgroundTasks, HTTPException
+from fastapi.responses import JSONResponse
+from app.core.database import SessionLocal
+from app.models.models import User, Ticket, Schedule, IdempotencyKey, OutboundEmail, UserRole, TicketStatus
+from app.routers.schedules import create_schedule
+from app.routers.tickets import assign_ticket_to_me
+from app.schemas.schemas import ScheduleCreate
+from app.utils.availability import LOCAL_TZ
+
+CLAIMS = 200
+RETRIES = 50
+MARKER = "bench-stress"
+
+
+def next_monday_at(hour: int) -> datetime:
+    today = datetime.now(LOCAL_TZ).date()
+    monday = today + timedelta(days=7 - today.weekday())
+    return datetime(monday.year, monday.month, monday.day, hour, tzinfo=LOCAL_TZ)
+
+
+def make_user(i: int, role: UserRole) -> User:
+    name = f"{MARKER}-{role.value}-{i}"
+    return User(
+        username=name, email=f"{name}@bench.local", hashed_password="x",
+        full_name=name, role=role, is_active=True
+    )
+
+
+def seed():
+    db = SessionLocal()
+    counselors = [make_user(i, UserRole.COUNSELOR) for i in range(CLAIMS)]
+    students = [make_user(i, UserRole.STUDENT) for i in range(CLAIMS)]
+    db.add_all(counselors + students)
+    db.flush()
+    ticket = Ticket(
+        ticket_number=f"{MARKER}-ticket", student_id=students[0].id, category="Benchmark",
+        status=TicketStatus.NEW, initial_message="stress test"
+    )
+    db.add(ticket)
+    db.commit()
+    ids = [c.id for c in counselors], [s.id for s in students], ticket.id
+    db.close()
+    return ids
+
+
+def race(calls):
+    """Run every call at once; return (successes, rejections)."""
+    barrier = threading.Barrier(len(calls))
+
+    def run(call):
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            return call(db)
+        except HTTPException as e:
+            return e
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        results = list(pool.map(run, calls))
+    return [r for r in results if not isinstance(r, HTTPException)], [r for r in results if isinstance(r, HTTPException)]
+
+
+def claim_call(counselor_id, ticket_id):
+    def call(db):
+        counselor = db.get(User, counselor_id)
+        ticket = assign_ticket_to_me(ticket_id, BackgroundTasks(), db, counselor)
+        return ticket.counselor_id
+    return call
+
+
+def booking_call(student_id, counselor_id, scheduled_at, key=None):
+    def call(db):
+        student = db.get(User, student_id)
+        data = ScheduleCreate(counselor_id=counselor_id, scheduled_at=scheduled_at, duration_minutes=60)
+        result = create_schedule(data, key, db, student)
+        if isinstance(result, JSONResponse):
+            return json.loads(result.body)["id"]
+        return result.id
+    return call
+
+
+def cleanup(counselor_ids, student_ids, ticket_id):
+    db = SessionLocal()
+    user_ids = counselor_ids + student_ids
+    for schedule in db.query(Schedule).filter(Schedule.student_id.in_(user_ids)):
+        db.delete(schedule)
+    db.query(IdempotencyKey).filter(IdempotencyKey.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(OutboundEmail).filter(OutboundEmail.to_email.like(f"{MARKER}-%@bench.local")).delete(synchronize_session=False)
+    db.delete(db.get(Ticket, ticket_id))
+    db.flush()
+    for user in db.query(User).filter(User.id.in_(user_ids)):
+        db.delete(user)
+    db.commit()
+    db.close()
+
+
+def run():
+    counselor_ids, student_ids, ticket_id = seed()
+    try:
+        start = time.perf_counter()
+        winners, rejected = race([claim_call(c, ticket_id) for c in counselor_ids])
+        print(f"{CLAIMS} concurrent claims: {len(winners)} won, {len(rejected)} rejected "
+              f"in {time.perf_counter() - start:.2f}s")
+        assert len(winners) == 1, winners
+
+        slot = next_monday_at(10)
+        start = time.perf_counter()
+        winners, rejected = race([booking_call(s, counselor_ids[0], slot) for s in student_ids])
+        print(f"{CLAIMS} concurrent bookings of one slot: {len(winners)} booked, {len(rejected)} rejected "
+              f"in {time.perf_counter() - start:.2f}s")
+        assert len(winners) == 1, winners
+
+        slot = next_monday_at(11)
+        key = f"{MARKER}-retry"
+        start = time.perf_counter()
+        results, rejected = race([booking_call(student_ids[1], counselor_ids[1], slot, key) for _ in range(RETRIES)])
+        print(f"{RETRIES} concurrent retries with one Idempotency-Key: {len(results)} responses, "
+              f"{len(set(results))} distinct schedule ids, {len(rejected)} rejected "
+              f"in {time.perf_counter() - start:.2f}s")
+        assert len(set(results)) == 1 and not rejected, (results, rejected)
+
+        db = SessionLocal()
+        booked = db.query(Schedule).filter(Schedule.student_id == student_ids[1]).count()
+        db.close()
+        assert booked == 1, booked
+        print("✓ exactly one winner in every scenario")
+    finally:
+        cleanup(counselor_ids, student_ids, ticket_id)
+
+
+if __name__ == "__main__":
+    run()
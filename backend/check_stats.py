@@ -0,0 +1,35 @@
+import sys
+from app.core.counters import find_drift, rebuild_counters
+from app.core.database import SessionLocal
+
+
+def check_stats(fix: bool = False):
+    db = SessionLocal()
+    try:
+        print("Recomputing statistics counters from source tables...")
+        drift = find_drift(db)
+
+        if not drift:
+            print("✓ All counters match")
+            return 0
+
+        print(f"✗ {len(drift)} counters drifted:")
+        for (scope, scope_id, name), stored, expected in drift:
+            print(f"  {scope}[{scope_id}].{name}: stored={stored} expected={expected} (drift {stored - expected:+d})")
+
+        if fix:
+            rebuild_counters(db)
+            print("✓ Counters rebuilt")
+            return 0
+        return 1
+
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        db.rollback()
+        return 2
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(check_stats(fix="--fix" in sys.argv))
@@ -1,4 +1,5 @@
 from app.core.database import engine, Base, SessionLocal
+from app.core import counters  # noqa: F401 - keeps stat counters in step with seeded users
 from app.models.models import User, UserRole
 from app.core.security import get_password_hash
 
@@ -1,7 +1,13 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.connections import connection_supervisor
+from app.core.database import engine, Base, database_stats, dispose_async_engine
+from app.core.hashing import password_hasher
+from app.core.tokens import token_service
+from app.utils.email_queue import email_workers
+from app.utils.ticket_dispatcher import ticket_dispatcher
 
 Base.metadata.create_all(bind=engine)
 
@@ -17,6 +23,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 routers_config = [
@@ -24,9 +31,11 @@ routers_config = [
     ("counselors", "Counselors"),
     ("tickets", "Tickets"),
     ("ticket_status", "Ticket Status"),
+    ("search", "Search"),
     ("resources", "Resources"),
     ("emergency_contacts", "Emergency contacts"),
     ("assessments", "Assessments"),
+    ("assessment_analytics", "Assessment analytics"),
     ("schedules", "Schedules"),
     ("stats", "Stats"),
     ("wellbeing", "Wellbeing"),
@@ -43,6 +52,36 @@ for module_name, display_name in routers_config:
     except Exception as e:
         print(f"✗ {display_name} router failed: {e}")
 
+@app.on_event("startup")
+def start_email_workers():
+    if settings.EMAIL_WORKER_ENABLED:
+        email_workers.start()
+
+@app.on_event("shutdown")
+def stop_email_workers():
+    email_workers.stop()
+
+@app.on_event("startup")
+async def start_ticket_dispatcher():
+    if settings.DISPATCHER_ENABLED:
+        ticket_dispatcher.start(asyncio.get_running_loop())
+
+@app.on_event("shutdown")
+def stop_ticket_dispatcher():
+    ticket_dispatcher.stop()
+
+@app.on_event("startup")
+def start_password_hasher():
+    password_hasher.start()
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    password_hasher.stop()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await dispose_async_engine()
+
 @app.get("/")
 def root():
     return {
@@ -53,7 +92,13 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "password_hasher": password_hasher.stats(),
+        "tokens": token_service.stats(),
+        "connections": connection_supervisor.stats(),
+        "database": database_stats()
+    }
 
 @app.get("/api/routes")
 def list_routes():
@@ -0,0 +1,75 @@
+from sqlalchemy import text
+from app.core.database import engine, Base
+import app.models.models  # noqa: F401 - registers every table on Base.metadata
+
+# Idempotent schema changes for databases created before a model gained new
+# columns or indexes. Base.metadata.create_all only creates missing tables,
+# so existing tables are brought up to date here.
+STATEMENTS = [
+    # Assessment subscores moved out of the responses JSON into columns
+    "ALTER TABLE assessments ADD COLUMN IF NOT EXISTS mental_health_score INTEGER",
+    "ALTER TABLE assessments ADD COLUMN IF NOT EXISTS emotional_health_score INTEGER",
+    "ALTER TABLE assessments ADD COLUMN IF NOT EXISTS social_health_score INTEGER",
+    "ALTER TABLE assessments ADD COLUMN IF NOT EXISTS needs_awareness_score INTEGER",
+    "ALTER TABLE assessments ADD COLUMN IF NOT EXISTS needs_followup BOOLEAN",
+    """
+    UPDATE assessments SET
+        mental_health_score = COALESCE((NULLIF(responses, '')::jsonb ->> 'mental_health_score')::int, 0),
+        emotional_health_score = COALESCE((NULLIF(responses, '')::jsonb ->> 'emotional_health_score')::int, 0),
+        social_health_score = COALESCE((NULLIF(responses, '')::jsonb ->> 'social_health_score')::int, 0),
+        needs_awareness_score = COALESCE((NULLIF(responses, '')::jsonb ->> 'needs_awareness_score')::int, 0)
+    WHERE mental_health_score IS NULL
+    """,
+    """
+    UPDATE assessments SET needs_followup = COALESCE(severity_level IN (
+        'Critical - Immediate support recommended', 'Concerning - Multiple challenges'
+    ), FALSE)
+    WHERE needs_followup IS NULL
+    """,
+    "ALTER TABLE assessments ALTER COLUMN mental_health_score SET NOT NULL",
+    "ALTER TABLE assessments ALTER COLUMN emotional_health_score SET NOT NULL",
+    "ALTER TABLE assessments ALTER COLUMN social_health_score SET NOT NULL",
+    "ALTER TABLE assessments ALTER COLUMN needs_awareness_score SET NOT NULL",
+    "ALTER TABLE assessments ALTER COLUMN needs_followup SET NOT NULL",
+    # Schedules carry their end time so overlapping bookings can be excluded
+    "ALTER TABLE schedules ADD COLUMN IF NOT EXISTS ends_at TIMESTAMPTZ",
+    """
+    UPDATE schedules SET ends_at = scheduled_at + make_interval(mins => COALESCE(duration_minutes, 60))
+    WHERE ends_at IS NULL
+    """,
+    "ALTER TABLE schedules ALTER COLUMN ends_at SET NOT NULL",
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'schedules_no_overlap') THEN
+            ALTER TABLE schedules ADD CONSTRAINT schedules_no_overlap EXCLUDE USING gist (
+                counselor_id WITH =, tstzrange(scheduled_at, ends_at) WITH &&
+            ) WHERE (status IN ('pending', 'scheduled', 'confirmed'));
+        END IF;
+    EXCEPTION WHEN exclusion_violation THEN
+        RAISE WARNING 'schedules_no_overlap not added: existing bookings overlap, resolve them and re-run';
+    END
+    $$
+    """,
+]
+
+
+def migrate_database():
+    print("Creating missing tables...")
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        for statement in STATEMENTS:
+            conn.execute(text(statement))
+
+    print("Creating missing indexes...")
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    print("✓ Database migration complete!")
+
+
+if __name__ == "__main__":
+    migrate_database()
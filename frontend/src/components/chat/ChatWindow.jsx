@@ -1,5 +1,7 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { Send, Paperclip, MoreVertical } from 'lucide-react';
+import { authFetch } from '../../utils/authToken';
+import { MAX_MESSAGE_LENGTH, fetchMissedMessages, lastMessageId, openChatSocket } from '../../utils/chatSocket';
 
 const API = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 const WS = import.meta.env.VITE_WS_URL || 'ws://localhost:8000';
@@ -7,9 +9,11 @@ const WS = import.meta.env.VITE_WS_URL || 'ws://localhost:8000';
 const ChatWindow = ({ ticketId, currentUser }) => {
   const [messages, setMessages] = useState([]);
   const [newMessage, setNewMessage] = useState('');
-  const [ws, setWs] = useState(null);
+  const socketRef = useRef(null);
+  const messagesRef = useRef([]);
   const [connected, setConnected] = useState(false);
   const [loadingHistory, setLoadingHistory] = useState(true);
+  const [sendError, setSendError] = useState(null);
   const messagesEndRef = useRef(null);
 
   const scrollToBottom = () => {
@@ -18,17 +22,18 @@ const ChatWindow = ({ ticketId, currentUser }) => {
 
   useEffect(() => {
     scrollToBottom();
+    messagesRef.current = messages;
   }, [messages]);
 
   // Load existing messages on mount
   useEffect(() => {
     const fetchHistory = async () => {
       try {
-        const token = localStorage.getItem('token');
-        const res = await fetch(`${API}/api/tickets/${ticketId}/messages`, {
-          headers: { Authorization: `Bearer ${token}` }
-        });
-        if (res.ok) setMessages(await res.json());
+        const res = await authFetch(`${API}/api/tickets/${ticketId}/messages`);
+        if (res.ok) {
+          setMessages(await res.json());
+          authFetch(`${API}/api/tickets/${ticketId}/messages/read`, { method: 'POST' }).catch(() => {});
+        }
       } catch (err) {
         console.error('Failed to load message history:', err);
       } finally {
@@ -41,37 +46,33 @@ const ChatWindow = ({ ticketId, currentUser }) => {
 
   // WebSocket connection
   useEffect(() => {
-    const token = localStorage.getItem('token');
-    const websocket = new WebSocket(`${WS}/ws/chat/${ticketId}?token=${token}`);
-
-    websocket.onopen = () => {
-      setConnected(true);
-    };
-
-    websocket.onmessage = (event) => {
-      const message = JSON.parse(event.data);
-      setMessages(prev => {
-        // avoid duplicates if message already exists from history
-        if (prev.find(m => m.id === message.id)) return prev;
-        return [...prev, message];
-      });
-    };
-
-    websocket.onerror = () => setConnected(false);
-    websocket.onclose = () => setConnected(false);
-
-    setWs(websocket);
+    // avoid duplicates if a message already exists from history or a replay
+    const append = (incoming) => setMessages(prev => {
+      const seen = new Set(prev.map(m => m.id));
+      const fresh = incoming.filter(m => !seen.has(m.id));
+      return fresh.length ? [...prev, ...fresh] : prev;
+    });
+
+    const socket = openChatSocket((token) => `${WS}/ws/chat/${ticketId}?token=${token}`, {
+      onMessage: (message) => append([message]),
+      onStatus: setConnected,
+      onError: setSendError,
+      onResync: async () => {
+        const sinceId = lastMessageId(messagesRef.current);
+        if (sinceId !== null) append(await fetchMissedMessages(API, ticketId, sinceId));
+      }
+    });
+    socketRef.current = socket;
 
-    return () => {
-      if (websocket.readyState === WebSocket.OPEN) websocket.close();
-    };
+    return () => socket.close();
   }, [ticketId]);
 
   const sendMessage = (e) => {
     e.preventDefault();
-    if (!newMessage.trim() || !ws || !connected) return;
-    ws.send(JSON.stringify({ message: newMessage }));
+    if (!newMessage.trim() || !connected) return;
+    socketRef.current?.send(JSON.stringify({ message: newMessage }));
     setNewMessage('');
+    setSendError(null);
   };
 
   return (
@@ -136,6 +137,7 @@ const ChatWindow = ({ ticketId, currentUser }) => {
             type="text"
             value={newMessage}
             onChange={(e) => setNewMessage(e.target.value)}
+            maxLength={MAX_MESSAGE_LENGTH}
             onKeyDown={(e) => { if (e.key === 'Enter' && !e.shiftKey) sendMessage(e); }}
             placeholder={connected ? 'Type your message...' : 'Connecting...'}
             className="flex-1 px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent outline-none disabled:bg-gray-50 disabled:text-gray-400"
@@ -149,6 +151,9 @@ const ChatWindow = ({ ticketId, currentUser }) => {
             <Send className="h-5 w-5" />
           </button>
         </div>
+        {sendError && (
+          <p className="text-xs text-red-500 mt-2">{sendError}</p>
+        )}
         {!connected && (
           <p className="text-xs text-red-500 mt-2">
             Not connected. Check your internet connection or try refreshing.
@@ -1,5 +1,6 @@
 import React, { useState } from 'react';
 import { X, Mail, Lock, User, Phone, Award, Briefcase } from 'lucide-react';
+import { authFetch } from '../../utils/authToken';
 
 const CounselorRegistrationModal = ({ isOpen, onClose, onSuccess }) => {
   const [loading, setLoading] = useState(false);
@@ -60,12 +61,10 @@ const CounselorRegistrationModal = ({ isOpen, onClose, onSuccess }) => {
     setError('');
 
     try {
-      const token = localStorage.getItem('token');
-      const response = await fetch(`${import.meta.env.VITE_API_URL || 'http://localhost:8000'}/api/auth/register/counselor`, {
+      const response = await authFetch(`${import.meta.env.VITE_API_URL || 'http://localhost:8000'}/api/auth/register/counselor`, {
         method: 'POST',
         headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${token}`
+          'Content-Type': 'application/json'
         },
         body: JSON.stringify({
           username: formData.username,
@@ -1,6 +1,8 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { MessageSquare, AlertCircle, Users, Loader } from 'lucide-react';
+import { authFetch } from '../../utils/authToken';
+import { createIdempotencyKeys } from '../../utils/idempotency';
 
 const NewChatForm = () => {
   const navigate = useNavigate();
@@ -8,6 +10,7 @@ const NewChatForm = () => {
   const [loadingCounselors, setLoadingCounselors] = useState(true);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
+  const idempotencyKey = useRef(createIdempotencyKeys()).current;
   const [formData, setFormData] = useState({
     counselor_id: '',
     category: '',
@@ -22,20 +25,14 @@ const NewChatForm = () => {
   const fetchCounselors = async () => {
     setLoadingCounselors(true);
     try {
-      const token = localStorage.getItem('token');
-      
-      if (!token) {
+      if (!localStorage.getItem('token')) {
         setError('Not authenticated. Please login again.');
         navigate('/login');
         return;
       }
 
       console.log('Fetching counselors...');
-      const response = await fetch(`${import.meta.env.VITE_API_URL || 'http://localhost:8000'}/api/counselors/available`, {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      });
+      const response = await authFetch(`${import.meta.env.VITE_API_URL || 'http://localhost:8000'}/api/counselors/available`);
 
       console.log('Response status:', response.status);
 
@@ -104,19 +101,19 @@ const NewChatForm = () => {
     setError('');
 
     try {
-      const token = localStorage.getItem('token');
-      const response = await fetch(`${import.meta.env.VITE_API_URL || 'http://localhost:8000'}/api/tickets/`, {
+      const body = JSON.stringify({
+        counselor_id: parseInt(formData.counselor_id),
+        category: formData.category,
+        initial_message: formData.initial_message,
+        crisis_level: formData.crisis_level
+      });
+      const response = await authFetch(`${import.meta.env.VITE_API_URL || 'http://localhost:8000'}/api/tickets/`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
-          'Authorization': `Bearer ${token}`
+          'Idempotency-Key': idempotencyKey(body)
         },
-        body: JSON.stringify({
-          counselor_id: parseInt(formData.counselor_id),
-          category: formData.category,
-          initial_message: formData.initial_message,
-          crisis_level: formData.crisis_level
-        })
+        body
       });
 
       if (!response.ok) {
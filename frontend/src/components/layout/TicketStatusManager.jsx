@@ -1,25 +1,15 @@
 import React, { useState } from 'react';
-import axios from 'axios';
 import { Check, X, RotateCcw, MessageSquare, AlertCircle } from 'lucide-react';
-
-const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+import api from '../../services/api';
 
 const TicketStatusManager = ({ ticket, onStatusUpdate, userRole }) => {
   const [loading, setLoading] = useState(false);
   const [showConfirm, setShowConfirm] = useState(null);
 
-  const getAuthHeaders = () => ({
-    Authorization: `Bearer ${localStorage.getItem('token')}`
-  });
-
   const handleStatusUpdate = async (newStatus) => {
     setLoading(true);
     try {
-      const response = await axios.patch(
-        `${API_BASE_URL}/api/tickets/${ticket.id}/update-status`,
-        { status: newStatus },
-        { headers: getAuthHeaders() }
-      );
+      const response = await api.patch(`/tickets/${ticket.id}/update-status`, { status: newStatus });
       
       if (response.data.success) {
         onStatusUpdate({
@@ -43,11 +33,7 @@ const TicketStatusManager = ({ ticket, onStatusUpdate, userRole }) => {
   const handleMarkResolved = async () => {
     setLoading(true);
     try {
-      const response = await axios.post(
-        `${API_BASE_URL}/api/tickets/${ticket.id}/mark-resolved`,
-        {},
-        { headers: getAuthHeaders() }
-      );
+      const response = await api.post(`/tickets/${ticket.id}/mark-resolved`, {});
       
       if (response.data.success) {
         onStatusUpdate({
@@ -70,11 +56,7 @@ const TicketStatusManager = ({ ticket, onStatusUpdate, userRole }) => {
   const handleClose = async () => {
     setLoading(true);
     try {
-      const response = await axios.post(
-        `${API_BASE_URL}/api/tickets/${ticket.id}/close`,
-        {},
-        { headers: getAuthHeaders() }
-      );
+      const response = await api.post(`/tickets/${ticket.id}/close`, {});
       
       if (response.data.success) {
         onStatusUpdate({
@@ -98,11 +80,7 @@ const TicketStatusManager = ({ ticket, onStatusUpdate, userRole }) => {
   const handleReopen = async () => {
     setLoading(true);
     try {
-      const response = await axios.post(
-        `${API_BASE_URL}/api/tickets/${ticket.id}/reopen`,
-        {},
-        { headers: getAuthHeaders() }
-      );
+      const response = await api.post(`/tickets/${ticket.id}/reopen`, {});
       
       if (response.data.success) {
         onStatusUpdate({
@@ -1,10 +1,12 @@
 import React, { createContext, useContext, useState, useEffect } from 'react';
+import { REFRESH_MARGIN_MS, refreshSession, tokenExpiry } from '../utils/authToken';
 
 const AuthContext = createContext(null);
 
 export const AuthProvider = ({ children }) => {
   const [user, setUser] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [tokenVersion, setTokenVersion] = useState(0);
 
   useEffect(() => {
     const storedUser = localStorage.getItem('user');
@@ -16,19 +18,44 @@ export const AuthProvider = ({ children }) => {
     setLoading(false);
   }, []);
 
-  const login = (userData, token) => {
+  const login = (userData, token, refreshToken) => {
     setUser(userData);
     localStorage.setItem('user', JSON.stringify(userData));
     localStorage.setItem('token', token);
+    if (refreshToken) {
+      localStorage.setItem('refreshToken', refreshToken);
+    }
+    setTokenVersion((v) => v + 1);
   };
 
   const logout = () => {
     setUser(null);
     localStorage.removeItem('user');
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('rememberMe');
   };
 
+  useEffect(() => {
+    const token = localStorage.getItem('token');
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (!user || !token || !refreshToken) return;
+
+    const delay = Math.max(tokenExpiry(token) - Date.now() - REFRESH_MARGIN_MS, 0);
+    // Requests refresh on their own if this timer is late, and share the
+    // request with it if they coincide
+    const timer = setTimeout(async () => {
+      try {
+        await refreshSession();
+        setTokenVersion((v) => v + 1);
+      } catch {
+        // A rejected refresh token has already ended the session; after a
+        // network error the next request retries the refresh
+      }
+    }, delay);
+    return () => clearTimeout(timer);
+  }, [user, tokenVersion]);
+
   const updateUser = (updatedData) => {
     const updatedUser = { ...user, ...updatedData };
     setUser(updatedUser);
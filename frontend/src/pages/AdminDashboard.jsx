@@ -7,6 +7,7 @@ import {
   Clock, X, User, Mail, Phone, Award, LogOut, Menu
 } from 'lucide-react';
 import CounselorRegistrationModal from '../components/common/CounselorRegistrationModal';
+import { authFetch } from '../utils/authToken';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
@@ -28,10 +29,7 @@ const AdminDashboard = () => {
   const fetchDashboardData = async () => {
     setLoading(true);
     try {
-      const token = localStorage.getItem('token');
-      const response = await fetch(`${API_BASE_URL}/api/admin/dashboard`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
+      const response = await authFetch(`${API_BASE_URL}/api/admin/dashboard`);
       const data = await response.json();
       setAnalytics(data.analytics ?? null);
       setPendingCounselors(data.pending_counselors ?? []);
@@ -45,10 +43,9 @@ const AdminDashboard = () => {
 
   const handleApproveCounselor = async (counselorId, approve) => {
     try {
-      const token = localStorage.getItem('token');
-      await fetch(`${API_BASE_URL}/api/admin/counselors/${counselorId}/approve`, {
+      await authFetch(`${API_BASE_URL}/api/admin/counselors/${counselorId}/approve`, {
         method: 'POST',
-        headers: { Authorization: `Bearer ${token}`, 'Content-Type': 'application/json' },
+        headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ approve })
       });
       fetchDashboardData();
@@ -59,10 +56,7 @@ const AdminDashboard = () => {
 
   const exportReport = async (type) => {
     try {
-      const token = localStorage.getItem('token');
-      const response = await fetch(`${API_BASE_URL}/api/admin/reports/${type}`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
+      const response = await authFetch(`${API_BASE_URL}/api/admin/reports/${type}`);
       const data = await response.json();
       const blob = new Blob([JSON.stringify(data, null, 2)], { type: 'application/json' });
       const url = window.URL.createObjectURL(blob);
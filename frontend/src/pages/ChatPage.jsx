@@ -5,6 +5,8 @@ import { ArrowLeft, Send, User, Clock, Trash2, FileText, X, ShieldOff } from 'lu
 import TicketStatusManager from '../components/layout/TicketStatusManager';
 import ToastNotification from '../components/common/ToastNotification';
 import { API_BASE_URL, WS_BASE_URL } from '../config';
+import { authFetch } from '../utils/authToken';
+import { MAX_MESSAGE_LENGTH, fetchMissedMessages, lastMessageId, openChatSocket } from '../utils/chatSocket';
 
 const ChatPage = () => {
   const { ticketId } = useParams();
@@ -30,19 +32,18 @@ const ChatPage = () => {
   const [existingNote, setExistingNote] = useState(null);
 
   const wsRef = useRef(null);
+  const messagesRef = useRef([]);
   const messagesEndRef = useRef(null);
 
   const scrollToBottom = () => messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
 
   useEffect(() => { scrollToBottom(); }, [messages]);
+  useEffect(() => { messagesRef.current = messages; }, [messages]);
 
   // ── Fetch ticket details only (NO message history loaded — session-only) ──
   const fetchTicketDetails = useCallback(async () => {
     try {
-      const token = localStorage.getItem('token');
-      const res = await fetch(`${API_BASE_URL}/api/tickets/${ticketId}`, {
-        headers: { Authorization: `Bearer ${token}` },
-      });
+      const res = await authFetch(`${API_BASE_URL}/api/tickets/${ticketId}`);
       if (res.ok) {
         const ticketData = await res.json();
         setTicket(ticketData);
@@ -61,9 +62,7 @@ const ChatPage = () => {
 
       // If counselor, also fetch any existing session note
       if (user?.role !== 'student') {
-        const noteRes = await fetch(`${API_BASE_URL}/api/tickets/${ticketId}/session-note`, {
-          headers: { Authorization: `Bearer ${token}` },
-        });
+        const noteRes = await authFetch(`${API_BASE_URL}/api/tickets/${ticketId}/session-note`);
         if (noteRes.ok) {
           const noteData = await noteRes.json();
           setExistingNote(noteData.note || null);
@@ -78,24 +77,25 @@ const ChatPage = () => {
   }, [ticketId, user?.role]);
 
   // ── WebSocket ──
-  const connectWebSocket = useCallback(() => {
-    const token = localStorage.getItem('token');
-    const ws = new WebSocket(`${WS_BASE_URL}/ws/chat/${ticketId}?token=${token}`);
-
-    ws.onopen = () => setWsConnected(true);
-
-    ws.onmessage = (event) => {
-      const data = JSON.parse(event.data);
-      setMessages((prev) => {
-        if (prev.some((m) => m.id === data.id)) return prev;
-        return [...prev, data];
-      });
-    };
+  const appendMessages = useCallback((incoming) => {
+    setMessages((prev) => {
+      const seen = new Set(prev.map((m) => m.id));
+      const fresh = incoming.filter((m) => !seen.has(m.id));
+      return fresh.length ? [...prev, ...fresh] : prev;
+    });
+  }, []);
 
-    ws.onerror = () => setWsConnected(false);
-    ws.onclose = () => setWsConnected(false);
-    wsRef.current = ws;
-  }, [ticketId]);
+  const connectWebSocket = useCallback(() => {
+    wsRef.current = openChatSocket((token) => `${WS_BASE_URL}/ws/chat/${ticketId}?token=${token}`, {
+      onMessage: (data) => appendMessages([data]),
+      onStatus: setWsConnected,
+      onError: (detail) => setToast({ message: detail, type: 'error' }),
+      onResync: async () => {
+        const sinceId = lastMessageId(messagesRef.current);
+        if (sinceId !== null) appendMessages(await fetchMissedMessages(API_BASE_URL, ticketId, sinceId));
+      },
+    });
+  }, [ticketId, appendMessages]);
 
   useEffect(() => {
     fetchTicketDetails();
@@ -117,7 +117,7 @@ const ChatPage = () => {
   // ── Send message ──
   const handleSendMessage = async (e) => {
     e.preventDefault();
-    if (!newMessage.trim() || !wsRef.current || wsRef.current.readyState !== WebSocket.OPEN) return;
+    if (!newMessage.trim() || !wsRef.current?.isOpen()) return;
     setSending(true);
     try {
       wsRef.current.send(JSON.stringify({ message: newMessage.trim() }));
@@ -133,11 +133,7 @@ const ChatPage = () => {
   const handleDeleteHistory = async () => {
     setDeleting(true);
     try {
-      const token = localStorage.getItem('token');
-      const res = await fetch(`${API_BASE_URL}/api/tickets/${ticketId}/messages`, {
-        method: 'DELETE',
-        headers: { Authorization: `Bearer ${token}` },
-      });
+      const res = await authFetch(`${API_BASE_URL}/api/tickets/${ticketId}/messages`, { method: 'DELETE' });
       if (res.ok) {
         // Keep only the initial message as a stub
         setMessages(ticket?.initial_message ? [{
@@ -164,10 +160,9 @@ const ChatPage = () => {
     if (!sessionNote.trim()) return;
     setSavingNote(true);
     try {
-      const token = localStorage.getItem('token');
-      const res = await fetch(`${API_BASE_URL}/api/tickets/${ticketId}/session-note`, {
+      const res = await authFetch(`${API_BASE_URL}/api/tickets/${ticketId}/session-note`, {
         method: 'POST',
-        headers: { Authorization: `Bearer ${token}`, 'Content-Type': 'application/json' },
+        headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ note: sessionNote.trim() }),
       });
       if (res.ok) {
@@ -447,6 +442,7 @@ const ChatPage = () => {
             type="text"
             value={newMessage}
             onChange={(e) => setNewMessage(e.target.value)}
+            maxLength={MAX_MESSAGE_LENGTH}
             placeholder={isClosed ? 'Conversation closed' : 'Type your message...'}
             className="flex-1 px-4 py-3 border border-gray-300 rounded-full focus:ring-2 focus:ring-blue-500 focus:border-transparent outline-none disabled:bg-gray-100"
             disabled={isClosed || !wsConnected}
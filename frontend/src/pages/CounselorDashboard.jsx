@@ -6,6 +6,8 @@ import {
   Clock, AlertTriangle, CheckCircle, LogOut, Menu, X, User, Video, MapPin 
 } from 'lucide-react';
 import { maskName } from '../utils/privacyUtils';
+import { authFetch } from '../utils/authToken';
+import { fetchAllPages } from '../utils/pagination';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
@@ -26,17 +28,14 @@ const CounselorDashboard = () => {
   const fetchData = async () => {
     setLoading(true);
     try {
-      const token = localStorage.getItem('token');
-      const headers = { Authorization: `Bearer ${token}` };
-
-      const [myTicketsRes, availableRes, sessionsRes] = await Promise.all([
-        fetch(`${API_BASE_URL}/api/tickets/my-tickets`, { headers }),
-        fetch(`${API_BASE_URL}/api/tickets/available`, { headers }),
-        fetch(`${API_BASE_URL}/api/schedules/upcoming`, { headers }),
+      const [myTickets, available, sessionsRes] = await Promise.all([
+        fetchAllPages(`${API_BASE_URL}/api/tickets/my-tickets`).catch(() => null),
+        fetchAllPages(`${API_BASE_URL}/api/tickets/available`).catch(() => null),
+        authFetch(`${API_BASE_URL}/api/schedules/upcoming`),
       ]);
 
-      if (myTicketsRes.ok) setTickets(await myTicketsRes.json());
-      if (availableRes.ok) setAvailableTickets(await availableRes.json());
+      if (myTickets) setTickets(myTickets);
+      if (available) setAvailableTickets(available);
       if (sessionsRes.ok) setUpcomingSessions(await sessionsRes.json());
     } catch (error) {
       console.error('Error fetching data:', error);
@@ -47,10 +46,9 @@ const CounselorDashboard = () => {
 
   const handleAssignTicket = async (ticketId) => {
     try {
-      const token = localStorage.getItem('token');
-      const response = await fetch(`${API_BASE_URL}/api/tickets/${ticketId}/assign-to-me`, {
+      const response = await authFetch(`${API_BASE_URL}/api/tickets/${ticketId}/assign-to-me`, {
         method: 'POST',
-        headers: { Authorization: `Bearer ${token}`, 'Content-Type': 'application/json' }
+        headers: { 'Content-Type': 'application/json' }
       });
       if (response.ok) fetchData();
     } catch (error) {
@@ -34,7 +34,7 @@ const LoginPage = () => {
     try {
       const response = await loginUser(formData.email, formData.password);
       
-      login(response.user, response.access_token);
+      login(response.user, response.access_token, response.refresh_token);
       
       if (rememberMe) {
         localStorage.setItem('rememberMe', 'true');
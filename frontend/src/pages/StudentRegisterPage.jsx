@@ -103,7 +103,7 @@ const StudentRegisterPage = () => {
         kin_email: formData.kinEmail,
         kin_phone_number: formData.kinPhoneNumber,
       });
-      login(data.user, data.access_token);
+      login(data.user, data.access_token, data.refresh_token);
       navigate('/student/dashboard');
     } catch (err) {
       setError(err.response?.data?.detail || err.message || 'Registration failed');
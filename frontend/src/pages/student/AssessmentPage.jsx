@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { ArrowLeft, FileText, AlertCircle, CheckCircle, Loader } from 'lucide-react';
+import { authFetch } from '../../utils/authToken';
 
 const AssessmentPage = () => {
   const navigate = useNavigate();
@@ -103,12 +104,10 @@ const AssessmentPage = () => {
     }));
 
     try {
-      const token = localStorage.getItem('token');
-      const response = await fetch(`${import.meta.env.VITE_API_URL || 'http://localhost:8000'}/api/assessments/submit`, {
+      const response = await authFetch(`${import.meta.env.VITE_API_URL || 'http://localhost:8000'}/api/assessments/submit`, {
         method: 'POST',
         headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${token}`
+          'Content-Type': 'application/json'
         },
         body: JSON.stringify({ responses: formattedResponses, notes })
       });
@@ -1,9 +1,11 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate, useSearchParams } from 'react-router-dom';
 import {
   ArrowLeft, Calendar, Clock, CheckCircle, AlertCircle,
   Video, MapPin, Phone, Mail, AlertTriangle, Sparkles
 } from 'lucide-react';
+import { authFetch } from '../../utils/authToken';
+import { createIdempotencyKeys } from '../../utils/idempotency';
 
 const API = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
@@ -37,7 +39,8 @@ const SchedulePage = () => {
   const [loadingSuggestions, setLoadingSuggestions] = useState(false);
   const [counselors, setCounselors] = useState([]);
   const [selectedCounselor, setSelectedCounselor] = useState('');
-  const [bookedSlots, setBookedSlots] = useState([]);
+  // counselor id -> open "HH:MM" start times on the selected date
+  const [freeSlots, setFreeSlots] = useState({});
 
   const [emergencyContacts, setEmergencyContacts] = useState([]);
   const [loadingContacts, setLoadingContacts] = useState(true);
@@ -50,7 +53,7 @@ const SchedulePage = () => {
     '13:00', '14:00', '15:00', '16:00', '17:00'
   ];
 
-  const token = () => localStorage.getItem('token');
+  const idempotencyKey = useRef(createIdempotencyKeys()).current;
 
   const readyToSuggest = category && selectedDate && selectedTime && meetingType;
 
@@ -60,8 +63,8 @@ const SchedulePage = () => {
   }, []);
 
   useEffect(() => {
-    if (selectedCounselor && selectedDate) fetchBookedSlots();
-  }, [selectedCounselor, selectedDate]);
+    if (selectedDate) fetchFreeSlots();
+  }, [selectedDate]);
 
   useEffect(() => {
     if (readyToSuggest) fetchSuggestions();
@@ -73,9 +76,7 @@ const SchedulePage = () => {
     setSelectedCounselor('');
     try {
       const params = new URLSearchParams({ category, limit: 3 });
-      const res = await fetch(`${API}/api/counselors/suggest?${params}`, {
-        headers: { Authorization: `Bearer ${token()}` }
-      });
+      const res = await authFetch(`${API}/api/counselors/suggest?${params}`);
       if (res.ok) {
         const data = await res.json();
         setSuggestions(data);
@@ -90,9 +91,7 @@ const SchedulePage = () => {
 
   const fetchCounselors = async () => {
     try {
-      const res = await fetch(`${API}/api/counselors/available`, {
-        headers: { Authorization: `Bearer ${token()}` }
-      });
+      const res = await authFetch(`${API}/api/counselors/available`);
       if (res.ok) setCounselors(await res.json());
     } catch (err) {
       console.error('Failed to fetch counselors:', err);
@@ -102,9 +101,7 @@ const SchedulePage = () => {
   const fetchEmergencyContacts = async () => {
     setLoadingContacts(true);
     try {
-      const res = await fetch(`${API}/api/emergency-contacts/`, {
-        headers: { Authorization: `Bearer ${token()}` }
-      });
+      const res = await authFetch(`${API}/api/emergency-contacts/`);
       if (res.ok) setEmergencyContacts(await res.json());
     } catch (err) {
       console.error('Failed to fetch emergency contacts:', err);
@@ -113,20 +110,24 @@ const SchedulePage = () => {
     }
   };
 
-  const fetchBookedSlots = async () => {
+  const fetchFreeSlots = async () => {
     try {
-      const res = await fetch(
-        `${API}/api/schedules/booked-slots?counselor_id=${selectedCounselor}&date=${selectedDate}`,
-        { headers: { Authorization: `Bearer ${token()}` } }
-      );
-      if (res.ok) setBookedSlots(await res.json());
+      const params = new URLSearchParams({ start_date: selectedDate, days: 1 });
+      const res = await authFetch(`${API}/api/schedules/free-slots?${params}`);
+      if (res.ok) {
+        const data = await res.json();
+        setFreeSlots(Object.fromEntries(data.map(c => [
+          String(c.counselor_id),
+          (c.slots[selectedDate] || []).map(slot => new Date(slot).toTimeString().substring(0, 5))
+        ])));
+      }
     } catch (err) {
-      console.error('Failed to fetch booked slots:', err);
+      console.error('Failed to fetch free slots:', err);
     }
   };
 
   const isSlotBooked = (time) =>
-    bookedSlots.some(slot => new Date(slot.scheduled_at).toTimeString().substring(0, 5) === time);
+    !(freeSlots[selectedCounselor] || []).includes(time);
 
   const isSlotPast = (date, time) => new Date(`${date}T${time}`) < new Date();
 
@@ -151,19 +152,20 @@ const SchedulePage = () => {
     setSubmitting(true);
     setError('');
     try {
-      const res = await fetch(`${API}/api/schedules/`, {
+      const body = JSON.stringify({
+        counselor_id: parseInt(selectedCounselor),
+        scheduled_at: new Date(`${selectedDate}T${selectedTime}:00`).toISOString(),
+        duration_minutes: 60,
+        meeting_type: meetingType,
+        notes: notes || null
+      });
+      const res = await authFetch(`${API}/api/schedules/`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
-          Authorization: `Bearer ${token()}`
+          'Idempotency-Key': idempotencyKey(body)
         },
-        body: JSON.stringify({
-          counselor_id: parseInt(selectedCounselor),
-          scheduled_at: new Date(`${selectedDate}T${selectedTime}:00`).toISOString(),
-          duration_minutes: 60,
-          meeting_type: meetingType,
-          notes: notes || null
-        })
+        body
       });
       if (!res.ok) {
         const err = await res.json();
@@ -414,10 +416,7 @@ const SchedulePage = () => {
                     {selectedCounselor && (
                       <div className="mt-2 text-xs text-gray-500">
                         {(() => {
-                          const booked = bookedSlots.some(slot =>
-                            new Date(slot.scheduled_at).toTimeString().substring(0, 5) === selectedTime
-                          );
-                          return booked
+                          return isSlotBooked(selectedTime)
                             ? <span className="text-red-500">This counselor is not available at {selectedTime} on the selected date. Please pick another time or counselor.</span>
                             : <span className="text-green-600">This counselor is available at your selected time.</span>;
                         })()}
@@ -1,11 +1,12 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../../context/AuthContext';
 import { Link, useNavigate } from 'react-router-dom';
-import axios from 'axios';
 import { 
   MessageSquare, Calendar, AlertTriangle, User, 
   Phone, FileText, Activity, Heart, LogOut, Menu, X, Clock, Video, MapPin, Plus, Trash2, Mail
 } from 'lucide-react';
+import api from '../../services/api';
+import { fetchAllPages } from '../../utils/pagination';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
@@ -32,30 +33,24 @@ const StudentDashboard = () => {
     fetchDashboardData();
   }, []);
 
-  const getAuthHeaders = () => ({
-    Authorization: `Bearer ${localStorage.getItem('token')}`
-  });
-
   const fetchDashboardData = async () => {
     try {
-      const headers = getAuthHeaders();
-
       const requests = [
-        axios.get(`${API_BASE_URL}/api/tickets/my-tickets`, { headers }),
-        axios.get(`${API_BASE_URL}/api/emergency-contacts/`, { headers }),
-        axios.get(`${API_BASE_URL}/api/assessments/recent`, { headers }),
-        axios.get(`${API_BASE_URL}/api/schedules/upcoming`, { headers }),
+        fetchAllPages(`${API_BASE_URL}/api/tickets/my-tickets`),
+        api.get('/emergency-contacts/'),
+        api.get('/assessments/recent'),
+        api.get('/schedules/upcoming'),
       ];
 
       if (user?.id) {
         requests.push(
-          axios.get(`${API_BASE_URL}/api/wellbeing/daily-tip?user_id=${user.id}`, { headers })
+          api.get(`/wellbeing/daily-tip?user_id=${user.id}`)
         );
       }
 
       const results = await Promise.allSettled(requests);
 
-      if (results[0].status === 'fulfilled') setTickets(results[0].value.data);
+      if (results[0].status === 'fulfilled') setTickets(results[0].value);
       if (results[1].status === 'fulfilled') setEmergencyContacts(results[1].value.data);
       if (results[2].status === 'fulfilled') setRecentAssessment(results[2].value.data);
       if (results[3].status === 'fulfilled') setUpcomingSessions(results[3].value.data);
@@ -76,9 +71,7 @@ const StudentDashboard = () => {
   const handleAddContact = async (e) => {
     e.preventDefault();
     try {
-      const response = await axios.post(`${API_BASE_URL}/api/emergency-contacts/`, contactForm, {
-        headers: getAuthHeaders()
-      });
+      const response = await api.post('/emergency-contacts/', contactForm);
       if (response.status === 201) {
         setContactForm({ contact_name: '', contact_relationship: '', phone_number: '', email: '', is_primary: false });
         setShowAddContact(false);
@@ -93,9 +86,7 @@ const StudentDashboard = () => {
   const handleDeleteContact = async (contactId) => {
     if (!window.confirm('Are you sure you want to delete this contact?')) return;
     try {
-      const response = await axios.delete(`${API_BASE_URL}/api/emergency-contacts/${contactId}`, {
-        headers: getAuthHeaders()
-      });
+      const response = await api.delete(`/emergency-contacts/${contactId}`);
       if (response.status === 200) {
         setEmergencyContacts(prev => prev.filter(contact => contact.id !== contactId));
       }
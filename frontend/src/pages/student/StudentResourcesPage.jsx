@@ -1,17 +1,11 @@
 import React, { useState, useEffect } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
-import axios from 'axios';
 import { 
   Search, Filter, Book, Video, FileText, Headphones, 
   ExternalLink, MessageSquare, Phone, LogOut, Menu, X,
   Brain, Heart, Moon, Activity, Users
 } from 'lucide-react';
-
-const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
-
-const getAuthHeaders = () => ({
-  headers: { Authorization: `Bearer ${localStorage.getItem('token')}` }
-});
+import api from '../../services/api';
 
 const StudentResourcesPage = () => {
   const navigate = useNavigate();
@@ -46,10 +40,7 @@ const StudentResourcesPage = () => {
 
   const fetchCategories = async () => {
     try {
-      const response = await axios.get(
-        `${API_BASE_URL}/api/resources/categories`,
-        getAuthHeaders()
-      );
+      const response = await api.get('/resources/categories');
       setCategories(response.data);
     } catch (error) {
       console.error('Error fetching categories:', error);
@@ -64,10 +55,7 @@ const StudentResourcesPage = () => {
       if (selectedType !== 'all') params.append('type', selectedType);
       if (searchQuery) params.append('search', searchQuery);
 
-      const response = await axios.get(
-        `${API_BASE_URL}/api/resources/?${params.toString()}`,
-        getAuthHeaders()
-      );
+      const response = await api.get(`/resources/?${params.toString()}`);
       setResources(response.data.resources);
     } catch (error) {
       console.error('Error fetching resources:', error);
@@ -78,11 +66,7 @@ const StudentResourcesPage = () => {
 
   const handleResourceClick = async (resource) => {
     try {
-      await axios.post(
-        `${API_BASE_URL}/api/resources/${resource.id}/track-access`,
-        {},
-        getAuthHeaders()
-      );
+      await api.post(`/resources/${resource.id}/track-access`, {});
       
       if (resource.url) {
         window.open(resource.url, '_blank');
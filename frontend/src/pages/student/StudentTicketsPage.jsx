@@ -1,11 +1,11 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../../context/AuthContext';
 import { Link, useNavigate } from 'react-router-dom';
-import axios from 'axios';
 import { 
   MessageSquare, LogOut, Menu, X, Plus, Search,
   AlertTriangle, Clock, User, Filter, Calendar
 } from 'lucide-react';
+import { fetchAllPages } from '../../utils/pagination';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
@@ -29,11 +29,7 @@ const StudentTicketsPage = () => {
 
   const fetchTickets = async () => {
     try {
-      const token = localStorage.getItem('token');
-      const response = await axios.get(`${API_BASE_URL}/api/tickets/my-tickets`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setTickets(response.data);
+      setTickets(await fetchAllPages(`${API_BASE_URL}/api/tickets/my-tickets`));
     } catch (error) {
       console.error('Error fetching tickets:', error);
     } finally {
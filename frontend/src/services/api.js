@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { endSession, freshAccessToken, refreshSession } from '../utils/authToken';
 
 const api = axios.create({
   baseURL: `${import.meta.env.VITE_API_URL || 'http://localhost:8000'}/api`,
@@ -7,9 +8,16 @@ const api = axios.create({
   },
 });
 
+// Requests made without a session; a 401 from these is not an expired token
+const SESSIONLESS = /^\/auth\/(login|register|refresh|forgot-password|reset-password|verify-email)/;
+
 api.interceptors.request.use(
-  (config) => {
-    const token = localStorage.getItem('token');
+  async (config) => {
+    let token = localStorage.getItem('token');
+    if (!SESSIONLESS.test(config.url)) {
+      // Keep the stored token if the refresh can't reach the server
+      token = await freshAccessToken().catch(() => token);
+    }
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
@@ -22,11 +30,20 @@ api.interceptors.request.use(
 
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
-    if (error.response?.status === 401) {
-      localStorage.removeItem('token');
-      localStorage.removeItem('user');
-      window.location.href = '/login';
+  async (error) => {
+    const config = error.config;
+    if (error.response?.status === 401 && config && !SESSIONLESS.test(config.url)) {
+      if (!config._retried && localStorage.getItem('refreshToken')) {
+        // refreshSession ends the session itself if the refresh token is rejected
+        const token = await refreshSession().catch(() => null);
+        if (token) {
+          config._retried = true;
+          config.headers.Authorization = `Bearer ${token}`;
+          return api(config);
+        }
+      } else {
+        endSession();
+      }
     }
     return Promise.reject(error);
   }
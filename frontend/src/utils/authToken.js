@@ -0,0 +1,73 @@
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+
+// Access tokens are short-lived; renew them this long before they expire
+export const REFRESH_MARGIN_MS = 60 * 1000;
+
+export const tokenExpiry = (token) => {
+  try {
+    const payload = JSON.parse(atob(token.split('.')[1].replace(/-/g, '+').replace(/_/g, '/')));
+    return payload.exp * 1000;
+  } catch {
+    return 0;
+  }
+};
+
+export const tokenExpired = (token, marginMs = 0) => !token || tokenExpiry(token) - marginMs <= Date.now();
+
+// Drop the stored session and go to the login page. Only for a refresh token
+// the server rejected; a network error while refreshing keeps the session.
+export const endSession = () => {
+  localStorage.removeItem('token');
+  localStorage.removeItem('user');
+  localStorage.removeItem('refreshToken');
+  window.location.href = '/login';
+};
+
+let pendingRefresh = null;
+
+// Exchange the refresh token for a new access token. Concurrent callers share
+// one request. Uses fetch rather than the axios instance, whose interceptors
+// wait on this.
+export const refreshSession = () => {
+  if (!pendingRefresh) {
+    pendingRefresh = (async () => {
+      const res = await fetch(`${API_URL}/api/auth/refresh`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: localStorage.getItem('refreshToken') }),
+      });
+      if (res.status === 401) {
+        endSession();
+        throw new Error('Session expired');
+      }
+      if (!res.ok) throw new Error(`Token refresh failed with ${res.status}`);
+      const data = await res.json();
+      localStorage.setItem('token', data.access_token);
+      localStorage.setItem('refreshToken', data.refresh_token);
+      return data.access_token;
+    })().finally(() => {
+      pendingRefresh = null;
+    });
+  }
+  return pendingRefresh;
+};
+
+// The stored access token, refreshed first if it is about to expire. Use this
+// instead of reading localStorage directly: the AuthContext timer that renews
+// the token may not have fired in a throttled background tab or after sleep.
+export const freshAccessToken = async () => {
+  const token = localStorage.getItem('token');
+  if (!tokenExpired(token, REFRESH_MARGIN_MS) || !localStorage.getItem('refreshToken')) return token;
+  return refreshSession();
+};
+
+// fetch() with a current access token. A 401 is retried once after a refresh.
+export const authFetch = async (url, options = {}) => {
+  const send = (token) => fetch(url, {
+    ...options,
+    headers: { ...options.headers, Authorization: `Bearer ${token}` },
+  });
+  const res = await send(await freshAccessToken());
+  if (res.status !== 401 || !localStorage.getItem('refreshToken')) return res;
+  return send(await refreshSession());
+};
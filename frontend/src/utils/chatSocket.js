@@ -0,0 +1,113 @@
+import { authFetch, freshAccessToken, tokenExpired } from './authToken';
+
+// Same as the server's CHAT_MAX_MESSAGE_LENGTH
+export const MAX_MESSAGE_LENGTH = 1500;
+
+// Chat socket that reconnects after a drop and resumes where it left off.
+// Broadcast frames carry `seq` and `epoch`; on reconnect the server replays
+// only the frames after the last seq we saw. If it no longer has them it
+// answers with `resync`, and onResync should load the gap over REST.
+// `buildUrl(token)` is called on every attempt with a current access token.
+// onError receives the `detail` of a message the server refused to send.
+export const openChatSocket = (buildUrl, { onMessage, onStatus, onResync, onError }) => {
+  let socket = null;
+  let token = null;
+  let epoch = null;
+  let lastSeq = null;
+  let retryDelay = 1000;
+  let retryTimer = null;
+  let closed = false;
+
+  const retry = () => {
+    retryTimer = setTimeout(connect, retryDelay);
+    retryDelay = Math.min(retryDelay * 2, 30000);
+  };
+
+  const connect = async () => {
+    try {
+      token = await freshAccessToken();
+    } catch {
+      // A rejected refresh token has already ended the session; otherwise the
+      // server was unreachable, so try again later
+      onStatus?.(false);
+      if (!closed) retry();
+      return;
+    }
+    if (closed) return;
+    const resume = epoch && lastSeq !== null ? `&resume_from=${lastSeq}&epoch=${epoch}` : '';
+    socket = new WebSocket(`${buildUrl(token)}${resume}`);
+
+    socket.onopen = () => {
+      retryDelay = 1000;
+      onStatus?.(true);
+    };
+
+    socket.onmessage = (event) => {
+      const frame = JSON.parse(event.data);
+      if (frame.type === 'ping') {
+        socket.send(JSON.stringify({ type: 'pong' }));
+        return;
+      }
+      if (frame.type === 'session') {
+        lastSeq = frame.epoch === epoch ? Math.max(lastSeq ?? 0, frame.seq) : frame.seq;
+        epoch = frame.epoch;
+        if (frame.resync) onResync?.();
+        return;
+      }
+      if (frame.type === 'error') {
+        onError?.(frame.detail);
+        return;
+      }
+      if (frame.seq && frame.epoch === epoch) lastSeq = Math.max(lastSeq ?? 0, frame.seq);
+      onMessage(frame);
+    };
+
+    socket.onclose = (event) => {
+      onStatus?.(false);
+      if (closed) return;
+      // 1008 with a valid token means we were removed from the ticket or
+      // replaced by a newer socket; with an expired one, refresh and retry
+      if (event.code === 1008 && !tokenExpired(token)) return;
+      retry();
+    };
+  };
+
+  connect();
+
+  return {
+    send: (data) => {
+      if (socket?.readyState !== WebSocket.OPEN) return false;
+      socket.send(data);
+      return true;
+    },
+    isOpen: () => socket?.readyState === WebSocket.OPEN,
+    close: () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      socket?.close();
+    },
+  };
+};
+
+// Messages after `sinceId`, paging until the gap is closed.
+export const fetchMissedMessages = async (apiBase, ticketId, sinceId, pageSize = 200) => {
+  const missed = [];
+  let since = sinceId;
+  for (;;) {
+    const res = await authFetch(`${apiBase}/api/tickets/${ticketId}/messages?since=${since}&limit=${pageSize}`);
+    if (!res.ok) break;
+    const page = await res.json();
+    missed.push(...page);
+    if (page.length < pageSize) break;
+    since = page[page.length - 1].id;
+  }
+  return missed;
+};
+
+// Id of the newest message that came from the server (not a local stub).
+export const lastMessageId = (messages) => {
+  for (let i = messages.length - 1; i >= 0; i--) {
+    if (typeof messages[i].id === 'number') return messages[i].id;
+  }
+  return null;
+};
@@ -0,0 +1,12 @@
+// Reuses one Idempotency-Key while the request body is unchanged, so a
+// double click or a retry after a network error can't create a duplicate.
+// Editing the form produces a new key.
+export const createIdempotencyKeys = () => {
+  let last = { body: null, key: null };
+  return (body) => {
+    if (last.body !== body) {
+      last = { body, key: crypto.randomUUID() };
+    }
+    return last.key;
+  };
+};
@@ -0,0 +1,18 @@
+import { authFetch } from './authToken';
+
+// Ticket list endpoints return one page as a plain array and the cursor for
+// the next page in the X-Next-Cursor header, absent on the last page.
+// Follows the cursor and returns every row.
+export const fetchAllPages = async (url, options = {}, pageSize = 200) => {
+  const rows = [];
+  let cursor = null;
+  do {
+    const params = new URLSearchParams({ limit: pageSize });
+    if (cursor) params.set('cursor', cursor);
+    const res = await authFetch(`${url}${url.includes('?') ? '&' : '?'}${params}`, options);
+    if (!res.ok) throw new Error(`GET ${url} failed with ${res.status}`);
+    rows.push(...await res.json());
+    cursor = res.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return rows;
+};